@@ -1,19 +1,30 @@
+import cPickle as pickle
 import functools
+import gc
 import os
+import threading
+import types
 import uuid
+import zlib
 from datetime import datetime
+from hashlib import md5
 from time import time
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
 from django_statsd.clients import statsd
-from mock import Mock
-from requests import post
+import requests
+from lxml import etree
+from suds import __version__ as suds_version
 from suds import client as sudsclient
+from suds import tostr
+from suds.bindings.binding import envns
 from suds.cache import DocumentCache
 from suds.sax.parser import Parser
-from suds.transport import Reply
+from suds.sax.text import Text
+from suds.sudsobject import Factory, footprint, Object
+from suds.transport import Reply, Request, TransportError
 from suds.transport.http import HttpTransport
 
 from .constants import (ACCESS_DENIED, HEADERS_ALLOWED,
@@ -21,6 +32,7 @@ from .constants import (ACCESS_DENIED, HEADERS_ALLOWED,
                         WSDL_MAP_MANGLED)
 from .errors import (AuthError, BangoError,
                      BangoUnanticipatedError, ProxyError)
+from solitude.breaker import breakers
 from solitude.logger import getLogger
 
 # Add in the list of allowed methods here.
@@ -57,9 +69,18 @@ token_checker = [
 ]
 
 
+# The WSDLs that clients are built from, the rest are imported by these.
+client_wsdls = ['billing', 'direct', 'exporter', 'token_checker']
+
 # Status codes from the proxy that raise an error and stop processing.
 FATAL_PROXY_STATUS_CODES = (404, 500,)
 
+# The pre-built schema written by refresh_wsdl into each WSDL directory, this
+# is a zlib compressed pickle.
+SCHEMA_FILE = 'schema.pickle'
+# Bump this if the contents of the schema file change.
+SCHEMA_VERSION = 1
+
 
 # Most of the names in the WSDL map easily, for example: Foo to FooRequest,
 # FooResponse etc. Some do not, this is a map of the exceptions.
@@ -98,14 +119,104 @@ def get_result(name):
 log = getLogger('s.bango')
 
 
+def wsdl_root(env):
+    return os.path.join(settings.ROOT, 'lib/bango/wsdl', env)
+
+
+def schema_path(env):
+    return os.path.join(wsdl_root(env), SCHEMA_FILE)
+
+
+def schema_version(env):
+    """
+    Everything that has to match for a schema file to be used. If any of the
+    WSDL files change, or suds changes, the schema file is stale.
+    """
+    sources = {}
+    for wsdl in WSDL_MAP[env].values():
+        with open(os.path.join(wsdl_root(env), wsdl['file'])) as fp:
+            sources[wsdl['file']] = md5(fp.read()).hexdigest()
+    return {'version': SCHEMA_VERSION, 'suds': suds_version,
+            'sources': sources}
+
+
+def write_schema(env):
+    """
+    Parse the WSDLs for an environment and write out the resolved WSDL
+    definitions, so that clients can be built without parsing the XML.
+    """
+    definitions = {}
+    for name in client_wsdls:
+        wsdl = WSDL_MAP[env][name]
+        client = sudsclient.Client(wsdl['url'], cache=ReadOnlyCache(env=env))
+        # Pickle each one separately so they are only loaded when needed.
+        definitions[wsdl['file']] = pickle.dumps(client.wsdl,
+                                                 pickle.HIGHEST_PROTOCOL)
+
+    data = schema_version(env)
+    data['definitions'] = definitions
+    filename = schema_path(env)
+    with open(filename, 'wb') as fp:
+        fp.write(zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL)))
+    return filename
+
+
+def read_schema(env):
+    """
+    Returns the definitions from the schema file, or None if the file is
+    missing or stale.
+    """
+    filename = schema_path(env)
+    try:
+        with open(filename, 'rb') as fp:
+            data = pickle.loads(zlib.decompress(fp.read()))
+    except IOError:
+        log.warning('No schema file: {0}, parsing WSDL'.format(filename))
+        return None
+    except Exception:
+        log.exception('Invalid schema file: {0}, parsing WSDL'
+                      .format(filename))
+        return None
+
+    definitions = data.pop('definitions', None)
+    if data != schema_version(env):
+        log.warning('Stale schema file: {0}, parsing WSDL'.format(filename))
+        return None
+
+    return definitions
+
+
+# The schema for each environment, loaded once per process.
+schemas = {}
+
+
+def get_schema(env):
+    if env not in schemas:
+        schemas[env] = read_schema(env)
+    return schemas[env]
+
+
 class ReadOnlyCache(DocumentCache):
 
     """
     This is a read only cache. It's populated from the refresh_wsdl
     command and checked into github. This cache makes suds look everything
     up here first before accessing remote URLs.
+
+    If the schema file written by refresh_wsdl is present and up to date,
+    suds can be pointed at it (using cachingpolicy=1) and the WSDL
+    definitions are loaded from there without parsing any XML.
     """
 
+    def __init__(self, env=None, *args, **kwargs):
+        # If not set, this looks up the BANGO_ENV each time it is used.
+        self.env = env
+        # The suds caches are old style classes, so no super.
+        DocumentCache.__init__(self, *args, **kwargs)
+
+    def get_env(self):
+        return self.env or settings.BANGO_ENV
+
     def put(self, *args, **kwargs):
         """Override this to prevent attempted changes."""
         return
@@ -116,6 +227,9 @@ class ReadOnlyCache(DocumentCache):
 
     def get(self, mangled):
         """Override this to prevent attempted purges."""
+        if mangled.endswith('-wsdl'):
+            return self.get_definitions(mangled)
+
         fp = self.getf(mangled)
         if fp is None:
             return None
@@ -125,10 +239,424 @@ class ReadOnlyCache(DocumentCache):
     def getf(self, mangled):
         """Override this to prevent swallowing exceptions silently."""
         # Find the file in the correct directory.
-        root = os.path.join(settings.ROOT, 'lib/bango/wsdl',
-                            settings.BANGO_ENV)
-        filename = WSDL_MAP_MANGLED[settings.BANGO_ENV][mangled]
-        return open(os.path.join(root, filename))
+        env = self.get_env()
+        filename = WSDL_MAP_MANGLED[env][mangled]
+        return open(os.path.join(wsdl_root(env), filename))
+
+    def has_definitions(self, url):
+        """Are there pre-built definitions for this WSDL URL."""
+        env = self.get_env()
+        filename = WSDL_MAP_MANGLED[env].get(url)
+        schema = get_schema(env)
+        return bool(schema and filename in schema)
+
+    def get_definitions(self, mangled):
+        env = self.get_env()
+        schema = get_schema(env)
+        filename = WSDL_MAP_MANGLED[env].get(mangled)
+        if not schema or filename not in schema:
+            return None
+
+        # Unpickling creates a lot of objects, which can trigger garbage
+        # collection runs part way through.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.loads(schema[filename])
+        finally:
+            if enabled:
+                gc.enable()
+
+
+class ClientCache(object):
+
+    """
+    A per-process cache of suds clients. Building a suds client means reading
+    and parsing the WSDL and then building the schema model, which is much
+    slower than the call to Bango itself.
+
+    Clients are keyed on the BANGO_ENV, the WSDL name and the transport class.
+    The cached client is never handed out directly, instead a clone is
+    returned. The clone shares the WSDL and schema but has its own options
+    and transport, so it's safe to use across threads.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def key(self, name, transport=None):
+        return (settings.BANGO_ENV, name, transport)
+
+    def get(self, name, transport=None):
+        key = self.key(name, transport)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                # Another thread might have built it while we waited.
+                client = self._clients.get(key)
+                if client is None:
+                    client = self.build(name, transport)
+                    self._clients[key] = client
+        return client.clone()
+
+    def build(self, name, transport=None):
+        log.info('Building suds client: {0}, env: {1}'
+                 .format(name, settings.BANGO_ENV))
+        url = get_wsdl(name)
+        cache = ReadOnlyCache()
+        kwargs = {'cache': cache}
+        if cache.has_definitions(url):
+            # Load the definitions from the schema instead of the WSDL.
+            kwargs['cachingpolicy'] = 1
+        if transport:
+            kwargs['transport'] = transport(timeout=settings.BANGO_TIMEOUT)
+        with statsd.timer('solitude.bango.client.build.%s' % name):
+            return sudsclient.Client(url, **kwargs)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            schemas.clear()
+        prototypes.clear()
+        codecs.clear()
+
+
+clients = ClientCache()
+
+
+def clone(value):
+    """
+    A copy of a suds object from a factory. The copy shares the schema
+    metadata of the original, which is never changed, so this is much faster
+    than a deepcopy.
+    """
+    if isinstance(value, list):
+        return [clone(item) for item in value]
+    if not isinstance(value, Object):
+        return value
+
+    data = value.__dict__.copy()
+    data['__keylist__'] = list(value.__keylist__)
+    for key in value.__keylist__:
+        if key in data:
+            data[key] = clone(data[key])
+    return types.InstanceType(value.__class__, data)
+
+
+class Prototypes(object):
+
+    """
+    A per-process cache of suds objects. suds walks the schema each time it
+    creates an object, so each type is created once here and then cloned.
+
+    Prototypes are keyed on the BANGO_ENV, the WSDL name and the type name.
+    They are built with the suds client that `client` uses for the WSDL.
+    """
+
+    def __init__(self):
+        self._prototypes = {}
+
+    def build(self, client, name, type_name):
+        return client.client(name).factory.create(type_name)
+
+    def create(self, client, name, type_name):
+        key = (settings.BANGO_ENV, name, type_name)
+        prototype = self._prototypes.get(key)
+        if prototype is None:
+            # Two threads might build this at the same time, which is fine.
+            prototype = self.build(client, name, type_name)
+            self._prototypes[key] = prototype
+        return clone(prototype)
+
+    def clear(self):
+        self._prototypes.clear()
+
+
+prototypes = Prototypes()
+
+
+class Unsupported(Exception):
+    """Something the FastCodec doesn't handle, suds does it instead."""
+
+
+class Field(object):
+
+    """An element in a FastCodec template."""
+
+    def __init__(self, element):
+        self.name = element.name
+        self.optional = element.optional()
+        self.many = element.unbounded()
+        # Filled in from the envelope suds renders.
+        self.tag = None
+
+        resolved = element.resolve()
+        self.builtin = resolved if resolved.builtin() else None
+        self.type_name = resolved.name
+        if resolved.attributes():
+            raise Unsupported('{0} has attributes'.format(self.name))
+        self.fields = None
+        if self.builtin is None:
+            self.fields = [Field(child) for child, _ in resolved.children()]
+            if not self.fields:
+                raise Unsupported('{0} has no elements'.format(self.name))
+            self.by_name = dict((f.name, f) for f in self.fields)
+
+
+class FastCodec(object):
+
+    """
+    Calls one Bango method without suds building the SOAP request or parsing
+    the response, which costs more than the rest of the request.
+
+    The request envelope is rendered from a template. The template is taken
+    from an envelope suds renders when the codec is built, so the output is
+    the same as suds, byte for byte. The response is found with a compiled
+    XPath and read into the same suds objects suds would return.
+
+    Anything the codec doesn't handle, such as a value that suds would have to
+    convert, a fault or an unexpected element, is passed on to suds.
+    """
+
+    def __init__(self, client, name):
+        self.name = name
+        self.method = getattr(client.service, name).method
+        soap = self.method.soap
+        if (soap.style != 'document' or not soap.input.body.wrapped or
+                soap.input.body.use != 'literal' or
+                not soap.output.body.wrapped):
+            raise Unsupported('{0} is not document/literal wrapped'
+                              .format(name))
+
+        binding = self.method.binding.input
+        self.params = [Field(element) for _, element
+                       in binding.param_defs(self.method)]
+        self.compile_request(binding)
+
+        result = self.method.binding.output.returned_types(self.method)
+        if len(result) != 1 or result[0].unbounded():
+            raise Unsupported('{0} does not return one object'.format(name))
+        self.result = Field(result[0])
+        if self.result.builtin is not None:
+            raise Unsupported('{0} returns a builtin'.format(name))
+        response = soap.output.body.parts[0].element
+        self.find_result = etree.XPath(
+            '/s:Envelope/s:Body[count(*) = 1]/r:{0}/*'.format(response[0]),
+            namespaces={'s': envns[1], 'r': response[1]})
+
+    def sample(self, field, markers):
+        """A value for the field with a marker in every element."""
+        if field.builtin is not None:
+            value = 'fastcodec{0}'.format(len(markers))
+            markers.append(value)
+        else:
+            value = Factory.object(field.type_name)
+            for child in field.fields:
+                setattr(value, child.name, self.sample(child, markers))
+        return [value] if field.many else value
+
+    def compile_request(self, binding):
+        markers = []
+        args = [self.sample(field, markers) for field in self.params]
+        envelope = binding.get_message(self.method, args, {})
+        envelope = envelope.plain().encode('utf-8')
+
+        # Take the names suds gives each element, prefixes and all.
+        root = etree.fromstring(envelope)
+        body = root.find('{%s}Body' % envns[1])
+        wrapper = body[0]
+        self.wrapper = self.qname(wrapper)
+        self.tag(self.params, wrapper)
+
+        start, end = '<%s>' % self.wrapper, '</%s>' % self.wrapper
+        self.head = envelope[:envelope.index(start)]
+        self.tail = envelope[envelope.rindex(end) + len(end):]
+        if self.encode(args) != envelope:
+            raise Unsupported('{0} does not match suds'.format(self.name))
+
+    def qname(self, element):
+        name = str(etree.QName(element).localname)
+        return '%s:%s' % (element.prefix, name) if element.prefix else name
+
+    def tag(self, fields, parent):
+        if len(parent) != len(fields):
+            raise Unsupported('{0} does not match suds'.format(self.name))
+        for field, element in zip(fields, parent):
+            if etree.QName(element).localname != field.name:
+                raise Unsupported('{0} does not match suds'.format(self.name))
+            field.tag = self.qname(element)
+            if field.fields is not None:
+                self.tag(field.fields, element)
+
+    def encode(self, args, kwargs=None):
+        kwargs = kwargs or {}
+        out = []
+        for k, field in enumerate(self.params):
+            value = args[k] if k < len(args) else kwargs.get(field.name)
+            self.render(field, value, out)
+
+        if not out:
+            return ''.join((self.head, '<%s/>' % self.wrapper, self.tail))
+        return ''.join([self.head, '<%s>' % self.wrapper] + out +
+                       ['</%s>' % self.wrapper, self.tail])
+
+    def render(self, field, value, out):
+        if isinstance(value, (list, tuple)):
+            if not field.many:
+                raise Unsupported(field.name)
+            for item in value:
+                if item is None or isinstance(item, (list, tuple)):
+                    raise Unsupported(field.name)
+                self.render_one(field, item, out)
+        elif value is None:
+            if not field.optional:
+                raise Unsupported(field.name)
+        else:
+            self.render_one(field, value, out)
+
+    def render_one(self, field, value, out):
+        if field.builtin is not None:
+            if isinstance(value, (Object, dict)):
+                raise Unsupported(field.name)
+            value = field.builtin.translate(value, False)
+            if not isinstance(value, Text):
+                value = Text(tostr(value))
+            text = value.escape().encode('utf-8')
+            out.append('<%s>%s</%s>' % (field.tag, text, field.tag))
+            return
+
+        if not isinstance(value, Object):
+            raise Unsupported(field.name)
+        if footprint(value) == 0:
+            if field.optional:
+                return
+            raise Unsupported(field.name)
+        for key in value.__keylist__:
+            if key not in field.by_name:
+                raise Unsupported(key)
+
+        start = len(out)
+        for child in field.fields:
+            self.render(child, getattr(value, child.name, None), out)
+        if len(out) == start:
+            out.append('<%s/>' % field.tag)
+        else:
+            out.insert(start, '<%s>' % field.tag)
+            out.append('</%s>' % field.tag)
+
+    def decode(self, message):
+        try:
+            doc = etree.fromstring(message, parser)
+        except Exception:
+            raise Unsupported('unable to parse the reply')
+        result = self.find_result(doc)
+        if len(result) != 1:
+            raise Unsupported('no result in the reply')
+        return self.read(self.result, result[0])
+
+    def read(self, field, element):
+        if element.attrib:
+            raise Unsupported(field.name)
+
+        if field.builtin is not None:
+            if len(element):
+                raise Unsupported(field.name)
+            text = element.text
+            if not text:
+                return None
+            if not text.strip():
+                raise Unsupported(field.name)
+            try:
+                return field.builtin.translate(Text(text))
+            except Exception:
+                raise Unsupported(field.name)
+
+        if not len(element) or (element.text and element.text.strip()):
+            raise Unsupported(field.name)
+        obj = Factory.object(field.type_name)
+        for child in element:
+            if not isinstance(child.tag, basestring):
+                raise Unsupported(field.name)
+            name = etree.QName(child).localname
+            if name not in field.by_name or hasattr(obj, name):
+                raise Unsupported(name)
+            if child.tail and child.tail.strip():
+                raise Unsupported(name)
+            setattr(obj, name, self.read(field.by_name[name], child))
+        return obj
+
+    def __call__(self, client, *args, **kwargs):
+        options = client.options
+        soap = sudsclient.SoapClient(client, self.method)
+        binding = self.method.binding.input
+        try:
+            if (options.plugins or options.prettyxml or options.retxml or
+                    not options.faults):
+                raise Unsupported('suds options')
+            message = self.encode(args, kwargs)
+        except Unsupported:
+            statsd.incr('solitude.bango.codec.fallback')
+            return getattr(client.service, self.name)(*args, **kwargs)
+
+        request = Request(soap.location(), message)
+        request.headers = soap.headers()
+        try:
+            reply = options.transport.send(request)
+        except TransportError, error:
+            if error.httpcode in (202, 204):
+                return None
+            return soap.failed(binding, error)
+
+        try:
+            return self.decode(reply.message)
+        except Unsupported:
+            statsd.incr('solitude.bango.codec.fallback')
+            return soap.succeeded(binding, reply.message)
+
+
+# Replies are parsed without looking anything up.
+parser = etree.XMLParser(resolve_entities=False, no_network=True)
+
+
+class Codecs(object):
+
+    """
+    A per-process cache of FastCodecs, keyed on the WSDL and the method. If a
+    method can't have a codec, that's kept too, as None.
+    """
+
+    def __init__(self):
+        self._codecs = {}
+
+    def get(self, client, name):
+        key = (client.wsdl.url, name)
+        if key not in self._codecs:
+            try:
+                self._codecs[key] = FastCodec(client, name)
+            except Exception:
+                log.exception('No fast codec for {0}, using suds'
+                              .format(name))
+                self._codecs[key] = None
+        return self._codecs[key]
+
+    def clear(self):
+        self._codecs.clear()
+
+
+codecs = Codecs()
+
+
+def service(client, name):
+    """
+    The method `name` of the suds client. If the method is in
+    BANGO_FAST_CODEC, this is its FastCodec.
+    """
+    if name in settings.BANGO_FAST_CODEC:
+        codec = codecs.get(client, name)
+        if codec is not None:
+            return functools.partial(codec, client)
+    return getattr(client.service, name)
 
 
 class Client(object):
@@ -145,25 +673,41 @@ class Client(object):
     def call(self, name, data, wsdl='exporter'):
         log.info('Bango client call: {0}, wsdl: {1}, package: {2}'
                  .format(name, wsdl, data.get('packageId', '<none>')))
-        client = self.client(wsdl)
-
-        package = client.factory.create(get_request(name))
+        package = prototypes.create(self, wsdl, get_request(name))
         for k, v in data.iteritems():
             setattr(package, k, v)
         package.username = settings.BANGO_AUTH.get('USER', '')
         package.password = settings.BANGO_AUTH.get('PASSWORD', '')
 
-        # Actually call Bango.
-        with statsd.timer('solitude.bango.request.%s' % name.lower()):
-            response = getattr(client.service, name)(package)
+        # Don't wait on a method that keeps failing, see solitude.breaker.
+        breaker = breakers.get('bango', name)
+        if not breaker.allow():
+            raise BangoError(SERVICE_UNAVAILABLE,
+                             'Not calling {0}, it is failing'.format(name))
 
-        self.is_error(response.responseCode, response.responseMessage)
+        # Actually call Bango.
+        client = self.client(wsdl)
+        client.set_options(timeout=breaker.timeout(settings.BANGO_TIMEOUT))
+        start = time()
+        try:
+            with statsd.timer('solitude.bango.request.%s' % name.lower()):
+                response = service(client, name)(package)
+            self.is_error(response.responseCode, response.responseMessage)
+        except Exception, error:
+            # Errors about the data mean Bango is working.
+            breaker.record(
+                not isinstance(error, BangoError) or
+                error.id in (INTERNAL_ERROR, SERVICE_UNAVAILABLE),
+                time() - start)
+            raise
+
+        breaker.record(False, time() - start)
         return response
 
     def client(self, name):
         # By default, WSDL files are cached but we use local files so we don't
-        # need that.
-        return sudsclient.Client(get_wsdl(name), cache=ReadOnlyCache())
+        # need that. The parsed client is cached for the life of the process.
+        return clients.get(name)
 
     def is_error(self, code, message):
         # Count the numbers of responses we get.
@@ -182,6 +726,65 @@ class Client(object):
             raise BangoUnanticipatedError(code, message)
 
 
+class Pool(object):
+
+    """
+    A per-process pool of keep-alive connections to BANGO_PROXY, so that each
+    SOAP call does not pay for a new TCP and TLS handshake.
+
+    If the pool has not been used for BANGO_POOL_MAX_AGE seconds, all its
+    connections are closed and a new pool is started, rather than risk
+    reusing a connection the other end has already dropped.
+    """
+
+    def __init__(self):
+        self._session = None
+        self._used = None
+        self._lock = threading.Lock()
+
+    def session(self):
+        with self._lock:
+            now = time()
+            if (self._session is not None and
+                    now - self._used > settings.BANGO_POOL_MAX_AGE):
+                log.info('Closing idle Bango connection pool')
+                statsd.incr('solitude.bango.pool.evict')
+                self._session.close()
+                self._session = None
+
+            if self._session is None:
+                self._session = requests.session(config={
+                    'keep_alive': True,
+                    'pool_connections': 1,
+                    'pool_maxsize': settings.BANGO_POOL_SIZE,
+                })
+
+            self._used = now
+            return self._session
+
+    def post(self, url, **kwargs):
+        session = self.session()
+        # A hit is a request that went out on a connection that was already
+        # open, a miss is one that had to open a new connection.
+        conn = session.poolmanager.connection_from_url(url)
+        before = conn.num_connections
+        try:
+            kwargs.setdefault('timeout', settings.BANGO_TIMEOUT)
+            return session.post(url, **kwargs)
+        finally:
+            statsd.incr('solitude.bango.pool.%s' %
+                        ('miss' if conn.num_connections > before else 'hit'))
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+pool = Pool()
+
+
 class Proxy(HttpTransport):
 
     def get_headers(self, url, headers):
@@ -192,10 +795,12 @@ class Proxy(HttpTransport):
         return filtered
 
     def send(self, request):
-        response = post(settings.BANGO_PROXY,
-                        data=request.message,
-                        headers=self.get_headers(request.url, request.headers),
-                        verify=False)
+        response = pool.post(settings.BANGO_PROXY,
+                             data=request.message,
+                             headers=self.get_headers(request.url,
+                                                      request.headers),
+                             timeout=self.options.timeout,
+                             verify=False)
         if response.status_code in FATAL_PROXY_STATUS_CODES:
             msg = ('Proxy returned: %s from: %s' %
                    (response.status_code, request.url))
@@ -208,8 +813,7 @@ class Proxy(HttpTransport):
 class ClientProxy(Client):
 
     def client(self, name):
-        return sudsclient.Client(get_wsdl(name), transport=Proxy(),
-                                 cache=ReadOnlyCache())
+        return clients.get(name, transport=Proxy)
 
 
 # Add in your mock method data here. If the method only returns a
@@ -298,7 +902,8 @@ class ClientMock(Client):
         """
         Returns result for a key. Data can be passed in to override mock_data.
         """
-        result = data or mock_data.get(key, {}).copy()
+        result = mock_data.get(key, {}).copy()
+        result.update(data or {})
         for key, value in (['responseCode', 'OK'], ['responseMessage', '']):
             if key not in result:
                 result[key] = value
@@ -319,18 +924,41 @@ def response_to_dict(resp):
     return dict((k, getattr(resp, k)) for k in resp.__keylist__)
 
 
+class MockResponse(object):
+
+    """
+    A suds like response for the mock client. It has the values as
+    attributes and their names in __keylist__, like a suds object, and raises
+    AttributeError for anything else. It's much cheaper to build and read
+    than a Mock, so load tests against the mock client measure solitude.
+    """
+    __slots__ = ('__keylist__', '_values')
+
+    def __init__(self, values):
+        self._values = values
+        self.__keylist__ = values.keys()
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __repr__(self):
+        return '<MockResponse {0!r}>'.format(self._values)
+
+
 def dict_to_mock(data, callables=False):
     """
-    Converts a dictionary into a suds like mock.
+    Converts a dictionary into a suds like MockResponse.
     callables: will call any value if its callable, default False.
     """
-    result = Mock()
-    result.__keylist__ = data.keys()
-    for k, v in data.iteritems():
-        if callables and callable(v):
-            v = v()
-        setattr(result, k, v)
-    return result
+    values = dict(data)
+    if callables:
+        for k, v in values.iteritems():
+            if callable(v):
+                values[k] = v()
+    return MockResponse(values)
 
 
 def get_client():
@@ -11,7 +11,7 @@ import mobile_codes
 from django_statsd.clients import statsd
 from lxml import etree
 
-from lib.bango.client import get_client
+from lib.bango.client import get_client, service
 from lib.bango.constants import (COUNTRIES, CURRENCIES, INVALID_PERSON, OK,
                                  RATINGS, RATINGS_SCHEME,
                                  VAT_NUMBER_DOES_NOT_EXIST)
@@ -292,7 +292,7 @@ class NotificationForm(forms.Form):
         """
         cli = get_client().client('token_checker')
         with statsd.timer('solitude.bango.request.checktoken'):
-            true_data = cli.service.CheckToken(token=tok)
+            true_data = service(cli, 'CheckToken')(token=tok)
         if true_data.ResponseCode is None:
             # Any None field means the token was invalid.
             # This might happen if someone tampered with Token= itself in the
@@ -0,0 +1,140 @@
+from collections import namedtuple
+from optparse import make_option
+from time import time
+
+from django.core.management.base import BaseCommand
+
+from suds.transport import Reply
+
+from lib.bango.client import (
+    ClientProxy, clients, get_client, prototypes, Proxy)
+from lib.bango.views.billing import prepare
+
+billing_response = """<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+    <s:Body>
+        <CreateBillingConfigurationResponse
+            xmlns="com.bango.webservices.billingconfiguration">
+            <CreateBillingConfigurationResult>
+                <responseCode>OK</responseCode>
+                <responseMessage>Success</responseMessage>
+                <billingConfigurationId>1234</billingConfigurationId>
+            </CreateBillingConfigurationResult>
+        </CreateBillingConfigurationResponse>
+    </s:Body>
+</s:Envelope>"""
+
+billing_data = {
+    'bango': '1234',
+    'externalTransactionId': 'solitude:benchmark',
+    'pageTitle': 'benchmark',
+}
+
+Price = namedtuple('Price', 'cleaned_data')
+
+
+class Form(object):
+
+    """Just enough of a CreateBillingConfigurationForm for prepare()."""
+
+    def __init__(self, prices):
+        self.cleaned_data = {'prices': [
+            Price({'price': '0.99', 'currency': currency, 'method': '1'})
+            # Each currency is only sent once, so they all differ.
+            for currency in ('C%02d' % x for x in range(prices))]}
+        self.bango_data = billing_data.copy()
+        self.bango_data.update({
+            'application_size': 1,
+            'icon_url': 'https://example.com/icon.png',
+            'redirect_url_onerror': 'https://example.com/error',
+            'redirect_url_onsuccess': 'https://example.com/success',
+            'user_uuid': 'benchmark',
+        })
+
+
+class CannedProxy(Proxy):
+
+    """A transport that replies with a canned response, no network."""
+
+    def send(self, request):
+        return Reply(200, {}, billing_response)
+
+
+class BenchmarkClient(ClientProxy):
+
+    def client(self, name):
+        return clients.get(name, transport=CannedProxy)
+
+
+def timed(func, iterations, before=None):
+    results = []
+    for x in range(iterations):
+        if before:
+            before()
+        start = time()
+        func()
+        results.append((time() - start) * 1000)
+    return results
+
+
+class Command(BaseCommand):
+
+    """
+    Times Client.call('CreateBillingConfiguration') with and without a
+    cached suds client. The transport returns a canned response so this only
+    measures the work done in solitude and suds, not the trip to Bango.
+
+    Then times prepare() for 1, 10 and 50 prices, building the suds objects
+    from the schema each time and cloning them from prototypes.
+    """
+
+    help = 'Benchmark cold and warm Bango client calls.'
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--iterations',
+            dest='iterations',
+            type='int',
+            default=20,
+            help='Number of calls to time for each run. Default: 20'
+        ),
+    )
+
+    def report(self, name, results):
+        results = sorted(results)
+        self.stdout.write(
+            '{0}: mean {1:.2f}ms, median {2:.2f}ms, max {3:.2f}ms'
+            .format(name, sum(results) / len(results),
+                    results[len(results) / 2], results[-1]))
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        client = BenchmarkClient()
+        call = lambda: client.call('CreateBillingConfiguration',
+                                   billing_data.copy(), wsdl='billing')
+
+        # Cold: every call has to parse the WSDL and build the client.
+        cold = timed(call, iterations, before=clients.clear)
+        # Warm: the client is built once and then reused.
+        call()
+        warm = timed(call, iterations)
+
+        self.report('cold', cold)
+        self.report('warm', warm)
+
+        # Builds each suds object from the schema with one factory, as if
+        # there weren't any prototypes.
+        factory = get_client().client('billing').factory
+        uncached = lambda client, name, type_name: factory.create(type_name)
+
+        for prices in (1, 10, 50):
+            run = lambda: prepare(Form(prices), '1234')
+            prototypes.create = uncached
+            try:
+                built = timed(run, iterations)
+            finally:
+                del prototypes.create
+            run()
+            cloned = timed(run, iterations)
+
+            self.report('prepare {0} prices, built'.format(prices), built)
+            self.report('prepare {0} prices, cloned'.format(prices), cloned)
@@ -1,12 +1,12 @@
-from django.core.urlresolvers import reverse
-
 from rest_framework import serializers
 
 from lib.bango.models import Status
-from lib.sellers.models import Seller, SellerBango, SellerProductBango
+from lib.sellers.models import (
+    Seller, SellerBango, SellerProductBango, sellers)
 from lib.transactions.models import Transaction
 from solitude.base import BaseSerializer
 from solitude.related_fields import PathRelatedField
+from solitude.uris import reverse
 
 # Serializers are for serializing solitude data, basically models
 # in all their different ways.
@@ -51,10 +51,15 @@ class SellerBangoOnly(serializers.Serializer):
         queryset=SellerBango.objects.filter())
 
 
+class CachedPathRelatedField(PathRelatedField):
+    row_cache = sellers
+
+
 class SellerProductBangoOnly(serializers.Serializer):
-    seller_product_bango = PathRelatedField(
+    # Used on every Bango purchase.
+    seller_product_bango = CachedPathRelatedField(
         view_name='bango:product-detail', required=True,
-        queryset=SellerProductBango.objects.filter())
+        queryset=SellerProductBango.objects.select_related('seller_bango'))
 
 
 class RefundSerializer(BaseSerializer):
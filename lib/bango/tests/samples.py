@@ -111,6 +111,69 @@ package_response = """<?xml version="1.0" encoding="utf-8"?>
     </soap:Body>
 </soap:Envelope>"""
 
+billing_response = """<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+    <s:Body>
+        <CreateBillingConfigurationResponse
+            xmlns="com.bango.webservices.billingconfiguration">
+            <CreateBillingConfigurationResult>
+                <responseCode>OK</responseCode>
+                <responseMessage>Success</responseMessage>
+                <billingConfigurationId>1234</billingConfigurationId>
+            </CreateBillingConfigurationResult>
+        </CreateBillingConfigurationResponse>
+    </s:Body>
+</s:Envelope>"""
+
+refund_status_response = """<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+    <s:Body>
+        <GetRefundStatusResponse xmlns="com.bango.webservices.directbilling">
+            <GetRefundStatusResult>
+                <responseCode>PENDING</responseCode>
+                <responseMessage>Refund pending</responseMessage>
+            </GetRefundStatusResult>
+        </GetRefundStatusResponse>
+    </s:Body>
+</s:Envelope>"""
+
+check_token_response = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
+               xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+               xmlns:xsd="http://www.w3.org/2001/XMLSchema">
+    <soap:Body>
+        <CheckTokenResponse xmlns="https://mozilla.bango.net/">
+            <CheckTokenResult>
+                <ResponseMessage>Success</ResponseMessage>
+                <ResponseCode>OK</ResponseCode>
+                <Signature>c2lnbmF0dXJl&amp;</Signature>
+                <MerchantTransactionId>webpay:1234</MerchantTransactionId>
+                <BangoUserId>5678</BangoUserId>
+                <BangoTransactionId>1234</BangoTransactionId>
+                <Price>0.99</Price>
+                <Currency>USD</Currency>
+                <TransactionMethod>
+                    <networkId xmlns="com.bango.webservices.directbilling"
+                        >310260</networkId>
+                    <paymentMethodId
+                        xmlns="com.bango.webservices.directbilling"
+                        >OPERATOR</paymentMethodId>
+                </TransactionMethod>
+            </CheckTokenResult>
+        </CheckTokenResponse>
+    </soap:Body>
+</soap:Envelope>"""
+
+fault_response = """<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+    <s:Body>
+        <s:Fault>
+            <faultcode>s:Server</faultcode>
+            <faultstring>Server was unable to process request.</faultstring>
+        </s:Fault>
+    </s:Body>
+</s:Envelope>"""
+
 sample_request = """<SOAP-ENV:Envelope
     xmlns:ns0="com.bango.webservices.mozillaexporter"
     xmlns:ns1="http://schemas.xmlsoap.org/soap/envelope/"
@@ -1,21 +1,31 @@
 # -*- coding: utf-8 -*-
 import os
+import tempfile
+from decimal import Decimal
 
 from django import test
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.test.utils import override_settings
 
 import mock
 from nose.tools import eq_, raises
+from suds import WebFault
+from suds.client import SoapClient
 from suds.options import Options
 from suds.reader import Reader
+from suds.sudsobject import Object
 
 import samples
-from ..client import (Client, ClientMock, ClientProxy, dict_to_mock,
-                      get_client, get_request, get_wsdl, Proxy, ReadOnlyCache,
-                      response_to_dict)
-from ..constants import ACCESS_DENIED, OK, WSDL_MAP
-from ..errors import AuthError, BangoError, ProxyError
+from ..client import (Client, ClientCache, ClientMock, ClientProxy,
+                      client_wsdls, clone, codecs, dict_to_mock, FastCodec,
+                      get_client, get_request, get_wsdl, Pool, Prototypes,
+                      Proxy, read_schema, ReadOnlyCache, response_to_dict,
+                      schemas, service, Unsupported, write_schema)
+from ..constants import ACCESS_DENIED, OK, SERVICE_UNAVAILABLE, WSDL_MAP
+from ..errors import (AuthError, BangoError, BangoUnanticipatedError,
+                      ProxyError)
+from solitude.breaker import breakers
 
 
 class TestClient(test.TestCase):
@@ -30,13 +40,15 @@ class TestClient(test.TestCase):
 
     @mock.patch.object(ClientMock, 'mock_results')
     def test_auth_failure(self, mock_results):
-        mock_results.return_value = {'responseCode': ACCESS_DENIED}
+        mock_results.return_value = {'responseCode': ACCESS_DENIED,
+                                     'responseMessage': ''}
         with self.assertRaises(AuthError):
             self.client.CreatePackage(samples.good_address)
 
     @mock.patch.object(ClientMock, 'mock_results')
     def test_failure(self, mock_results):
-        mock_results.return_value = {'responseCode': 'wat'}
+        mock_results.return_value = {'responseCode': 'wat',
+                                     'responseMessage': ''}
         with self.assertRaises(BangoError):
             self.client.CreatePackage(samples.good_address)
 
@@ -87,7 +99,7 @@ class TestProxy(test.TestCase):
         self.bango = ClientProxy()
         self.url = 'http://foo.com'
 
-    @mock.patch('lib.bango.client.post')
+    @mock.patch('lib.bango.client.pool.post')
     def test_call(self, post):
         resp = mock.Mock()
         resp.status_code = 200
@@ -102,7 +114,7 @@ class TestProxy(test.TestCase):
         eq_(args[1]['headers']['x-solitude-service'],
             'https://webservices.test.bango.org/mozillaexporter/service.asmx')
 
-    @mock.patch('lib.bango.client.post')
+    @mock.patch('lib.bango.client.pool.post')
     def test_failure(self, post):
         resp = mock.Mock()
         resp.status_code = 500
@@ -112,7 +124,7 @@ class TestProxy(test.TestCase):
             with self.assertRaises(ProxyError):
                 self.bango.MakePremiumPerAccess(samples.good_make_premium)
 
-    @mock.patch('lib.bango.client.post')
+    @mock.patch('lib.bango.client.pool.post')
     def test_ok(self, post):
         resp = mock.Mock()
         resp.status_code = 200
@@ -132,6 +144,99 @@ class TestProxy(test.TestCase):
              'x-solitude-service': 'http://foo.com'})
 
 
+@override_settings(BREAKERS=True, BREAKER_MIN_CALLS=2, BANGO_TIMEOUT=30,
+                   BANGO_PROXY='http://foo.com')
+class TestBreaker(test.TestCase):
+
+    def setUp(self):
+        breakers.clear()
+        self.bango = ClientProxy()
+
+    def respond(self, post, status_code, content=''):
+        post.return_value = mock.Mock(status_code=status_code,
+                                      content=content)
+
+    @mock.patch('lib.bango.client.pool.post')
+    def test_timeout(self, post):
+        self.respond(post, 200, samples.premium_response)
+        self.bango.MakePremiumPerAccess(samples.good_make_premium)
+        eq_(post.call_args[1]['timeout'], 30)
+
+    @mock.patch('lib.bango.client.pool.post')
+    def test_open(self, post):
+        self.respond(post, 500)
+        for x in range(2):
+            with self.assertRaises(ProxyError):
+                self.bango.MakePremiumPerAccess(samples.good_make_premium)
+
+        post.reset_mock()
+        with self.assertRaises(BangoError) as error:
+            self.bango.MakePremiumPerAccess(samples.good_make_premium)
+        eq_(error.exception.id, SERVICE_UNAVAILABLE)
+        assert not post.called
+
+    @mock.patch.object(ClientProxy, 'is_error')
+    @mock.patch('lib.bango.client.pool.post')
+    def test_data_errors(self, post, is_error):
+        self.respond(post, 200, samples.premium_response)
+        is_error.side_effect = BangoUnanticipatedError('NOPE', 'Nope')
+        for x in range(3):
+            with self.assertRaises(BangoUnanticipatedError):
+                self.bango.MakePremiumPerAccess(samples.good_make_premium)
+
+
+class TestPool(test.TestCase):
+
+    def setUp(self):
+        self.pool = Pool()
+        self.url = 'http://foo.com'
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_reused(self):
+        eq_(self.pool.session(), self.pool.session())
+
+    def test_size(self):
+        with self.settings(BANGO_POOL_SIZE=3):
+            session = self.pool.session()
+        eq_(session.config['pool_maxsize'], 3)
+        assert session.config['keep_alive']
+
+    @mock.patch('lib.bango.client.time')
+    def test_evicted(self, time):
+        time.return_value = 0
+        session = self.pool.session()
+        with mock.patch.object(session, 'close') as close:
+            with self.settings(BANGO_POOL_MAX_AGE=60):
+                time.return_value = 30
+                eq_(self.pool.session(), session)
+                time.return_value = 100
+                assert self.pool.session() != session
+            assert close.called
+
+    @mock.patch('lib.bango.client.statsd')
+    @mock.patch('requests.sessions.Session.post')
+    def test_hit(self, post, statsd):
+        with self.settings(BANGO_TIMEOUT=5):
+            self.pool.post(self.url, data='foo')
+        eq_(post.call_args[1]['timeout'], 5)
+        statsd.incr.assert_called_with('solitude.bango.pool.hit')
+
+    @mock.patch('lib.bango.client.statsd')
+    @mock.patch('requests.sessions.Session.post')
+    def test_miss(self, post, statsd):
+        conn = (self.pool.session().poolmanager
+                .connection_from_url(self.url))
+
+        def connect(*args, **kwargs):
+            conn.num_connections += 1
+
+        post.side_effect = connect
+        self.pool.post(self.url, data='foo')
+        statsd.incr.assert_called_with('solitude.bango.pool.miss')
+
+
 def test_convert_data():
     data = {'foo': 'bar'}
     eq_(data, response_to_dict(dict_to_mock(data)))
@@ -143,6 +248,18 @@ def test_callable():
     assert not callable(dict_to_mock(data, callables=True).foo)
 
 
+@raises(AttributeError)
+def test_mock_missing():
+    dict_to_mock({'foo': 'bar'}).bar
+
+
+def test_mock_results_override():
+    results = ClientMock().mock_results('CreatePackage',
+                                        data={'responseCode': 'wat'})
+    eq_(results['responseCode'], 'wat')
+    assert 'packageId' in results
+
+
 class TestRequest(test.TestCase):
 
     def test_mapping(self):
@@ -189,3 +306,275 @@ class TestBangoWSDL(test.TestCase):
             with self.settings(BANGO_ENV=env):
                 for wsdl_name in mapping.keys():
                     cli.client(wsdl_name)
+
+
+class TestClientCache(test.TestCase):
+
+    def setUp(self):
+        self.cache = ClientCache()
+
+    @mock.patch('lib.bango.client.sudsclient.Client')
+    def test_built_once(self, suds):
+        self.cache.get('billing')
+        self.cache.get('billing')
+        eq_(suds.call_count, 1)
+
+    def test_clones(self):
+        first = self.cache.get('billing')
+        second = self.cache.get('billing')
+        assert first is not second
+        assert first.wsdl is second.wsdl
+        assert first.options is not second.options
+
+    @mock.patch('lib.bango.client.sudsclient.Client')
+    def test_keys(self, suds):
+        self.cache.get('billing')
+        self.cache.get('exporter')
+        self.cache.get('billing', transport=Proxy)
+        with self.settings(BANGO_ENV='prod'):
+            self.cache.get('billing')
+        eq_(suds.call_count, 4)
+
+    def test_transport(self):
+        client = self.cache.get('billing', transport=Proxy)
+        assert isinstance(client.options.transport, Proxy)
+
+    @mock.patch('lib.bango.client.sudsclient.Client')
+    def test_clear(self, suds):
+        self.cache.get('billing')
+        self.cache.clear()
+        self.cache.get('billing')
+        eq_(suds.call_count, 2)
+
+
+class TestPrototypes(test.TestCase):
+
+    def setUp(self):
+        self.prototypes = Prototypes()
+        self.client = get_client()
+
+    def test_built_once(self):
+        with mock.patch.object(self.prototypes, 'build',
+                               wraps=self.prototypes.build) as build:
+            self.prototypes.create(self.client, 'billing', 'Price')
+            self.prototypes.create(self.client, 'billing', 'Price')
+        eq_(build.call_count, 1)
+
+    def test_keys(self):
+        with mock.patch.object(self.prototypes, 'build',
+                               wraps=self.prototypes.build) as build:
+            self.prototypes.create(self.client, 'billing', 'Price')
+            self.prototypes.create(self.client, 'billing', 'ArrayOfPrice')
+            with self.settings(BANGO_ENV='prod'):
+                self.prototypes.create(self.client, 'billing', 'Price')
+        eq_(build.call_count, 3)
+
+    def test_independent(self):
+        first = self.prototypes.create(self.client, 'billing', 'ArrayOfPrice')
+        first.Price.append('1')
+        second = self.prototypes.create(self.client, 'billing',
+                                        'ArrayOfPrice')
+        eq_(second.Price, [])
+
+    def test_clone(self):
+        factory = self.client.client('billing').factory
+        price = factory.create('Price')
+        price.amount = 1
+        copy = clone(price)
+        copy.amount = 2
+        eq_(price.amount, 1)
+        eq_(copy.__class__, price.__class__)
+        assert copy.__metadata__ is price.__metadata__
+        eq_(copy.__keylist__, price.__keylist__)
+        assert copy.__keylist__ is not price.__keylist__
+
+
+def fields(obj):
+    """The class, names, types and values of a suds object and its fields."""
+    if isinstance(obj, Object):
+        return (obj.__class__.__name__,
+                [(k, type(getattr(obj, k)), fields(getattr(obj, k)))
+                 for k in obj.__keylist__])
+    return obj
+
+
+class TestFastCodec(test.TestCase):
+
+    """
+    The fast codec has to send and return exactly what suds does.
+    """
+
+    def setUp(self):
+        codecs.clear()
+        self.bango = ClientProxy()
+        self.url = 'http://foo.com'
+
+    def codec(self, wsdl, name):
+        client = self.bango.client(wsdl)
+        return client, codecs.get(client, name)
+
+    def request(self, wsdl, name, *args, **kwargs):
+        client, codec = self.codec(wsdl, name)
+        method = codec.method
+        expected = method.binding.input.get_message(method, list(args),
+                                                    kwargs)
+        eq_(codec.encode(args, kwargs), expected.plain().encode('utf-8'))
+
+    def reply(self, wsdl, name, reply):
+        client, codec = self.codec(wsdl, name)
+        expected = SoapClient(client, codec.method).succeeded(
+            codec.method.binding.input, reply)
+        eq_(fields(codec.decode(reply)), fields(expected))
+
+    def package(self, wsdl, name, **data):
+        package = self.bango.client(wsdl).factory.create(get_request(name))
+        package.username = 'Mozilla'
+        package.password = ''
+        for k, v in data.items():
+            setattr(package, k, v)
+        return package
+
+    def test_billing_request(self):
+        factory = self.bango.client('billing').factory
+        prices = factory.create('ArrayOfPrice')
+        for item in samples.good_billing_request['prices']:
+            price = factory.create('Price')
+            price.amount = Decimal(item['price'])
+            price.currency = item['currency']
+            prices.Price.append(price)
+        types = factory.create('ArrayOfString')
+        types.string = ['OPERATOR', 'CARD']
+        config = factory.create('ArrayOfBillingConfigurationOption')
+        for k, v in (('APPLICATION_SIZE_KB', 1), ('MOZ_USER_ID', u'\xe9')):
+            option = factory.create('BillingConfigurationOption')
+            option.configurationOptionName = k
+            option.configurationOptionValue = v
+            config.BillingConfigurationOption.append(option)
+
+        self.request('billing', 'CreateBillingConfiguration', self.package(
+            'billing', 'CreateBillingConfiguration', bango='1',
+            externalTransactionId='webpay:1', priceList=prices,
+            pageTitle=samples.good_billing_request['pageTitle'],
+            typeFilter=types, configurationOptions=config))
+
+    def test_billing_empty(self):
+        factory = self.bango.client('billing').factory
+        prices = factory.create('ArrayOfPrice')
+        prices.Price.append(factory.create('Price'))
+        self.request('billing', 'CreateBillingConfiguration', self.package(
+            'billing', 'CreateBillingConfiguration', priceList=prices))
+        self.request('billing', 'CreateBillingConfiguration', None)
+
+    def test_refund_status_request(self):
+        self.request('direct', 'GetRefundStatus', self.package(
+            'direct', 'GetRefundStatus',
+            refundTransactionId='<&"\'> &amp;'))
+
+    def test_check_token_request(self):
+        self.request('token_checker', 'CheckToken', token='some:token')
+        self.request('token_checker', 'CheckToken')
+
+    def test_billing_reply(self):
+        self.reply('billing', 'CreateBillingConfiguration',
+                   samples.billing_response)
+
+    def test_refund_status_reply(self):
+        self.reply('direct', 'GetRefundStatus',
+                   samples.refund_status_response)
+
+    def test_check_token_reply(self):
+        self.reply('token_checker', 'CheckToken',
+                   samples.check_token_response)
+
+    def test_check_token_empty(self):
+        self.reply('token_checker', 'CheckToken',
+                   samples.check_token_response
+                   .replace('<ResponseCode>OK</ResponseCode>',
+                            '<ResponseCode />'))
+
+    def test_unsupported(self):
+        client, codec = self.codec('direct', 'GetRefundStatus')
+        with self.assertRaises(Unsupported):
+            codec.encode([{'refundTransactionId': '1'}])
+        with self.assertRaises(Unsupported):
+            codec.decode(samples.fault_response)
+        with self.assertRaises(Unsupported):
+            codec.decode(samples.refund_status_response.replace(
+                '<responseCode>', '<responseCode xsi:nil="true">'))
+
+    @mock.patch('lib.bango.client.pool.post')
+    def call(self, name, data, reply, post, fast=True):
+        post.return_value = mock.Mock(status_code=200, content=reply)
+        with self.settings(BANGO_PROXY=self.url,
+                           BANGO_FAST_CODEC=[name] if fast else []):
+            res = getattr(self.bango, name)(data)
+        return res, post.call_args
+
+    def test_call(self):
+        name = 'CreateBillingConfiguration'
+        data = {'bango': '1', 'pageTitle': 'wat!'}
+        expected, expected_args = self.call(
+            name, data, samples.billing_response, fast=False)
+        with mock.patch.object(FastCodec, 'decode',
+                               wraps=self.codec('billing', name)[1].decode
+                               ) as decode:
+            res, args = self.call(name, data, samples.billing_response)
+        assert decode.called
+        eq_(args, expected_args)
+        eq_(fields(res), fields(expected))
+
+    @mock.patch('lib.bango.client.statsd')
+    def test_call_fault(self, statsd):
+        with self.assertRaises(WebFault):
+            self.call('CreateBillingConfiguration', {'bango': '1'},
+                      samples.fault_response)
+        statsd.incr.assert_any_call('solitude.bango.codec.fallback')
+
+    def test_service(self):
+        client = self.bango.client('token_checker')
+        with self.settings(BANGO_FAST_CODEC=[]):
+            eq_(service(client, 'CheckToken').method.name, 'CheckToken')
+        with self.settings(BANGO_FAST_CODEC=['CheckToken']):
+            assert isinstance(service(client, 'CheckToken').func, FastCodec)
+
+
+class TestSchema(test.TestCase):
+
+    def setUp(self):
+        schemas.clear()
+        self.addCleanup(schemas.clear)
+
+    def test_up_to_date(self):
+        # If this fails, run: ./manage.py refresh_wsdl --schema-only
+        for env in WSDL_MAP:
+            assert read_schema(env), env
+
+    @mock.patch('lib.bango.client.schema_path')
+    def test_missing(self, schema_path):
+        schema_path.return_value = '/does/not/exist'
+        eq_(read_schema('test'), None)
+
+    @mock.patch('lib.bango.client.SCHEMA_VERSION', 0)
+    def test_stale(self):
+        eq_(read_schema('test'), None)
+
+    @mock.patch('lib.bango.client.schema_path')
+    def test_write(self, schema_path):
+        schema_path.return_value = tempfile.mkstemp()[1]
+        self.addCleanup(os.remove, schema_path.return_value)
+        write_schema('test')
+        eq_(sorted(read_schema('test').keys()),
+            sorted(WSDL_MAP['test'][name]['file'] for name in client_wsdls))
+
+    def test_definitions(self):
+        assert ReadOnlyCache().has_definitions(get_wsdl('billing'))
+        client = ClientCache().build('billing')
+        eq_(client.options.cachingpolicy, 1)
+        client.factory.create('ArrayOfPrice')
+
+    def test_fallback(self):
+        schemas[settings.BANGO_ENV] = None
+        assert not ReadOnlyCache().has_definitions(get_wsdl('billing'))
+        client = ClientCache().build('billing')
+        eq_(client.options.cachingpolicy, 0)
+        client.factory.create('ArrayOfPrice')
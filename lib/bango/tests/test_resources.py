@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import contextlib
-from hashlib import md5
+import time
 
 from django import test
 from django.conf import settings
@@ -29,6 +29,7 @@ from lib.transactions.constants import (PROVIDER_BANGO, PROVIDER_REFERENCE,
                                         STATUS_PENDING, TYPE_REFUND,
                                         TYPE_REFUND_MANUAL)
 from lib.transactions.models import Transaction
+from solitude.atomic import depth
 from solitude.base import APITest
 from solitude.constants import PAYMENT_METHOD_ALL, PAYMENT_METHOD_OPERATOR
 
@@ -106,11 +107,13 @@ class TestLoginResource(BangoAPI):
             'GetEmailAddresses': {
                 'adminEmailAddress': 'admin@example.org',
                 'adminPersonId': 1234,
-                'responseCode': 'OK'
+                'responseCode': 'OK',
+                'responseMessage': ''
             },
             'GetAutoAuthenticationLoginToken': {
                 'authenticationToken': 'foo',
-                'responseCode': 'OK'
+                'responseCode': 'OK',
+                'responseMessage': ''
             }
         }
         result.update(self.overrides)
@@ -155,6 +158,38 @@ class TestPackageResource(BangoAPI):
         seller_bango = SellerBango.objects.get()
         eq_(res.json['resource_pk'], seller_bango.pk)
 
+    def test_create_outside_transaction(self):
+        outer = depth()
+        inner = []
+        mock_results = ClientMock.mock_results.im_func
+
+        def results(self, *args, **kw):
+            inner.append(depth())
+            return mock_results(self, *args, **kw)
+
+        with mock.patch.object(ClientMock, 'mock_results', results):
+            res = self.client.post(self.list_url, data=self.good_data())
+        eq_(res.status_code, 201, res.content)
+        eq_(inner, [outer])
+
+    def test_patch_outside_transaction(self):
+        self.create()
+        outer = depth()
+        inner = []
+        mock_results = ClientMock.mock_results.im_func
+
+        def results(self, *args, **kw):
+            inner.append(depth())
+            return mock_results(self, *args, **kw)
+
+        # One thread, so the calls are made on the request's connection.
+        with self.settings(BANGO_CONCURRENCY=1):
+            with mock.patch.object(ClientMock, 'mock_results', results):
+                res = self.client.patch(self.package_uri,
+                                        data=self.patch_data())
+        eq_(res.status_code, 201, res.content)
+        eq_(inner, [outer] * 4)
+
     @mock.patch.object(ClientMock, 'call')
     def test_insert(self, call):
         with self.settings(BANGO_INSERT_STAGE='STAGE '):
@@ -295,9 +330,9 @@ class TestPackageResource(BangoAPI):
         self.create()
         res = self.client.patch(self.package_uri, data=data)
         eq_(res.status_code, 201, res.content)
-        eq_([c[0][0] for c in mock_results.call_args_list],
-            ['UpdateFinanceEmailAddress', 'UpdateSupportEmailAddress',
-             'UpdateAddressDetails', 'DeleteVATNumber'])
+        eq_(sorted(c[0][0] for c in mock_results.call_args_list),
+            ['DeleteVATNumber', 'UpdateAddressDetails',
+             'UpdateFinanceEmailAddress', 'UpdateSupportEmailAddress'])
 
     @mock.patch.object(ClientMock, 'mock_results')
     def test_methods_called(self, mock_results):
@@ -305,9 +340,49 @@ class TestPackageResource(BangoAPI):
         self.create()
         res = self.client.patch(self.package_uri, data=self.patch_data())
         eq_(res.status_code, 201, res.content)
-        eq_([c[0][0] for c in mock_results.call_args_list],
-            ['UpdateFinanceEmailAddress', 'UpdateSupportEmailAddress',
-             'UpdateAddressDetails', 'SetVATNumber'])
+        eq_(sorted(c[0][0] for c in mock_results.call_args_list),
+            ['SetVATNumber', 'UpdateAddressDetails',
+             'UpdateFinanceEmailAddress', 'UpdateSupportEmailAddress'])
+
+    def test_patch_concurrent(self):
+        latency = {'UpdateFinanceEmailAddress': 0.2,
+                   'UpdateSupportEmailAddress': 0.3,
+                   'UpdateAddressDetails': 0.2,
+                   'SetVATNumber': 0.1}
+        call = ClientMock.call.im_func
+
+        def slow(self, name, *args, **kw):
+            time.sleep(latency[name])
+            return call(self, name, *args, **kw)
+
+        self.create()
+        with mock.patch.object(ClientMock, 'call', slow):
+            start = time.time()
+            res = self.client.patch(self.package_uri,
+                                    data=self.patch_data())
+            taken = time.time() - start
+        eq_(res.status_code, 201, res.content)
+        # Roughly the slowest call, rather than the 0.8s of all of them.
+        ok_(taken < 0.5, taken)
+
+    @mock.patch.object(ClientMock, 'mock_results')
+    def test_patch_errors(self, mock_results):
+        def error(*args, **kwargs):
+            if args[0] in ('UpdateSupportEmailAddress', 'SetVATNumber'):
+                return {'responseCode': args[0].upper(),
+                        'responseMessage': 'blah'}
+            return self.ok()
+
+        mock_results.side_effect = error
+        self.create()
+        old_finance = self.seller_bango.finance_person_id
+
+        res = self.client.patch(self.package_uri, data=self.patch_data())
+        eq_(res.status_code, 400, res.content)
+        # The error of the first form is returned and nothing is stored.
+        eq_(res.json['__bango__'], 'UPDATESUPPORTEMAILADDRESS')
+        eq_(self.seller_bango.reget().finance_person_id, old_finance)
+        eq_(len(mock_results.call_args_list), 4)
 
     def test_get_full(self):
         self.create()
@@ -906,6 +981,12 @@ class TestResource(test.TestCase):
         res = self.res.get_client({'fake_response': {'responseCode': 'foo'}})
         eq_(res.mock_results('foo')['responseCode'], 'foo')
 
+    @mock.patch.object(settings, 'BANGO_FAKE_REFUNDS', True)
+    def test_faked_defaults(self):
+        res = self.res.get_client({'fake_response': {'responseCode': OK}})
+        # The rest of the response is the default one.
+        ok_(res.DoRefund({}).refundTransactionId)
+
 
 class TestStatus(SellerProductBangoBase):
 
@@ -925,13 +1006,10 @@ class TestStatus(SellerProductBangoBase):
         ok_(serializer.is_valid())
 
     def test_etags(self):
-        status = Status.objects.create(
-            seller_product_bango=self.seller_product_bango)
+        Status.objects.create(seller_product_bango=self.seller_product_bango)
         res = self.client.get(self.url)
         eq_(res.status_code, 200)
         assert 'etag' in res._headers
-        eq_(md5(status.etag).hexdigest(),
-            res._headers['etag'][1][1:-1])
         etag = res._headers['etag'][1][1:-1]
         res = self.client.get(self.url,
                               HTTP_IF_NONE_MATCH=etag)
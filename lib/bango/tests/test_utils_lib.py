@@ -1,11 +1,13 @@
 import os
 import tempfile
+import time
 
 from django import test
 
-from nose.tools import raises
+from nose.tools import eq_, ok_, raises
 
-from lib.bango.utils import sign, terms, terms_directory, verify_sig
+from lib.bango.utils import (
+    concurrently, sign, terms, terms_directory, verify_sig)
 
 
 class TestSigning(test.TestCase):
@@ -51,3 +53,33 @@ class TestTerms(test.TestCase):
 
     def test_fallback(self):
         assert 'Bango Developer Terms' in terms('sbi', language='de')
+
+
+class TestConcurrently(test.TestCase):
+
+    def sleep(self, value):
+        def func():
+            time.sleep(0.1)
+            if isinstance(value, Exception):
+                raise value
+            return value
+        return func
+
+    def test_results(self):
+        results = concurrently([self.sleep(1), self.sleep(KeyError()),
+                                self.sleep(3)], 3)
+        eq_([result for result, exc_info in results], [1, None, 3])
+        eq_(results[1][1][0], KeyError)
+
+    def test_at_once(self):
+        start = time.time()
+        concurrently([self.sleep(1)] * 4, 4)
+        ok_(time.time() - start < 0.3)
+
+    def test_bounded(self):
+        start = time.time()
+        concurrently([self.sleep(1)] * 4, 2)
+        ok_(time.time() - start >= 0.2)
+
+    def test_none(self):
+        eq_(concurrently([], 4), [])
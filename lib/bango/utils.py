@@ -2,12 +2,18 @@ import functools
 import hashlib
 import hmac
 import os
+import Queue
+import sys
+import threading
 
 from django.conf import settings
 from django.template.loader import render_to_string
 
 from aesfield.default import lookup
 
+from solitude.middleware import (
+    get_oauth_key, get_transaction_id, set_oauth_key, set_transaction_id)
+
 terms_directory = 'lib/bango/templates/bango/terms'
 
 
@@ -45,3 +51,43 @@ def terms(sbi, language='en-US'):
 
     return render_to_string('bango/terms-layout.html',
                             {'sbi': sbi, 'terms': full(template)})
+
+
+def concurrently(funcs, size):
+    """
+    Calls each of funcs with no arguments on up to `size` threads. Returns a
+    (result, exc_info) pair for each function, in the same order. exc_info is
+    None if the function returned.
+    """
+    results = [None] * len(funcs)
+    queue = Queue.Queue()
+    for item in enumerate(funcs):
+        queue.put(item)
+
+    # Log messages from the threads are tagged like the request's.
+    oauth_key, transaction_id = get_oauth_key(), get_transaction_id()
+
+    def worker():
+        set_oauth_key(oauth_key)
+        set_transaction_id(transaction_id)
+        while True:
+            try:
+                index, func = queue.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                results[index] = (func(), None)
+            except Exception:
+                results[index] = (None, sys.exc_info())
+
+    threads = [threading.Thread(target=worker)
+               for x in range(min(size, len(funcs)))]
+    if len(threads) == 1:
+        worker()
+        return results
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
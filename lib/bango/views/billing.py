@@ -1,9 +1,11 @@
+import functools
+
 from django.conf import settings
 
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from lib.bango.client import BangoError, get_client
+from lib.bango.client import BangoError, get_client, prototypes
 from lib.bango.constants import MICRO_PAYMENT_TYPES, PAYMENT_TYPES
 from lib.bango.errors import ProcessError
 from lib.bango.forms import CreateBillingConfigurationForm
@@ -22,13 +24,12 @@ def prepare(form, bango):
     data['bango'] = bango
 
     # Used to create the approprate data structure.
-    client = get_client()
-    billing = client.client('billing')
-    price_list = billing.factory.create('ArrayOfPrice')
+    create = functools.partial(prototypes.create, get_client(), 'billing')
+    price_list = create('ArrayOfPrice')
     price_types = set()
 
     for item in form.cleaned_data['prices']:
-        price = billing.factory.create('Price')
+        price = create('Price')
         price.amount = item.cleaned_data['price']
         price.currency = item.cleaned_data['currency']
         price_types.add(item.cleaned_data['method'])
@@ -58,12 +59,12 @@ def prepare(form, bango):
     if price_types == set([str(PAYMENT_METHOD_OPERATOR)]):
         type_filters = MICRO_PAYMENT_TYPES
 
-    types = billing.factory.create('ArrayOfString')
+    types = create('ArrayOfString')
     for f in type_filters:
         types.string.append(f)
     data['typeFilter'] = types
 
-    config = billing.factory.create('ArrayOfBillingConfigurationOption')
+    config = create('ArrayOfBillingConfigurationOption')
     configs = {
         'APPLICATION_CATEGORY_ID': '18',
         'APPLICATION_SIZE_KB': data.pop('application_size'),
@@ -86,7 +87,7 @@ def prepare(form, bango):
             configs['APPLICATION_LOGO_URL'] = icon_url
 
     for k, v in configs.items():
-        opt = billing.factory.create('BillingConfigurationOption')
+        opt = create('BillingConfigurationOption')
         opt.configurationOptionName = k
         opt.configurationOptionValue = v
         config.BillingConfigurationOption.append(opt)
@@ -1,3 +1,8 @@
+import functools
+
+from django.conf import settings
+from django.db import transaction
+
 from rest_framework.response import Response
 
 from ..client import response_to_dict
@@ -7,14 +12,22 @@ from ..forms import (FinanceEmailForm, PackageForm,
                      SupportEmailForm, UpdateAddressForm,
                      VatNumberForm)
 from lib.bango.serializers import PackageSerializer, SellerBangoSerializer
+from lib.bango.utils import concurrently
 from lib.bango.views.base import BangoResource
 from lib.sellers.models import SellerBango
+from solitude.atomic import Compensations, ScopedAtomicMixin
 from solitude.base import NonDeleteModelViewSet
+from solitude.logger import getLogger
+
+log = getLogger('s.bango')
 
 
-class PackageViewSet(NonDeleteModelViewSet, BangoResource):
+class PackageViewSet(ScopedAtomicMixin, NonDeleteModelViewSet, BangoResource):
     queryset = SellerBango.objects.filter()
     serializer_class = SellerBangoSerializer
+    # These call Bango, so they keep their transactions short. Updates are
+    # PATCH only, which the router sends to partial_update.
+    scoped_actions = ('create', 'partial_update', 'retrieve')
 
     error_lookup = {
         'INVALID_COUNTRYISO': 'countryIso',
@@ -38,13 +51,18 @@ class PackageViewSet(NonDeleteModelViewSet, BangoResource):
 
         resp = self.client('CreatePackage', form.bango_data)
 
-        seller_bango = SellerBango.objects.create(
-            seller=serial.object['seller'],
-            package_id=resp.packageId,
-            admin_person_id=resp.adminPersonId,
-            support_person_id=resp.supportPersonId,
-            finance_person_id=resp.financePersonId
-        )
+        with Compensations() as undo:
+            # Bango packages can't be deleted, so log the one left behind.
+            undo.add(log.error, 'Bango package {0} was not stored'
+                     .format(resp.packageId))
+            with transaction.atomic():
+                seller_bango = SellerBango.objects.create(
+                    seller=serial.object['seller'],
+                    package_id=resp.packageId,
+                    admin_person_id=resp.adminPersonId,
+                    support_person_id=resp.supportPersonId,
+                    finance_person_id=resp.financePersonId
+                )
 
         new_serial = SellerBangoSerializer(seller_bango)
         return Response(new_serial.data, status=201)
@@ -72,27 +90,45 @@ class PackageViewSet(NonDeleteModelViewSet, BangoResource):
             if not form.is_valid():
                 return self.form_errors(form)
 
+        calls = []
         for form in forms:
             data = form.bango_data
             keys = form.bango_meta
             data['packageId'] = obj.package_id
-            try:
-                result = self.client(keys['method'], data,
-                                     raise_on=keys.get('raise_on', None))
-            except BangoAnticipatedError, exc:
+            calls.append(functools.partial(
+                self.client, keys['method'], data,
+                raise_on=keys.get('raise_on', None)))
+
+        # The calls don't depend on each other, so they are made at once.
+        errors = []
+        results = concurrently(calls, settings.BANGO_CONCURRENCY)
+        for form, (result, exc_info) in zip(forms, results):
+            if exc_info:
                 # We don't know the persons email account, we only
                 # know that Bango might not like it if its unchanged.
-                if exc.id not in (INVALID_PERSON, VAT_NUMBER_DOES_NOT_EXIST):
-                    raise
-            else:
-                if keys.get('to_field'):
-                    # Only change the model in some cases.
-                    setattr(obj, keys.get('to_field'),
-                            getattr(result, keys.get('from_field')))
-
-        obj.save()
+                if (isinstance(exc_info[1], BangoAnticipatedError) and
+                        exc_info[1].id in (INVALID_PERSON,
+                                           VAT_NUMBER_DOES_NOT_EXIST)):
+                    continue
+                log.warning('Package update failed on: {0}, {1}'
+                            .format(form.__class__.__name__, exc_info[1]))
+                errors.append(exc_info)
+                continue
+
+            keys = form.bango_meta
+            if keys.get('to_field'):
+                # Only change the model in some cases.
+                setattr(obj, keys.get('to_field'),
+                        getattr(result, keys.get('from_field')))
+
+        if errors:
+            # As if the calls were made in order, the first error is raised.
+            raise errors[0][0], errors[0][1], errors[0][2]
+
+        with transaction.atomic():
+            obj.save()
         new_serial = SellerBangoSerializer(obj).data.copy()
-        new_serial.update(form.cleaned_data)
+        new_serial.update(forms[-1].cleaned_data)
         return Response(new_serial, status=201)
 
     def retrieve(self, request, *args, **kw):
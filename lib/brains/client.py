@@ -1,3 +1,4 @@
+from time import time
 from urlparse import urlparse
 
 from django.conf import settings
@@ -6,6 +7,7 @@ from django.core.exceptions import ImproperlyConfigured
 import braintree
 from django_statsd.clients import statsd
 
+from solitude.breaker import breakers
 from solitude.logger import getLogger
 
 log = getLogger('s.brains')
@@ -29,17 +31,42 @@ AuthProduction = AuthEnvironment(braintree.environment.Environment.Production)
 class Http(braintree.util.http.Http):
 
     def http_do(self, verb, path, headers, body):
+        # Don't wait on a resource that keeps failing, see solitude.breaker.
+        # Braintree raises a DownForMaintenanceError for a 503.
+        breaker = breakers.get('braintree', method(verb, path))
+        if not breaker.allow():
+            return 503, ''
+
         # Tell solitude-auth where we really want this request to go to.
         headers['x-solitude-service'] = self.environment._real.base_url + path
         # Set the URL of the request to point to the auth server.
         path = self.environment._url.path
 
-        with statsd.timer('solitude.braintree.api'):
-            status, text = super(Http, self).http_do(verb, path, headers, body)
+        self.config.timeout = breaker.timeout(settings.BRAINTREE_TIMEOUT)
+        start = time()
+        try:
+            with statsd.timer('solitude.braintree.api'):
+                status, text = super(Http, self).http_do(
+                    verb, path, headers, body)
+        except Exception:
+            breaker.record(True, time() - start)
+            raise
+
+        breaker.record(status >= 500, time() - start)
         statsd.incr('solitude.braintree.response.{0}'.format(status))
         return status, text
 
 
+def method(verb, path):
+    """
+    The name of a call to Braintree: the resource it's on and the verb, such
+    as `customers.post` for /merchants/{id}/customers.
+    """
+    parts = path.split('/')
+    resource = parts[3] if len(parts) > 3 and parts[1] == 'merchants' else ''
+    return '{0}.{1}'.format(resource or 'unknown', verb.lower())
+
+
 def get_client():
     """
     Use this to get the right client and communicate with Braintree.
@@ -60,6 +87,7 @@ def get_client():
         settings.BRAINTREE_MERCHANT_ID,
         'public key added by solitude-auth',
         'private key added by solitude-auth',
-        http_strategy=Http
+        http_strategy=Http,
+        timeout=settings.BRAINTREE_TIMEOUT
     )
     return braintree
@@ -10,9 +10,9 @@ import requests
 from lib.brains.models import (
     BraintreeBuyer, BraintreePaymentMethod, BraintreeSubscription)
 from lib.buyers.models import Buyer
-from lib.sellers.models import SellerProduct
+from lib.sellers.models import get_product, SellerProduct
 from solitude.base import getLogger
-from solitude.related_fields import PathRelatedFormField
+from solitude.related_fields import PathRelatedFormField, PrefetchPathsMixin
 
 log = getLogger('s.brains')
 
@@ -79,7 +79,7 @@ class PaymentMethodForm(forms.Form):
         }
 
 
-class SubscriptionForm(forms.Form):
+class SubscriptionForm(PrefetchPathsMixin, forms.Form):
     paymethod = PathRelatedFormField(
         view_name='braintree:mozilla:paymethod-detail',
         queryset=BraintreePaymentMethod.objects.filter())
@@ -123,7 +123,7 @@ class SubscriptionForm(forms.Form):
     def clean_plan(self):
         data = self.cleaned_data['plan']
         try:
-            obj = SellerProduct.objects.get(public_id=data)
+            obj = get_product(data)
         except ObjectDoesNotExist:
             log.info(
                 'no seller product with braintree plan id: {plan}'
@@ -205,7 +205,7 @@ class WebhookParseForm(forms.Form):
         return self.cleaned_data
 
 
-class PayMethodDeleteForm(forms.Form):
+class PayMethodDeleteForm(PrefetchPathsMixin, forms.Form):
     paymethod = PathRelatedFormField(
         view_name='braintree:mozilla:paymethod-detail',
         queryset=BraintreePaymentMethod.objects.filter())
@@ -224,7 +224,7 @@ class PayMethodDeleteForm(forms.Form):
         return self.cleaned_data
 
 
-class SaleForm(forms.Form):
+class SaleForm(PrefetchPathsMixin, forms.Form):
     amount = forms.DecimalField(
         max_value=Decimal(settings.BRAINTREE_MAX_AMOUNT),
         min_value=Decimal(settings.BRAINTREE_MIN_AMOUNT))
@@ -246,8 +246,7 @@ class SaleForm(forms.Form):
         product_id = self.cleaned_data.get('product_id')
 
         try:
-            self.seller_product = (
-                SellerProduct.objects.get(public_id=product_id))
+            self.seller_product = get_product(product_id)
         except SellerProduct.DoesNotExist:
             raise forms.ValidationError(
                 'Product does not exist: {}'.format(product_id))
@@ -317,7 +316,7 @@ class SaleForm(forms.Form):
         return data
 
 
-class SubscriptionUpdateForm(forms.Form):
+class SubscriptionUpdateForm(PrefetchPathsMixin, forms.Form):
     paymethod = PathRelatedFormField(
         view_name='braintree:mozilla:paymethod-detail',
         queryset=BraintreePaymentMethod.objects.filter())
@@ -340,7 +339,7 @@ class SubscriptionUpdateForm(forms.Form):
         return self.cleaned_data
 
 
-class SubscriptionCancelForm(forms.Form):
+class SubscriptionCancelForm(PrefetchPathsMixin, forms.Form):
     subscription = PathRelatedFormField(
         view_name='braintree:mozilla:subscription-detail',
         queryset=BraintreeSubscription.objects.filter())
@@ -1,5 +1,4 @@
-from django.core.urlresolvers import reverse
-from django.db import models
+from django.db import models, transaction
 from django.dispatch import receiver
 
 from lib.brains.client import get_client
@@ -7,6 +6,7 @@ from lib.brains.errors import BraintreeResultError
 from lib.buyers.models import Buyer
 from solitude.base import getLogger, Model
 from solitude.constants import PAYMENT_METHOD_CARD
+from solitude.uris import reverse
 
 log = getLogger('s.brains')
 
@@ -46,14 +46,16 @@ def close(signal, *args, **kw):
         # Find and clear out all subscriptions.
         for subscription in paymethod.subscriptions.filter(active=True):
             subscription.braintree_cancel()
-            subscription.active = False
-            subscription.save()
+            with transaction.atomic():
+                subscription.active = False
+                subscription.save()
             log.info('Cancelled subscription: {}'.format(subscription.pk))
 
         # Delete the payment method from braintree.
         paymethod.braintree_delete()
-        paymethod.active = False
-        paymethod.save()
+        with transaction.atomic():
+            paymethod.active = False
+            paymethod.save()
         log.info('Deleted payment method: {}'.format(paymethod.pk))
 
 
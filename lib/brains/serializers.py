@@ -1,5 +1,3 @@
-from django.core.urlresolvers import reverse
-
 from rest_framework import serializers
 
 from lib.brains.models import (
@@ -11,6 +9,7 @@ from lib.transactions import constants
 from lib.transactions.serializers import TransactionSerializer
 from solitude.base import BaseSerializer
 from solitude.related_fields import PathRelatedField
+from solitude.uris import reverse
 
 
 class Namespaced(serializers.Serializer):
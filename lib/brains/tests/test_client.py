@@ -1,7 +1,12 @@
 from django.core.exceptions import ImproperlyConfigured
+from django.test.utils import override_settings
 
-from lib.brains.client import get_client, Http
+import mock
+from nose.tools import eq_
+
+from lib.brains.client import get_client, Http, method
 from lib.brains.tests.base import BraintreeTest
+from solitude.breaker import breakers
 
 
 class TestClient(BraintreeTest):
@@ -21,3 +26,41 @@ class TestClient(BraintreeTest):
         with self.settings(BRAINTREE_PROXY='', BRAINTREE_MERCHANT_ID='x'):
             with self.assertRaises(ImproperlyConfigured):
                 get_client()
+
+
+@override_settings(BREAKERS=True, BREAKER_MIN_CALLS=2, BRAINTREE_TIMEOUT=20)
+@mock.patch('braintree.util.http.Http.http_do')
+class TestBreaker(BraintreeTest):
+
+    def setUp(self):
+        super(TestBreaker, self).setUp()
+        breakers.clear()
+        self.http = get_client().Configuration.instantiate()._http_strategy
+
+    def call(self):
+        return self.http.http_do('POST', '/merchants/test/customers', {}, '')
+
+    def test_timeout(self, http_do):
+        http_do.return_value = (201, '')
+        eq_(self.call(), (201, ''))
+        eq_(self.http.config.timeout, 20)
+
+    def test_open(self, http_do):
+        http_do.return_value = (500, '')
+        self.call()
+        self.call()
+        http_do.reset_mock()
+        eq_(self.call(), (503, ''))
+        assert not http_do.called
+
+    def test_not_found(self, http_do):
+        http_do.return_value = (404, '')
+        for x in range(3):
+            eq_(self.call(), (404, ''))
+
+
+def test_method():
+    eq_(method('POST', '/merchants/test/customers'), 'customers.post')
+    eq_(method('GET', '/merchants/test/payment_methods/any/a'),
+        'payment_methods.get')
+    eq_(method('GET', '/'), 'unknown.get')
@@ -1,7 +1,9 @@
 from datetime import datetime
 
 from django.core.urlresolvers import reverse
+from django.db import DatabaseError
 
+import mock
 from braintree.payment_method import PaymentMethod
 from braintree.payment_method_gateway import PaymentMethodGateway
 from braintree.successful_result import SuccessfulResult
@@ -10,6 +12,7 @@ from nose.tools import eq_, ok_
 from lib.brains.models import BraintreePaymentMethod
 from lib.brains.tests.base import (
     BraintreeTest, create_braintree_buyer, create_method, error)
+from solitude.atomic import depth
 from solitude.constants import PAYMENT_METHOD_CARD, PAYMENT_METHOD_OPERATOR
 
 
@@ -59,6 +62,33 @@ class TestPaymentMethod(BraintreeTest):
         method = BraintreePaymentMethod.objects.get()
         eq_(method.type_name, 'visa')
 
+    def test_outside_transaction(self):
+        outer = depth()
+        inner = []
+
+        def create(data):
+            inner.append(depth())
+            return successful_method()
+
+        self.mocks['method'].create.side_effect = create
+        buyer, braintree_buyer = create_braintree_buyer()
+        res = self.client.post(self.url,
+                               data={'buyer_uuid': buyer.uuid, 'nonce': '123'})
+        eq_(res.status_code, 201, res.content)
+        eq_(inner, [outer])
+
+    @mock.patch.object(BraintreePaymentMethod.objects, 'create')
+    def test_not_stored(self, create):
+        create.side_effect = DatabaseError
+        self.mocks['method'].create.return_value = successful_method()
+        self.mocks['method'].delete.return_value = successful_method()
+
+        buyer, braintree_buyer = create_braintree_buyer()
+        with self.assertRaises(DatabaseError):
+            self.client.post(self.url,
+                             data={'buyer_uuid': buyer.uuid, 'nonce': '123'})
+        self.mocks['method'].delete.assert_called_with('da-token')
+
     def test_no_buyer(self):
         res = self.client.post(self.url,
                                data={'buyer_uuid': 'nope', 'nonce': '123'})
@@ -2,6 +2,7 @@ from datetime import datetime
 from decimal import Decimal
 
 from django.core.urlresolvers import reverse
+from django.db import DatabaseError
 
 import mock
 from braintree.subscription import Subscription
@@ -13,6 +14,7 @@ from lib.brains.models import BraintreeSubscription
 from lib.brains.tests.base import (
     BraintreeTest, create_braintree_buyer, create_method, create_seller, error,
     ProductsTest)
+from solitude.atomic import depth
 
 
 def method(**kw):
@@ -75,6 +77,31 @@ class TestSubscription(BraintreeTest, ProductsTest):
         eq_(subscription.provider_id, 'some:id')
         eq_(subscription.amount, None)
 
+    def test_outside_transaction(self):
+        outer = depth()
+        inner = []
+
+        def create(data):
+            inner.append(depth())
+            return successful_subscription()
+
+        self.mocks['sub'].create.side_effect = create
+        method, seller_product = create_method_all()
+        res = self.post(paymethod=method.get_uri())
+        eq_(res.status_code, 201, res.content)
+        eq_(inner, [outer])
+
+    @mock.patch.object(BraintreeSubscription.objects, 'create')
+    def test_not_stored(self, create):
+        create.side_effect = DatabaseError
+        self.mocks['sub'].create.return_value = successful_subscription()
+        self.mocks['sub'].cancel.return_value = successful_subscription()
+
+        method, seller_product = create_method_all()
+        with self.assertRaises(DatabaseError):
+            self.post(paymethod=method.get_uri())
+        self.mocks['sub'].cancel.assert_called_with('some:id')
+
     def test_no_method(self):
         method, seller_product = create_method_all()
         res = self.post(paymethod=method.get_uri() + 'n')
@@ -1,3 +1,5 @@
+from django.db import transaction
+
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
@@ -6,6 +8,7 @@ from lib.brains.client import get_client
 from lib.brains.errors import BraintreeResultError
 from lib.brains.forms import PaymentMethodForm, PayMethodDeleteForm
 from lib.brains.models import BraintreePaymentMethod
+from solitude.atomic import Compensations, scoped
 from solitude.base import NoAddModelViewSet
 from solitude.constants import PAYMENT_METHOD_CARD
 from solitude.errors import FormError
@@ -14,6 +17,7 @@ from solitude.logger import getLogger
 log = getLogger('s.brains')
 
 
+@scoped
 @api_view(['POST'])
 def delete(request):
     form = PayMethodDeleteForm(request.DATA)
@@ -23,8 +27,9 @@ def delete(request):
 
     solitude_method = form.cleaned_data['paymethod']
     solitude_method.braintree_delete()
-    solitude_method.active = False
-    solitude_method.save()
+    with transaction.atomic():
+        solitude_method.active = False
+        solitude_method.save()
 
     log.info('Payment method deleted from braintree: {}'
              .format(solitude_method.pk))
@@ -32,6 +37,7 @@ def delete(request):
     return Response({}, status=204)
 
 
+@scoped
 @api_view(['POST'])
 def create(request):
     client = get_client().PaymentMethod
@@ -52,13 +58,16 @@ def create(request):
     braintree_method = result.payment_method
     log.info('PaymentMethod created for: {0}'.format(buyer.uuid))
 
-    solitude_method = BraintreePaymentMethod.objects.create(
-        braintree_buyer=braintree_buyer,
-        type=PAYMENT_METHOD_CARD,
-        type_name=braintree_method.card_type,
-        provider_id=braintree_method.token,
-        truncated_id=result.payment_method.last_4
-    )
+    with Compensations() as undo:
+        undo.add(client.delete, braintree_method.token)
+        with transaction.atomic():
+            solitude_method = BraintreePaymentMethod.objects.create(
+                braintree_buyer=braintree_buyer,
+                type=PAYMENT_METHOD_CARD,
+                type_name=braintree_method.card_type,
+                provider_id=braintree_method.token,
+                truncated_id=result.payment_method.last_4
+            )
     log.info('Method {0} created.'.format(solitude_method.pk))
 
     res = serializers.Namespaced(
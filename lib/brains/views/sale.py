@@ -28,7 +28,7 @@ def create(request):
         log.warning('Error on one-off sale: {}'.format(form.braintree_data))
         raise BraintreeResultError(result)
 
-    our_transaction = Transaction.objects.create(
+    our_transaction = Transaction(
         amount=result.transaction.amount,
         buyer=form.buyer,
         currency=result.transaction.currency_iso_code,
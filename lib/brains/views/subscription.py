@@ -1,3 +1,5 @@
+from django.db import transaction
+
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
@@ -8,6 +10,7 @@ from lib.brains.forms import (
 from lib.brains.models import BraintreeSubscription
 from lib.brains.serializers import (
     LocalSubscription, Namespaced, Subscription)
+from solitude.atomic import Compensations, scoped
 from solitude.base import NoAddModelViewSet
 from solitude.errors import FormError
 from solitude.logger import getLogger
@@ -15,6 +18,7 @@ from solitude.logger import getLogger
 log = getLogger('s.brains')
 
 
+@scoped
 @api_view(['POST'])
 def change(request):
     client = get_client().Subscription
@@ -37,8 +41,12 @@ def change(request):
                     .format(*log_msgs))
         raise BraintreeResultError(result)
 
-    subscription.paymethod = method
-    subscription.save()
+    with Compensations() as undo:
+        undo.add(client.update, subscription.provider_id,
+                 {'payment_method_token': subscription.paymethod.provider_id})
+        with transaction.atomic():
+            subscription.paymethod = method
+            subscription.save()
 
     log.info('Subscription changed: {} from {} to {}'.format(*log_msgs))
     res = Namespaced(
@@ -48,6 +56,7 @@ def change(request):
     return Response(res.data, status=200)
 
 
+@scoped
 @api_view(['POST'])
 def cancel(request):
     form = SubscriptionCancelForm(request.DATA)
@@ -57,8 +66,9 @@ def cancel(request):
 
     solitude_subscription = form.cleaned_data['subscription']
     result = solitude_subscription.braintree_cancel()
-    solitude_subscription.active = False
-    solitude_subscription.save()
+    with transaction.atomic():
+        solitude_subscription.active = False
+        solitude_subscription.save()
 
     res = Namespaced(
         mozilla=LocalSubscription(instance=solitude_subscription),
@@ -67,6 +77,7 @@ def cancel(request):
     return Response(res.data)
 
 
+@scoped
 @api_view(['POST'])
 def create(request):
     client = get_client().Subscription
@@ -88,12 +99,15 @@ def create(request):
              .format(braintree_subscription.id,
                      form.cleaned_data['paymethod']))
 
-    subscription = BraintreeSubscription.objects.create(
-        amount=form.cleaned_data['amount'],
-        paymethod=form.cleaned_data['paymethod'],
-        seller_product=form.seller_product,
-        provider_id=braintree_subscription.id
-    )
+    with Compensations() as undo:
+        undo.add(client.cancel, braintree_subscription.id)
+        with transaction.atomic():
+            subscription = BraintreeSubscription.objects.create(
+                amount=form.cleaned_data['amount'],
+                paymethod=form.cleaned_data['paymethod'],
+                seller_product=form.seller_product,
+                provider_id=braintree_subscription.id
+            )
     log.info('Subscription created in solitude: {}; braintree: {}'
              .format(subscription.pk, braintree_subscription.id))
 
@@ -216,7 +216,7 @@ class Processor(object):
                                 our_transaction.pk))
 
             except ObjectDoesNotExist:
-                our_transaction = Transaction.objects.create(
+                our_transaction = Transaction(
                     amount=their_transaction.amount,
                     buyer=self.subscription.paymethod.braintree_buyer.buyer,
                     currency=their_transaction.currency_iso_code,
@@ -2,8 +2,7 @@ import uuid
 from datetime import datetime
 
 from django.conf import settings
-from django.core.urlresolvers import reverse
-from django.db import models
+from django.db import models, transaction
 from django.dispatch import Signal
 
 from aesfield.field import AESField
@@ -11,6 +10,7 @@ from aesfield.field import AESField
 from .field import ConsistentSigField, HashField
 from solitude.base import Model
 from solitude.logger import getLogger
+from solitude.uris import reverse
 
 log = getLogger(__name__)
 ANONYMISED = 'anonymised-uuid:'
@@ -87,9 +87,10 @@ class Buyer(Model):
         Warning:
 
         This is performing multiple actions across the multiple payment
-        providers. Some actions are irreversible. If the action fails, then
-        the entire transaction in solitude will be rolled back. Leaving us in a
-        confusing state.
+        providers. Some actions are irreversible. Call this outside of a
+        transaction, see solitude.atomic, so that each change is stored as
+        soon as the payment provider has made it. If the action fails part
+        way, the buyer is left active with the changes made so far.
         """
         log.warning('Anonymising account starting: {}'.format(self.pk))
         if self.uuid.startswith(ANONYMISED):
@@ -102,11 +103,12 @@ class Buyer(Model):
         )
 
         # All succeeds, so go ahead and anonymise the account.
-        self.active = False
-        self.email = ''
-        self.email_sig = None
-        self.uuid = ANONYMISED + str(uuid.uuid4())
-        self.save()
+        with transaction.atomic():
+            self.active = False
+            self.email = ''
+            self.email_sig = None
+            self.uuid = ANONYMISED + str(uuid.uuid4())
+            self.save()
         log.warning('Anonymising account complete: {}'.format(self.pk))
 
     def get_uri(self):
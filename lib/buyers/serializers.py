@@ -1,11 +1,10 @@
-from django.core.urlresolvers import reverse
-
 from rest_framework import serializers
 
 from lib.buyers.constants import BUYER_UUID_ALREADY_EXISTS, FIELD_REQUIRED
 from lib.buyers.forms import clean_pin
 from lib.buyers.models import Buyer
 from solitude.base import BaseSerializer
+from solitude.uris import reverse
 
 
 class BaseBuyerSerializer(BaseSerializer):
@@ -15,6 +14,12 @@ class BaseBuyerSerializer(BaseSerializer):
 
 
 class BuyerSerializer(BaseBuyerSerializer):
+    cached = True
+    # The lock out expires over time and the email is kept out of the cache
+    # because it is encrypted in the database.
+    uncached_fields = ('email', 'pin_is_locked_out')
+    field_sources = dict(BaseSerializer.field_sources,
+                         pin_is_locked_out=('pin_locked_out',))
     pin_is_locked_out = serializers.BooleanField(
         source='locked_out', read_only=True)
     pin_failures = serializers.IntegerField(read_only=True)
@@ -9,6 +9,7 @@ from lib.buyers.forms import PinForm
 from lib.buyers.models import Buyer
 from lib.buyers.serializers import (
     BuyerSerializer, ConfirmedSerializer, VerifiedSerializer)
+from solitude.atomic import scoped
 from solitude.base import log_cef, NonDeleteModelViewSet
 from solitude.errors import FormError
 from solitude.filter import StrictQueryFilter
@@ -41,6 +42,7 @@ class BuyerViewSet(NonDeleteModelViewSet):
     queryset = Buyer.objects.all()
     serializer_class = BuyerSerializer
     filter_fields = ('uuid', 'active', 'email_sig')
+    bulk_fields = ('uuid',)
     filter_backends = (EmailHash,)
 
 
@@ -129,6 +131,8 @@ def reset_confirm_pin(request):
     raise FormError(form.errors)
 
 
+# Closing calls the payment providers for each payment method.
+@scoped
 @api_view(['POST'])
 def close(request, pk):
     buyer = get_object_or_404(Buyer, pk=pk, active=True)
@@ -1,10 +1,9 @@
-from django.core.urlresolvers import reverse
-
 from rest_framework import serializers
 
 from lib.sellers.models import SellerProductReference, SellerReference
 from solitude.base import BaseSerializer
 from solitude.related_fields import PathRelatedField
+from solitude.uris import reverse
 
 
 class Remote(BaseSerializer):
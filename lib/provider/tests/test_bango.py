@@ -43,6 +43,7 @@ class TestProduct(APITest):
     @patch.object(ClientMock, 'mock_results')
     def test_calls(self, mock_results):
         mock_results.return_value = {'responseCode': OK,
+                                     'responseMessage': '',
                                      'bango': '1'}
         res = self.client.post(self.url, data=self.get_data())
         eq_(res.status_code, 200, res.json)
@@ -0,0 +1,122 @@
+import threading
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from optparse import make_option
+from SocketServer import ThreadingMixIn
+from time import time
+
+from django.core.management.base import BaseCommand
+
+import requests
+
+from lib.proxy.views import Proxy, sessions
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    """A stand-in upstream that answers every POST with a small body."""
+
+    protocol_version = 'HTTP/1.1'
+    # Write the response in one go, otherwise small writes on a kept alive
+    # connection stall on delayed ACKs.
+    wbufsize = -1
+    body = '{"status": "ok"}'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.getheader('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class BenchmarkProxy(Proxy):
+    name = 'benchmark'
+    service = 'benchmark'
+
+    def __init__(self, url):
+        self.enabled = True
+        self.timeout = 10
+        self.url = url
+        self.method = 'post'
+        self.body = '{"foo": "bar"}'
+        self.headers = {'Content-Type': 'application/json'}
+
+
+class UnpooledProxy(BenchmarkProxy):
+
+    """How Proxy.call worked before pooling: a new connection per call."""
+
+    def session(self):
+        return requests
+
+
+def run(proxy, url, requests, concurrency):
+    per_thread = requests / concurrency
+
+    def worker():
+        for x in range(per_thread):
+            proxy(url).call()
+
+    threads = [threading.Thread(target=worker) for x in range(concurrency)]
+    start = time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (per_thread * concurrency) / (time() - start)
+
+
+class Command(BaseCommand):
+
+    """
+    Times Proxy.call against a local stand-in upstream, with and without the
+    pooled sessions. The proxy app is only installed when SOLITUDE_PROXY is
+    enabled, so run this with:
+
+        SOLITUDE_PROXY=enabled python manage.py proxy_benchmark
+    """
+
+    help = 'Benchmark the proxy with and without pooled sessions.'
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--requests',
+            dest='requests',
+            type='int',
+            default=1000,
+            help='Number of requests to make for each run. Default: 1000'
+        ),
+        make_option(
+            '--concurrency',
+            dest='concurrency',
+            type='int',
+            default=10,
+            help='Number of threads making requests. Default: 10'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        server = Server(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        url = 'http://127.0.0.1:{0}/'.format(server.server_port)
+
+        try:
+            for name, proxy in (('unpooled', UnpooledProxy),
+                                ('pooled', BenchmarkProxy)):
+                sessions.clear()
+                rate = run(proxy, url, options['requests'],
+                           options['concurrency'])
+                self.stdout.write('{0}: {1:.0f} requests/sec'
+                                  .format(name, rate))
+        finally:
+            sessions.clear()
+            server.shutdown()
@@ -1,3 +1,5 @@
+from StringIO import StringIO
+
 from django import test
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
@@ -9,6 +11,7 @@ from nose.tools import eq_
 
 from lib.bango.constants import HEADERS_SERVICE_GET
 from lib.bango.tests import samples
+from lib.proxy.views import Sessions, sessions
 
 
 class Proxy(test.TestCase):
@@ -18,7 +21,11 @@ class Proxy(test.TestCase):
         self.req = request.start()
         self.req.exceptions = requests.exceptions
         self.req.patcher = request
+        # Requests go through the pooled sessions, have them hit the mock.
+        self.req.session.return_value = self.req
         self.addCleanup(request.stop)
+        sessions.clear()
+        self.addCleanup(sessions.clear)
 
 
 @mock.patch.object(settings, 'SOLITUDE_PROXY', True)
@@ -69,6 +76,40 @@ class TestBango(Proxy):
         assert '<ns0:username>me</ns0:username>' in body
         assert '<ns0:password>shh</ns0:password>' in body
 
+    def respond(self, status_code, content_type, *chunks):
+        # Only what a streamed response needs, so reading the body in any
+        # other way fails.
+        result = mock.Mock(spec=['status_code', 'headers', 'iter_content'])
+        result.status_code = status_code
+        result.headers = {'Content-Type': content_type}
+        result.iter_content.return_value = iter(chunks)
+        self.req.post.return_value = result
+
+    def test_streamed(self):
+        self.respond(201, 'application/octet-stream', '\xff\x00', 'ab')
+        res = self.client.post(self.url,
+                               samples.sample_request,
+                               **{'content_type': 'text/xml',
+                                  HEADERS_SERVICE_GET: 'http://url.com/b'})
+        assert res.streaming
+        eq_(res.status_code, 201)
+        eq_(res['Content-Type'], 'application/octet-stream')
+        eq_(''.join(res.streaming_content), '\xff\x00ab')
+        eq_(self.req.post.call_args[1]['prefetch'], False)
+
+    def test_dumped(self):
+        result = requests.models.Response()
+        result.status_code = 200
+        result.headers = {'Content-Type': 'text/xml'}
+        result.raw = StringIO('<foo/>')
+        self.req.post.return_value = result
+        with self.settings(DUMP_REQUESTS=True):
+            res = self.client.post(self.url,
+                                   samples.sample_request,
+                                   **{'content_type': 'text/xml',
+                                      HEADERS_SERVICE_GET: 'http://url.com/b'})
+            eq_(''.join(res.streaming_content), '<foo/>')
+
 
 @mock.patch.object(settings, 'SOLITUDE_PROXY', True)
 @mock.patch.object(
@@ -110,3 +151,41 @@ class TestProvider(Proxy):
     def test_get(self):
         self.client.get(self.url, data={'baz': 'quux'})
         assert '?baz=quux' in self.req.get.call_args[0][0]
+
+
+class TestSessions(test.TestCase):
+
+    def setUp(self):
+        self.sessions = Sessions()
+        self.addCleanup(self.sessions.clear)
+
+    def test_same_host(self):
+        eq_(self.sessions.get('http://f.c/a'),
+            self.sessions.get('http://f.c/b?c=d'))
+
+    def test_different_host(self):
+        assert (self.sessions.get('http://f.c/') !=
+                self.sessions.get('http://b.c/'))
+
+    def test_different_scheme(self):
+        assert (self.sessions.get('http://f.c/') !=
+                self.sessions.get('https://f.c/'))
+
+    def test_size(self):
+        with self.settings(PROXY_POOL_SIZE=5,
+                           PROXY_POOL_SIZES={'https://f.c': 20}):
+            eq_(self.sessions.get('http://f.c/').config['pool_maxsize'], 5)
+            eq_(self.sessions.get('https://f.c/').config['pool_maxsize'], 20)
+
+    @mock.patch('lib.proxy.views.time')
+    def test_evicted(self, time):
+        time.return_value = 0
+        first = self.sessions.get('http://f.c/')
+        other = self.sessions.get('http://b.c/')
+        with self.settings(PROXY_POOL_MAX_AGE=60):
+            time.return_value = 50
+            eq_(self.sessions.get('http://f.c/'), first)
+            time.return_value = 100
+            eq_(self.sessions.get('http://f.c/'), first)
+            # Not used since 0, so it's been closed and replaced.
+            assert self.sessions.get('http://b.c/') != other
@@ -1,7 +1,12 @@
+import threading
+from time import time
+from urlparse import urlparse
+
 from django import http
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.core.urlresolvers import reverse
+from django.db import transaction
 
 import requests
 from django_statsd.clients import statsd
@@ -16,12 +21,70 @@ from solitude.logger import getLogger
 
 log = getLogger('s.proxy')
 bango_timeout = getattr(settings, 'BANGO_TIMEOUT', 10)
+# Size in bytes of the chunks read from upstream and passed to the client.
+chunk_size = 64 * 1024
 
 
 def qs_join(**kwargs):
     return '{url}?{query}'.format(**kwargs)
 
 
+class Sessions(object):
+
+    """
+    Keeps a pooled requests session for each upstream, keyed on scheme and
+    host, so that calls to the same upstream reuse open connections.
+
+    The number of connections kept open to each upstream is PROXY_POOL_SIZE
+    unless it is overridden in PROXY_POOL_SIZES. Sessions that have not been
+    used for PROXY_POOL_MAX_AGE seconds are closed.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def key(self, url):
+        parsed = urlparse(url)
+        return '{0}://{1}'.format(parsed.scheme, parsed.netloc)
+
+    def size(self, key):
+        return settings.PROXY_POOL_SIZES.get(key, settings.PROXY_POOL_SIZE)
+
+    def evict(self, now):
+        for key, (session, used) in self._sessions.items():
+            if now - used > settings.PROXY_POOL_MAX_AGE:
+                log.info('Closing idle connections to: {0}'.format(key))
+                statsd.incr('solitude.proxy.pool.evict')
+                session.close()
+                del self._sessions[key]
+
+    def get(self, url):
+        key = self.key(url)
+        with self._lock:
+            now = time()
+            self.evict(now)
+            try:
+                session = self._sessions[key][0]
+            except KeyError:
+                session = requests.session(config={
+                    'keep_alive': True,
+                    'pool_connections': 1,
+                    'pool_maxsize': self.size(key),
+                })
+            self._sessions[key] = (session, now)
+            return session
+
+    def clear(self):
+        with self._lock:
+            for session, used in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+sessions = Sessions()
+
+
 class Proxy(object):
     # Override this in your proxy class.
     name = None
@@ -50,10 +113,14 @@ class Proxy(object):
                       ', '.join(sorted(request.META.keys())))
             raise
 
+    def session(self):
+        """The pooled session for the upstream we are going to call."""
+        return sessions.get(self.url)
+
     def call(self):
         """Call the proxied service, return a response."""
         response = http.HttpResponse()
-        method = getattr(requests, self.method)
+        method = getattr(self.session(), self.method)
         try:
             with statsd.timer('solitude.proxy.%s.%s' %
                               (self.service, self.name)):
@@ -66,7 +133,8 @@ class Proxy(object):
                 # rest.
                 result = method(self.url, data=self.body,
                                 headers=self.headers,
-                                timeout=self.timeout, verify=True)
+                                timeout=self.timeout, verify=True,
+                                prefetch=False)
         except requests.exceptions.RequestException as err:
             dump_response(status_code=500)
             log.exception('%s: %s' % (err.__class__.__name__, err))
@@ -78,11 +146,13 @@ class Proxy(object):
             log.error('Warning response status: {0}'
                       .format(result.status_code))
 
-        # Ensure the response passed along is updated with the response given.
-        response.status_code = result.status_code
-        response.content = result.text
-        response['Content-Type'] = result.headers['Content-Type']
-        return response
+        # Pass the upstream bytes along as they arrive, without decoding them.
+        # If DUMP_REQUESTS is on, dump_response has already read the body and
+        # this replays it from memory.
+        return http.StreamingHttpResponse(
+            result.iter_content(chunk_size),
+            status=result.status_code,
+            content_type=result.headers['Content-Type'])
 
     def __call__(self, request):
         """Takes the incoming request and returns a response."""
@@ -194,9 +264,12 @@ class ProviderProxy(Proxy):
                      url=self.url)
 
 
+# The proxy has no database, so don't wrap these in ATOMIC_REQUESTS.
+@transaction.non_atomic_requests
 def provider(request, reference_name):
     return ProviderProxy(reference_name)(request)
 
 
+@transaction.non_atomic_requests
 def bango(request):
     return BangoProxy()(request)
@@ -1,11 +1,12 @@
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.urlresolvers import reverse
 from django.db import models
 
 from aesfield.field import AESField
 
 from .constants import ACCESS_CHOICES, ACCESS_PURCHASE
 from solitude.base import Model
+from solitude.cache import RowCache
+from solitude.uris import reverse
 
 
 class Seller(Model):
@@ -116,3 +117,18 @@ class SellerProductReference(Model):
 
     class Meta(Model.Meta):
         db_table = 'seller_product_reference'
+
+
+# Products and their sellers are read on every payment.
+sellers = RowCache('sellers', (Seller, SellerProduct, SellerBango,
+                               SellerProductBango))
+
+
+def get_product(public_id):
+    """
+    The SellerProduct and its seller for public_id, from the sellers cache.
+    The secret is left out so it isn't stored in the cache.
+    """
+    return sellers.get(
+        SellerProduct.objects.select_related('seller').defer('secret'),
+        public_id=public_id)
@@ -1,13 +1,13 @@
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.urlresolvers import reverse
 
 from rest_framework import serializers
 
 from lib.bango.serializers import SellerBangoSerializer
 from lib.sellers.constants import EXTERNAL_PRODUCT_ID_IS_NOT_UNIQUE
-from lib.sellers.models import Seller, SellerBango, SellerProduct
+from lib.sellers.models import Seller, SellerProduct
 from solitude.base import BaseSerializer
 from solitude.related_fields import PathRelatedField
+from solitude.uris import reverse
 
 
 class SellerSerializer(BaseSerializer):
@@ -22,9 +22,9 @@ class SellerSerializer(BaseSerializer):
     def transform_bango(self, obj, value):
         # This makes me so sad that we did this. Please not again.
         # https://github.com/mozilla/solitude/issues/343
+        # Uses the SellerBango selected with the seller by the view, if any.
         try:
-            seller_bango = SellerBango.objects.get(seller=obj)
-            return SellerBangoSerializer(seller_bango).data
+            return SellerBangoSerializer(obj.bango).data
         except ObjectDoesNotExist:
             return {}
 
@@ -33,6 +33,12 @@ class SellerSerializer(BaseSerializer):
 
 
 class SellerProductSerializer(BaseSerializer):
+    cached = True
+    # The supported providers come from the seller and the secret is kept out
+    # of the cache because it is encrypted in the database.
+    uncached_fields = ('secret', 'seller_uuids')
+    field_sources = dict(BaseSerializer.field_sources,
+                         seller_uuids=('product', 'product_reference'))
     seller_uuids = serializers.CharField(source='supported_providers',
                                          read_only=True)
     seller = PathRelatedField(
@@ -1,16 +1,46 @@
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from nose.tools import eq_
 
 from lib.sellers.constants import (ACCESS_PURCHASE, ACCESS_SIMULATE,
                                    EXTERNAL_PRODUCT_ID_IS_NOT_UNIQUE)
 from lib.sellers.models import (
-    Seller, SellerBango, SellerProduct, SellerProductBango)
+    Seller, SellerBango, SellerProduct, SellerProductBango,
+    SellerProductReference, SellerReference)
 from solitude.base import APITest
 
 uuid = 'sample:uid'
 
 
+def make_seller(pk):
+    seller = Seller.objects.create(uuid='%s:%s' % (uuid, pk))
+    SellerBango.objects.create(
+        seller=seller, package_id=pk, admin_person_id=1,
+        support_person_id=1, finance_person_id=1)
+    SellerReference.objects.create(seller=seller, reference_id=pk)
+    return seller
+
+
+def make_product(pk):
+    seller = make_seller(pk)
+    product = SellerProduct.objects.create(
+        seller=seller, external_id=pk, public_id='%s:%s' % (uuid, pk))
+    SellerProductBango.objects.create(
+        seller_product=product, seller_bango=seller.bango, bango_id=pk)
+    SellerProductReference.objects.create(
+        seller_product=product, seller_reference=seller.reference,
+        reference_id=pk)
+    return product
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        eq_(client.get(url).status_code, 200)
+    return len(queries)
+
+
 class TestSeller(APITest):
 
     def setUp(self):
@@ -51,6 +81,18 @@ class TestSeller(APITest):
         eq_(res.json['uuid'], uuid)
         eq_(res.json['resource_pk'], obj.pk)
 
+    def test_list_queries(self):
+        make_seller(1)
+        expected = count_queries(self.client, self.list_url)
+        for pk in range(2, 7):
+            make_seller(pk)
+        eq_(count_queries(self.client, self.list_url), expected)
+
+    def test_list_bango(self):
+        seller = make_seller(1)
+        res = self.client.get(self.list_url)
+        eq_(res.json['objects'][0]['bango']['resource_pk'], seller.bango.pk)
+
 
 class TestSellerProduct(APITest):
 
@@ -233,3 +275,19 @@ class TestSellerProduct(APITest):
         res = self.client.get(self.list_url, {'public_id': self.public_id})
         eq_(res.status_code, 200, res)
         eq_(res.json['objects'][0]['seller_uuids']['bango'], uuid)
+
+    def test_list_queries(self):
+        make_product(1)
+        expected = count_queries(self.client, self.list_url)
+        for pk in range(2, 7):
+            make_product(pk)
+        eq_(count_queries(self.client, self.list_url), expected)
+
+    def test_list_supported_providers(self):
+        product = make_product(1)
+        self.create(public_id=self.public_id)
+        res = self.client.get(self.list_url)
+        eq_([o['seller_uuids'] for o in res.json['objects']],
+            [{'bango': None, 'reference': None},
+             {'bango': product.seller.uuid,
+              'reference': product.seller.uuid}])
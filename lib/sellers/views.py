@@ -4,15 +4,20 @@ from solitude.base import NonDeleteModelViewSet
 
 
 class SellerViewSet(NonDeleteModelViewSet):
-    queryset = Seller.objects.all()
+    queryset = Seller.objects.select_related('bango')
     serializer_class = SellerSerializer
     filter_fields = ('uuid', 'active')
 
 
 class SellerProductViewSet(NonDeleteModelViewSet):
-    queryset = SellerProduct.objects.all()
+    # Everything SellerProduct.supported_providers follows.
+    queryset = SellerProduct.objects.select_related(
+        'seller',
+        'product__seller_bango__seller',
+        'product_reference__seller_reference__seller')
     serializer_class = SellerProductSerializer
     filter_fields = (
         'external_id', 'public_id', 'seller__uuid', 'seller__active',
         'seller'
     )
+    bulk_fields = ('public_id',)
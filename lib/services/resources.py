@@ -16,7 +16,9 @@ from rest_framework.response import Response
 from lib.bango.constants import STATUS_BAD
 from lib.sellers.models import Seller, SellerProduct
 from lib.transactions.constants import STATUS_FAILED
+from solitude.breaker import breakers
 from solitude.logger import getLogger
+from solitude.replicas import replica_lags, usable
 
 log = getLogger('s.services')
 
@@ -166,6 +168,18 @@ def status(request):
     return Response(obj.status, status=code)
 
 
+@api_view(['GET'])
+def breakers_list(request):
+    return Response({'breakers': breakers.status()})
+
+
+@api_view(['GET'])
+def replicas_list(request):
+    return Response({'replicas': [
+        {'alias': alias, 'lag': lag, 'usable': usable(lag)}
+        for alias, lag in sorted(replica_lags().items())]})
+
+
 @api_view(['GET'])
 def request_resource(request):
     return Response({'authenticated': request.OAUTH_KEY})
@@ -1,12 +1,15 @@
 from django.conf import settings
 from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
 
 from mock import patch
 from nose.tools import eq_
 
 from lib.services.resources import TestError
 from solitude.base import APITest
+from solitude.breaker import breakers
+from solitude.replicas import lags
 
 
 @patch.object(settings, 'DEBUG', False)
@@ -61,3 +64,36 @@ class TestNoop(APITest):
 
     def test_noop(self):
         eq_(self.client.get(reverse('services.request')).status_code, 200)
+
+
+class TestBreakers(APITest):
+
+    def setUp(self):
+        breakers.clear()
+
+    def test_breakers(self):
+        breakers.get('bango', 'CreatePackage').record(True, 1)
+        res = self.client.get(reverse('services.breakers'))
+        eq_(res.status_code, 200)
+        breaker, = res.json['breakers']
+        eq_(breaker['method'], 'CreatePackage')
+        eq_(breaker['state'], 'closed')
+        eq_(breaker['error_rate'], 1.0)
+
+
+class TestReplicas(APITest):
+
+    def setUp(self):
+        lags.clear()
+
+    def tearDown(self):
+        lags.clear()
+
+    @override_settings(SLAVE_DATABASES=['replica'])
+    @patch('solitude.replicas.replica_lag')
+    def test_replicas(self, replica_lag):
+        replica_lag.return_value = 60
+        res = self.client.get(reverse('services.replicas'))
+        eq_(res.status_code, 200)
+        eq_(res.json['replicas'],
+            [{'alias': 'replica', 'lag': 60, 'usable': False}])
@@ -0,0 +1,92 @@
+from optparse import make_option
+from time import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from lib.sellers.models import Seller, SellerProduct
+from lib.transactions import constants
+from lib.transactions.models import Transaction
+from lib.transactions.views import TransactionViewSet
+
+
+class BenchmarkViewSet(TransactionViewSet):
+    authentication_classes = ()
+    permission_classes = ()
+
+
+def timed(func, iterations):
+    results = []
+    for x in range(iterations):
+        start = time()
+        func()
+        results.append((time() - start) * 1000)
+    return results
+
+
+class Command(BaseCommand):
+
+    """
+    Times a page of /generic/transaction/ with all the fields and with only
+    the fields in --fields. The transactions are made for the benchmark in a
+    database transaction that is rolled back at the end.
+    """
+
+    help = 'Benchmark transaction lists with and without ?fields=.'
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--iterations',
+            dest='iterations',
+            type='int',
+            default=20,
+            help='Number of requests to time for each run. Default: 20'
+        ),
+        make_option(
+            '--fields',
+            dest='fields',
+            default='uuid,status,resource_uri',
+            help='The fields to ask for. Default: uuid,status,resource_uri'
+        ),
+    )
+
+    def report(self, name, results, queries, size):
+        results = sorted(results)
+        self.stdout.write(
+            '{0}: mean {1:.2f}ms, median {2:.2f}ms, max {3:.2f}ms, '
+            '{4} queries, {5} bytes'
+            .format(name, sum(results) / len(results),
+                    results[len(results) / 2], results[-1], queries, size))
+
+    def populate(self):
+        seller = Seller.objects.create(uuid='solitude:benchmark')
+        product = SellerProduct.objects.create(
+            seller=seller, external_id='solitude:benchmark')
+        for x in range(20):
+            trans = Transaction.objects.create(
+                amount=5, provider=constants.PROVIDER_BANGO, seller=seller,
+                seller_product=product,
+                uuid='solitude:benchmark:{0}'.format(x))
+            Transaction.objects.create(
+                related=trans, seller_product=product,
+                type=constants.TYPE_REFUND,
+                uuid='solitude:benchmark:{0}:refund'.format(x))
+
+    def run(self, name, url, iterations):
+        view = BenchmarkViewSet.as_view({'get': 'list'})
+        call = lambda: view(RequestFactory().get(url)).render()
+        with CaptureQueriesContext(connection) as queries:
+            response = call()
+        self.report(name, timed(call, iterations),
+                    len(queries.captured_queries), len(response.content))
+
+    def handle(self, *args, **options):
+        url = '/generic/transaction/?limit=20'
+        with transaction.atomic():
+            self.populate()
+            self.run('all fields', url, options['iterations'])
+            self.run(options['fields'],
+                     url + '&fields=' + options['fields'],
+                     options['iterations'])
+            transaction.set_rollback(True)
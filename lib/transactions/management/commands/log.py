@@ -10,10 +10,12 @@ from lib.transactions import constants
 from lib.transactions.models import Transaction
 from solitude.logger import getLogger
 from solitude.management.commands.push_s3 import push
+from solitude.replicas import use_replica
 
 log = getLogger('s.transactions')
 
 
+@use_replica
 def generate_log(day, filename, log_type):
     out = open(filename, 'w')
     writer = csv.writer(out)
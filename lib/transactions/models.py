@@ -1,8 +1,9 @@
+import threading
 import time
 from collections import OrderedDict
 
-from django.core.urlresolvers import reverse
-from django.db import models
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, models, transaction
 from django.dispatch import receiver
 
 from django_statsd.clients import statsd
@@ -10,12 +11,78 @@ from django_statsd.clients import statsd
 from lib.transactions import constants
 from solitude.base import Model
 from solitude.logger import getLogger
+from solitude.uris import reverse
 from solitude.utils import shorter
 
 log = getLogger('s.transaction')
 stats_log = getLogger('s.transaction.stats')
 
 
+class UidBlock(models.Model):
+    # Each row reserves the numbers from start to start + size for short
+    # uids, see UidAllocator.
+    start = models.BigIntegerField(unique=True)
+    size = models.PositiveIntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'transaction_uid_block'
+
+
+class UidAllocator(object):
+
+    """
+    Hands out unique numbers for short uids from a block reserved by this
+    process, so that a short uid can be made before the transaction is saved.
+
+    A block starts where the last one ends, so changing
+    TRANSACTION_UID_BLOCK_SIZE doesn't make blocks overlap. Two processes
+    reserving the same start at once can't both insert it, the one that
+    fails tries again after the other's block.
+
+    Blocks are reserved on the TRANSACTION_UID_DATABASE connection in a
+    database transaction of their own. The other requests of the process use
+    the block too, so it has to stay reserved if the request that reserved
+    it is rolled back.
+    """
+
+    attempts = 5
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.next = self.end = 0
+
+    def reserve(self):
+        using = settings.TRANSACTION_UID_DATABASE
+        if using not in settings.DATABASES:
+            using = DEFAULT_DB_ALIAS
+        blocks = UidBlock.objects.using(using)
+        for attempt in range(self.attempts):
+            try:
+                with transaction.atomic(using=using):
+                    last = blocks.order_by('-start').first()
+                    return blocks.create(
+                        start=last.start + last.size if last else 1,
+                        size=settings.TRANSACTION_UID_BLOCK_SIZE)
+            except IntegrityError:
+                if attempt == self.attempts - 1:
+                    raise
+                log.info('Uid block reserved by another process, retrying')
+                statsd.incr('solitude.transaction.uid_block.retry')
+
+    def allocate(self):
+        with self.lock:
+            if self.next >= self.end:
+                block = self.reserve()
+                self.next, self.end = block.start, block.start + block.size
+                statsd.incr('solitude.transaction.uid_block')
+            self.next += 1
+            return self.next - 1
+
+
+uids = UidAllocator()
+
+
 class Transaction(Model):
     # In the case of some transactions (e.g. Bango) we don't know the amount
     # until the transaction reaches a certain stage.
@@ -88,8 +155,9 @@ class Transaction(Model):
 
     def create_short_uid(self):
         """
-        Generate a unique id based on the primary key which is shorter
-        (14 chars) than an average uuid (32 chars).
+        Generate a unique id which is shorter (14 chars) than an average uuid
+        (32 chars). It doesn't need the primary key, so set it before the
+        transaction is first saved.
         """
         codes = {
             constants.PROVIDER_BANGO: 'ba',
@@ -100,8 +168,8 @@ class Transaction(Model):
                 # Get a provider code or dk for dont know.
                 codes.get(self.provider, 'dk'),
                 # Should be unique within this db.
-                shorter(self.pk),
-                # If pk is repeated (eg. in tests, dev) should still
+                shorter(uids.allocate()),
+                # If the database is reset (eg. in tests, dev) should still
                 # be unique.
                 shorter(int(time.time())))
         )
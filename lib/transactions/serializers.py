@@ -1,15 +1,17 @@
 import uuid
 
-from django.core.urlresolvers import reverse
-
 from rest_framework import serializers
 
 from lib.transactions.models import Transaction
 from solitude.base import BaseSerializer
 from solitude.related_fields import PathRelatedField
+from solitude.uris import reverse
 
 
 class TransactionSerializer(BaseSerializer):
+    cached = True
+    # Relations are other transactions that point to this one.
+    uncached_fields = ('relations',)
     buyer = PathRelatedField(view_name='generic:buyer-detail', required=False)
     seller = PathRelatedField(view_name='generic:seller-detail',
                               required=False)
@@ -32,8 +34,8 @@ class TransactionSerializer(BaseSerializer):
     def transform_relations(self, obj, value):
         objs = []
         if obj:
-            relations = Transaction.objects.filter(related=obj)
-            for relation in relations:
+            # Uses the relations prefetched by the view, if any.
+            for relation in obj.relations.all():
                 # Note that if this relation has more relations, it will fail
                 # to serialize on the recursiveness. This can be fixed in
                 # DRF 3.x with recursivefield (if we want to).
@@ -1,5 +1,9 @@
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.db.models.signals import post_save, pre_save
+from django.test.utils import CaptureQueriesContext
 
+import mock
 from nose.tools import eq_, ok_
 
 from lib.bango.tests.utils import make_sellers
@@ -142,6 +146,36 @@ class TestTransaction(APITest):
         eq_(res.json['objects'][0]['related'],
             '/generic/transaction/%s/' % self.trans.pk)
 
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            eq_(self.client.get(self.list_url).status_code, 200)
+        return len(queries)
+
+    def test_list_queries(self):
+        # The number of queries for a page doesn't depend on the number of
+        # transactions, their foreign keys or their relations.
+        Transaction.objects.create(related=self.trans, uuid='sample:refund')
+        expected = self.list_queries()
+        for x in range(5):
+            trans = Transaction.objects.create(
+                amount=5, buyer=self.buyer, seller=self.sellers.seller,
+                seller_product=self.product, uuid='sample:%s' % x)
+            Transaction.objects.create(
+                amount=5, buyer=self.buyer, seller_product=self.product,
+                related=trans, uuid='sample:%s:refund' % x)
+        eq_(self.list_queries(), expected)
+
+    def test_list_fields(self):
+        Transaction.objects.create(related=self.trans, uuid='sample:refund')
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(self.list_url,
+                                  {'fields': 'uuid,status,resource_uri'})
+        eq_(res.json['objects'][1], {
+            'uuid': self.uuid, 'status': self.trans.status,
+            'resource_uri': self.detail_url})
+        # Relations and foreign keys are not loaded.
+        ok_(len(queries) < self.list_queries())
+
     def test_create_minimal(self):
         res = self.client.post(self.list_url, data={})
         eq_(res.status_code, 201)
@@ -173,3 +207,72 @@ class TestTransaction(APITest):
         Transaction.objects.create(uuid='newest')
         res = self.client.get(self.list_url)
         eq_([o['uuid'] for o in res.json['objects']], ['newest', self.uuid])
+
+
+class TestBulk(APITest):
+
+    def setUp(self):
+        self.url = reverse('generic:transaction-bulk')
+        self.sellers = make_sellers('sample:uid')
+        self.product = '/generic/product/{0}/'.format(
+            self.sellers.product.pk)
+
+    def test_create(self):
+        data = [{'uuid': 'sample:1'},
+                {'uuid': 'sample:2', 'provider': constants.PROVIDER_BANGO,
+                 'seller_product': self.product,
+                 'status': constants.STATUS_PENDING}]
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(self.url, data=data)
+        eq_(res.status_code, 201, res.content)
+        eq_([o['uuid'] for o in res.json['objects']],
+            ['sample:1', 'sample:2'])
+        eq_(Transaction.objects.get(uuid='sample:2').seller_product,
+            self.sellers.product)
+        eq_(len([q for q in queries.captured_queries
+                 if 'INSERT INTO' in q['sql']]), 1)
+
+    def test_errors(self):
+        data = [{'uuid': 'sample:1'},
+                {'uuid': 'sample:2', 'status': constants.STATUS_PENDING},
+                {'uuid': 'sample:3', 'amount': 'nope'}]
+        res = self.client.post(self.url, data=data)
+        eq_(res.status_code, 400)
+        errors = res.json['errors']
+        eq_(errors[0], {})
+        eq_(errors[1], {'non_field_errors': ['Provider must be set']})
+        ok_(errors[2]['amount'])
+        ok_(not Transaction.objects.exists())
+
+    def test_duplicate(self):
+        Transaction.objects.create(uuid='sample:1')
+        res = self.client.post(self.url, data=[{'uuid': 'sample:1'}])
+        eq_(res.status_code, 400)
+        res = self.client.post(self.url, data=[{'uuid': 'sample:2'},
+                                               {'uuid': 'sample:2'}])
+        eq_(res.status_code, 400)
+        eq_(Transaction.objects.count(), 1)
+
+    def test_not_list(self):
+        eq_(self.client.post(self.url, data={}).status_code, 400)
+
+    def test_no_save(self):
+        # Transactions are created without save(), so there are no signals.
+        receiver = mock.Mock()
+        pre_save.connect(receiver, sender=Transaction)
+        post_save.connect(receiver, sender=Transaction)
+        try:
+            res = self.client.post(self.url, data=[{'uuid': 'sample:1'}])
+        finally:
+            pre_save.disconnect(receiver, sender=Transaction)
+            post_save.disconnect(receiver, sender=Transaction)
+        eq_(res.status_code, 201, res.content)
+        ok_(not receiver.called)
+        trans = Transaction.objects.get(uuid='sample:1')
+        eq_(trans.counter, 0)
+        ok_(trans.created)
+
+    def test_too_many(self):
+        with self.settings(BULK_CREATE_MAX=1):
+            res = self.client.post(self.url, data=[{}, {}])
+        eq_(res.status_code, 400)
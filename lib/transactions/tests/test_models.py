@@ -1,11 +1,12 @@
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 
 from mock import ANY, patch
 from nose.tools import eq_, ok_
 
 from lib.sellers.models import Seller, SellerProduct
 from lib.transactions import constants
-from lib.transactions.models import Transaction
+from lib.transactions.models import Transaction, UidAllocator, UidBlock
 from solitude.base import APITest
 
 
@@ -98,3 +99,64 @@ class TestModel(APITest):
         del data['provider']
         obj = Transaction.objects.create(**data)
         ok_(obj.create_short_uid().startswith('dk-'))
+
+    def test_short_id_unsaved(self):
+        obj = Transaction(**self.get_data())
+        obj.uuid = obj.create_short_uid()
+        ok_(obj.uuid != obj.create_short_uid())
+        obj.save()
+
+
+class TestUidAllocator(APITest):
+
+    def test_blocks(self):
+        first, second = UidAllocator(), UidAllocator()
+        with self.settings(TRANSACTION_UID_BLOCK_SIZE=2):
+            numbers = [first.allocate(), second.allocate(),
+                       first.allocate(), first.allocate()]
+        eq_(len(set(numbers)), 4)
+        eq_(UidBlock.objects.count(), 3)
+
+    def test_block_size_changed(self):
+        first, second = UidAllocator(), UidAllocator()
+        with self.settings(TRANSACTION_UID_BLOCK_SIZE=2):
+            numbers = [first.allocate()]
+        with self.settings(TRANSACTION_UID_BLOCK_SIZE=5):
+            numbers += [second.allocate() for x in range(5)]
+        numbers += [first.allocate() for x in range(2)]
+        eq_(len(set(numbers)), 8)
+        eq_([(block.start, block.size) for block in
+             UidBlock.objects.order_by('start')], [(1, 2), (3, 5), (8, 100)])
+
+    @patch('lib.transactions.models.transaction.atomic')
+    @patch.object(UidBlock.objects, 'using')
+    def test_own_connection(self, using, atomic):
+        blocks = using.return_value
+        blocks.order_by.return_value.first.return_value = None
+        blocks.create.return_value = UidBlock(start=1, size=2)
+        with self.settings(TRANSACTION_UID_DATABASE='uids'):
+            eq_(UidAllocator().allocate(), 1)
+        using.assert_called_with('uids')
+        atomic.assert_called_with(using='uids')
+
+    def test_no_connection(self):
+        with self.settings(TRANSACTION_UID_DATABASE='nope'):
+            UidAllocator().allocate()
+        eq_(UidBlock.objects.count(), 1)
+
+    @patch.object(UidBlock.objects, 'using')
+    def test_reserved_elsewhere(self, using):
+        blocks = using.return_value
+        blocks.order_by.return_value.first.return_value = None
+        blocks.create.side_effect = [IntegrityError, UidBlock(start=3, size=2)]
+        eq_(UidAllocator().allocate(), 3)
+        eq_(blocks.create.call_count, 2)
+
+    @patch.object(UidBlock.objects, 'using')
+    def test_reserve_fails(self, using):
+        blocks = using.return_value
+        blocks.order_by.return_value.first.return_value = None
+        blocks.create.side_effect = IntegrityError
+        with self.assertRaises(IntegrityError):
+            UidAllocator().allocate()
+        eq_(blocks.create.call_count, UidAllocator.attempts)
@@ -1,3 +1,5 @@
+from django.conf.urls import include, patterns, url
+
 from rest_framework.routers import DefaultRouter
 
 from lib.transactions import views
@@ -5,4 +7,9 @@ from lib.transactions import views
 router = DefaultRouter()
 router.register(r'transaction', views.TransactionViewSet)
 
-urlpatterns = router.urls
+urlpatterns = patterns(
+    '',
+    # Before the router, so bulk isn't taken as a transaction id.
+    url(r'^transaction/bulk/$', views.bulk, name='transaction-bulk'),
+    url(r'', include(router.urls)),
+)
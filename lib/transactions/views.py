@@ -1,15 +1,35 @@
+from datetime import datetime
+
+from django import forms
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+
+from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from lib.transactions.forms import UpdateForm
+from lib.transactions import constants
+from lib.transactions.forms import check_status, UpdateForm
 from lib.transactions.models import Transaction
 from lib.transactions.serializers import TransactionSerializer
 from solitude.base import NonDeleteModelViewSet
+from solitude.related_fields import prefetch_paths
+
+
+# The foreign keys the serializer follows for each transaction.
+related = ('buyer', 'seller', 'seller_product', 'related')
 
 
 class TransactionViewSet(NonDeleteModelViewSet):
-    queryset = Transaction.objects.all()
+    # Load the foreign keys and relations of a page of transactions up front,
+    # instead of once per transaction.
+    queryset = Transaction.objects.select_related(*related).prefetch_related(
+        Prefetch('relations',
+                 queryset=Transaction.objects.select_related(*related)),
+        'relations__relations')
     serializer_class = TransactionSerializer
     filter_fields = ('uuid', 'seller', 'provider')
+    bulk_fields = ('uuid',)
 
     def update(self, request, *args, **kwargs):
         # Disallow PUT, but allow PATCH.
@@ -27,3 +47,87 @@ class TransactionViewSet(NonDeleteModelViewSet):
             )
 
         return self.form_errors(form)
+
+
+def validate(serializer):
+    """
+    Validates one transaction of a bulk create, returning the unsaved
+    transaction and any errors.
+    """
+    if not serializer.is_valid():
+        return None, serializer.errors
+
+    obj = serializer.object
+    try:
+        # A new transaction has to follow the same rules as a transaction
+        # that was just started.
+        check_status(
+            {'created': datetime.now(), 'status': constants.STATUS_DEFAULT},
+            {'status': obj.status, 'provider': obj.provider,
+             'seller_product': obj.seller_product_id})
+    except forms.ValidationError as error:
+        return None, {'non_field_errors': error.messages}
+
+    return obj, {}
+
+
+@api_view(['POST'])
+def bulk(request):
+    """
+    Creates a list of transactions in one go. Either all of the transactions
+    are created, or none are and the errors for each one are returned.
+
+    The transactions are written with bulk_create, so Transaction.save() isn't
+    called and no pre_save or post_save signals are sent. They get the same
+    counter, and so etag, as a save() would give a new row. created and
+    modified are set as usual. Receivers that only act on changes, such as
+    time_status_change, lose nothing, but any receiver for new transactions
+    won't see these.
+    """
+    if not isinstance(request.DATA, list):
+        return Response({'non_field_errors': ['Expected a list.']},
+                        status=400)
+    if len(request.DATA) > settings.BULK_CREATE_MAX:
+        return Response({'non_field_errors': [
+            'Too many transactions, the maximum is {0}.'
+            .format(settings.BULK_CREATE_MAX)]}, status=400)
+
+    serializers = [TransactionSerializer(data=data,
+                                         context={'request': request})
+                   for data in request.DATA]
+    # Look up the buyers, sellers and products for all the transactions in
+    # one query each.
+    pairs = []
+    for serializer in serializers:
+        if not isinstance(serializer.init_data, dict):
+            continue
+        for name, field in serializer.fields.items():
+            field.initialize(parent=serializer, field_name=name)
+            pairs.append((field, serializer.init_data.get(name)))
+    prefetch_paths(pairs)
+
+    objs, errors = zip(*[validate(serializer)
+                         for serializer in serializers]) or ((), ())
+    if any(errors):
+        return Response({'errors': errors}, status=400)
+
+    uuids = [obj.uuid for obj in objs]
+    if len(set(uuids)) != len(uuids):
+        return Response({'non_field_errors': ['Duplicate uuids.']},
+                        status=400)
+
+    try:
+        with transaction.atomic():
+            Transaction.objects.bulk_create(objs)
+    except IntegrityError:
+        return Response({'non_field_errors': [
+            'Transactions conflict with existing ones.']}, status=400)
+
+    # Not every database sets the primary key on bulk inserts, so the
+    # transactions are read back to get them.
+    created = dict((obj.uuid, obj) for obj in
+                   TransactionViewSet.queryset.filter(uuid__in=uuids))
+    serializer = TransactionSerializer(
+        [created[uuid] for uuid in uuids], many=True,
+        context={'request': request})
+    return Response({'objects': serializer.data}, status=201)
@@ -0,0 +1,6 @@
+CREATE TABLE `transaction_uid_block` (
+    `id` int(11) unsigned AUTO_INCREMENT NOT NULL PRIMARY KEY,
+    `start` bigint NOT NULL UNIQUE,
+    `size` int(11) unsigned NOT NULL,
+    `created` datetime(6) NOT NULL
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci;
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Drives the gevent proxy in wsgi/proxy_gevent.py with many concurrent calls to
+a slow fake zippy and compares it to the same proxy handling one call at a
+time, like a blocking WSGI worker.
+
+The proxy is started with the settings on this machine, ZIPPY_BASE_URL is
+pointed at the fake zippy and calls go to the `reference` zippy backend::
+
+    python samples/proxy-benchmark.py --requests 2000 --delay 1
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import argparse  # noqa
+import os  # noqa
+import socket  # noqa
+import subprocess  # noqa
+import sys  # noqa
+import urllib2  # noqa
+from time import time  # noqa
+
+import gevent  # noqa
+from gevent.pool import Pool  # noqa
+from gevent.pywsgi import WSGIServer  # noqa
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def upstream(delay):
+    """A fake zippy that takes `delay` seconds to answer anything."""
+    def app(environ, start_response):
+        gevent.sleep(delay)
+        start_response('200 OK', [('Content-Type', 'application/json')])
+        return ['{"status": "ok"}']
+
+    return WSGIServer(('127.0.0.1', 0), app, spawn=Pool(), log=None)
+
+
+def free_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def proxy(port, connections, zippy):
+    """Start wsgi/proxy_gevent.py and wait for it to listen on `port`."""
+    env = dict(os.environ,
+               SOLITUDE_PROXY_HOST='127.0.0.1',
+               SOLITUDE_PROXY_PORT=str(port),
+               SOLITUDE_PROXY_CONNECTIONS=str(connections),
+               ZIPPY_BASE_URL=zippy)
+    with open(os.devnull, 'w') as devnull:
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(root, 'wsgi', 'proxy_gevent.py')],
+            env=env, stdout=devnull, stderr=devnull)
+
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port)).close()
+            return process
+        except socket.error:
+            if process.poll() is not None:
+                raise RuntimeError('Proxy failed to start.')
+            gevent.sleep(0.1)
+
+
+def run(url, requests, concurrency):
+    latencies = []
+    errors = []
+
+    def call():
+        start = time()
+        try:
+            urllib2.urlopen(url).read()
+        except (urllib2.URLError, socket.error) as err:
+            errors.append(err)
+            return
+        latencies.append(time() - start)
+
+    pool = Pool(concurrency)
+    start = time()
+    for x in range(requests):
+        pool.spawn(call)
+    pool.join()
+    elapsed = time() - start
+
+    if not latencies:
+        raise RuntimeError('Every request failed, first error: {0}'
+                           .format(errors[0]))
+    latencies.sort()
+    return (len(latencies) / elapsed, len(errors),
+            latencies[len(latencies) / 2],
+            latencies[int(len(latencies) * 0.99)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=1000)
+    parser.add_argument('--delay', type=float, default=0.5,
+                        help='Seconds the fake zippy takes to respond.')
+    args = parser.parse_args()
+
+    fake = upstream(args.delay)
+    fake.start()
+    zippy = 'http://127.0.0.1:{0}'.format(fake.server_port)
+
+    # One call at a time takes `delay` seconds each, so only time a few.
+    for name, connections, requests in (
+            ('blocking', 1, min(args.requests, 10)),
+            ('gevent', args.concurrency, args.requests)):
+        port = free_port()
+        process = proxy(port, connections, zippy)
+        try:
+            url = ('http://127.0.0.1:{0}/proxy/provider/reference/bench/'
+                   .format(port))
+            rate, errors, median, p99 = run(url, requests, args.concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+        print ('{0}: {1} requests, {2} errors, {3:.1f} requests/sec, '
+               'median {4:.2f}s, p99 {5:.2f}s'
+               .format(name, requests, errors, rate, median, p99))
+
+    fake.stop()
+
+
+if __name__ == '__main__':
+    main()
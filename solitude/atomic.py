@@ -0,0 +1,127 @@
+"""
+Keeps database transactions open only for database work.
+
+ATOMIC_REQUESTS runs every request in one transaction. When a view calls
+Bango or Braintree that transaction, with its row locks and connection,
+stays open for as long as the provider takes to answer. Views marked with
+`scoped`, or the `scoped_actions` of a ScopedAtomicMixin viewset, run outside
+the request transaction. They put their database work in short
+transaction.atomic() blocks around the provider calls. If the database work
+after a provider call fails, `Compensations` undoes the call.
+"""
+import functools
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from django_statsd.clients import statsd
+
+from solitude.logger import getLogger
+
+log = getLogger('s.atomic')
+
+_local = threading.local()
+
+
+def in_scope():
+    """
+    True while a scoped view is running. There is no request transaction to
+    roll back when it raises.
+    """
+    return getattr(_local, 'scoped', False)
+
+
+@contextmanager
+def scope():
+    _local.scoped = True
+    try:
+        yield
+    finally:
+        _local.scoped = False
+
+
+def scoped(view):
+    """
+    Runs a function view outside of the request transaction. Put it above
+    @api_view.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with scope():
+            return view(request, *args, **kwargs)
+    return transaction.non_atomic_requests(wrapper)
+
+
+def depth(using=None):
+    """
+    The number of atomic blocks open on the connection, 0 if there is no
+    transaction.
+    """
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        return 0
+    return len(connection.savepoint_ids) + 1
+
+
+class ScopedAtomicMixin(object):
+
+    """
+    A viewset mixin that runs `scoped_actions` outside of the request
+    transaction. Every other action still runs in a transaction. This must
+    come before the viewset in the bases.
+    """
+    scoped_actions = ()
+
+    @transaction.non_atomic_requests
+    def dispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        if action in self.scoped_actions:
+            with scope():
+                return super(ScopedAtomicMixin, self).dispatch(
+                    request, *args, **kwargs)
+
+        with transaction.atomic():
+            return super(ScopedAtomicMixin, self).dispatch(
+                request, *args, **kwargs)
+
+
+class Compensations(object):
+
+    """
+    Undoes provider calls when something later in the block fails. After
+    each call that succeeds, add the function that reverses it:
+
+        with Compensations() as undo:
+            result = client.create(data)
+            undo.add(client.delete, result.id)
+            with transaction.atomic():
+                Model.objects.create(provider_id=result.id)
+
+    If the block raises, the functions are called newest first and the
+    exception carries on. Functions that fail are logged and skipped.
+    """
+
+    def __init__(self):
+        self.undo = []
+
+    def add(self, func, *args, **kwargs):
+        self.undo.append((func, args, kwargs))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            return
+
+        for func, args, kwargs in reversed(self.undo):
+            name = getattr(func, '__name__', repr(func))
+            log.warning('Compensating with {0}{1}'.format(name, args))
+            statsd.incr('solitude.compensation')
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                statsd.incr('solitude.compensation.failed')
+                log.exception('Compensation failed: {0}{1}'
+                              .format(name, args))
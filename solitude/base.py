@@ -6,7 +6,7 @@ from hashlib import md5
 from django import test
 from django.conf import settings
 from django.db import models
-from django.db.models import F
+from django.db.models import Count, F, Max, Sum
 from django.db.models.query import QuerySet
 from django.forms import model_to_dict
 from django.http import Http404
@@ -22,7 +22,10 @@ from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+from solitude.cache import representations
+from solitude.errors import InvalidQueryParams
 from solitude.logger import getLogger
+from solitude.paginator import CursorPage, CursorPaginationSerializer
 
 log = getLogger('s')
 dump_log = getLogger('s.dump')
@@ -51,6 +54,20 @@ def etag_func(request, data, *args, **kwargs):
     return md5(''.join(all_etags)).hexdigest()
 
 
+def list_etag(queryset, *extra):
+    """
+    Builds the etag for a list in one query, from the number of rows, the
+    highest pk and the sum of the counters, instead of loading every row.
+
+    :param queryset: the queryset for the list, can be sliced
+    :param extra: any other values the response depends on
+    """
+    result = queryset.aggregate(count=Count('pk'), last=Max('pk'),
+                                counters=Sum('counter'))
+    values = (result['count'], result['last'], result['counters']) + extra
+    return ':'.join(str(value) for value in values)
+
+
 class _JSONifiedResponse(object):
 
     def __init__(self, response):
@@ -245,17 +262,158 @@ def dump_response(response=None, **kw):
         dump_log.debug('response header: {0}: {1}'.format(hdr, value))
 
 
+def requested_fields(context):
+    """
+    Returns the names in the fields query parameter of a GET to a view with a
+    fields_kwarg, or None if all the fields are wanted.
+    """
+    request, view = context.get('request'), context.get('view')
+    param = getattr(view, 'fields_kwarg', None)
+    if not param or request is None or request.method != 'GET':
+        return None
+
+    value = request.QUERY_PARAMS.get(param)
+    if not value:
+        return None
+    return set(value.split(','))
+
+
+def sparse_queryset(queryset, names):
+    """
+    Limits the columns selected by the queryset to the primary key, counter
+    and the fields in names. Related objects that are not in names are no
+    longer selected or prefetched.
+    """
+    def paths(tree, prefix=''):
+        for name, subtree in tree.items():
+            if subtree:
+                for path in paths(subtree, prefix + name + '__'):
+                    yield path
+            else:
+                yield prefix + name
+
+    def wanted(path):
+        return path.split('__')[0] in names
+
+    related = queryset.query.select_related
+    if isinstance(related, dict):
+        queryset = queryset.select_related(None)
+        related = filter(wanted, paths(related))
+        if related:
+            queryset = queryset.select_related(*related)
+
+    prefetches = [lookup for lookup in queryset._prefetch_related_lookups
+                  if wanted(getattr(lookup, 'prefetch_through', lookup))]
+    queryset = queryset.prefetch_related(None).prefetch_related(*prefetches)
+
+    return queryset.only(*[
+        field.name for field in queryset.model._meta.concrete_fields
+        if field.primary_key or field.name in names or
+        field.name == 'counter'])
+
+
 class BaseSerializer(serializers.ModelSerializer):
 
     """
     Standard base serializer for solitude objects.
+
+    If the view has a fields_kwarg, a GET can ask for some of the fields
+    only, eg: ?fields=uuid,resource_uri.
     """
     resource_pk = serializers.CharField(source='pk', read_only=True)
     resource_uri = serializers.SerializerMethodField('get_resource_uri')
+    # Set this to True to cache the serialized fields of each version of a
+    # row, see solitude.cache.
+    cached = False
+    # Fields that depend on more than the row itself, such as other rows or
+    # the time. These are serialized every time.
+    uncached_fields = ()
+    # The model fields read by serializer fields that don't have the name of
+    # a model field, see model_fields.
+    field_sources = {'resource_pk': (), 'resource_uri': ()}
+
+    def __init__(self, *args, **kwargs):
+        super(BaseSerializer, self).__init__(*args, **kwargs)
+        requested = requested_fields(self.context)
+        self.sparse = requested is not None
+        if self.sparse:
+            unknown = requested.difference(self.fields)
+            if unknown:
+                raise InvalidQueryParams(
+                    detail='Unknown fields: ' + ','.join(sorted(unknown)))
+            for name in self.fields.keys():
+                if name not in requested:
+                    del self.fields[name]
+
+    def model_fields(self):
+        """
+        Returns the names of the model fields and relations the fields of
+        this serializer read, or None if that isn't known.
+        """
+        known = set(field.name for field in self.opts.model._meta.get_fields())
+        names = set()
+        for name, field in self.fields.items():
+            if name in self.field_sources:
+                names.update(self.field_sources[name])
+                continue
+            source = (field.source or name).split('.')[0]
+            if source not in known:
+                return None
+            names.add(source)
+        return names
 
     def get_resource_uri(self, obj):
         return self.resource_uri(obj.pk)
 
+    def serialize_field(self, obj, field_name, field):
+        """Serialize one field, the same way as to_native."""
+        field.initialize(parent=self, field_name=field_name)
+        value = field.field_to_native(obj, field_name)
+        method = getattr(self, 'transform_%s' % field_name, None)
+        if callable(method):
+            value = method(obj, value)
+        return value
+
+    def from_cache(self, obj, cached):
+        # The same as to_native, including the field metadata the browsable
+        # API renders forms from, with the cached values.
+        ret = self._dict_class()
+        ret.fields = self._dict_class()
+        for field_name, field in self.fields.items():
+            key = self.get_field_key(field_name)
+            if field_name in self.uncached_fields:
+                value = self.serialize_field(obj, field_name, field)
+            else:
+                field.initialize(parent=self, field_name=field_name)
+                value = cached[key]
+            ret[key] = value
+            ret.fields[key] = self.augment_field(field, field_name, key, value)
+        return ret
+
+    def to_native(self, obj):
+        key = None
+        if self.cached and settings.REPRESENTATION_CACHE and obj is not None:
+            key = representations.key(self, obj)
+        if key is None:
+            return super(BaseSerializer, self).to_native(obj)
+
+        cached = representations.get(key)
+        if cached is not None:
+            try:
+                return self.from_cache(obj, cached)
+            except KeyError:
+                # Cached before a field was added to this serializer.
+                pass
+
+        ret = super(BaseSerializer, self).to_native(obj)
+        if self.sparse:
+            # Only some of the fields were serialized.
+            return ret
+        uncached = [self.get_field_key(name) for name in self.uncached_fields]
+        representations.set(key, dict((k, v) for k, v in ret.items()
+                                      if k not in uncached))
+        return ret
+
 
 class BaseAPIView(APIView):
 
@@ -355,13 +513,41 @@ class ListModelMixin(object):
 
     """
     Turns the django-rest-framework mixin into an etag-aware one.
+
+    If the cursor query parameter is given, even if it's empty, the list is
+    paginated with cursors instead of page numbers, see CursorPage.
+
+    Bulk lookups on bulk_fields, see StrictQueryFilter, are returned on a
+    single page.
     """
     empty_error = "Empty list and '%(class_name)s.allow_empty' is False."
+    cursor_kwarg = 'cursor'
+    bulk_fields = ()
+
+    def is_bulk_lookup(self, request):
+        return any(field + '__in' in request.QUERY_PARAMS
+                   for field in self.bulk_fields)
+
+    def get_paginate_by(self, *args, **kwargs):
+        if self.is_bulk_lookup(self.request):
+            return settings.BULK_LOOKUP_MAX
+        return super(ListModelMixin, self).get_paginate_by(*args, **kwargs)
+
+    def get_pagination_serializer(self, page):
+        if not isinstance(page, CursorPage):
+            return (super(ListModelMixin, self)
+                    .get_pagination_serializer(page))
+
+        class SerializerClass(CursorPaginationSerializer):
+            class Meta:
+                object_serializer_class = self.get_serializer_class()
+
+        return SerializerClass(instance=page,
+                               context=self.get_serializer_context())
 
     @method_decorator(etag(etag_func))
-    def list_response(self, request, data):
+    def list_response(self, request, page):
         # Switch between paginated or standard style responses
-        page = self.paginate_queryset(self.object_list)
         if page is not None:
             serializer = self.get_pagination_serializer(page)
         else:
@@ -386,7 +572,37 @@ class ListModelMixin(object):
             error_msg = self.empty_error % {'class_name': class_name}
             raise Http404(error_msg)
 
-        return self.list_response(request, self.object_list)
+        if self.is_bulk_lookup(request):
+            # Bulk lookups are on unique fields and capped in size, so all
+            # the matches fit on one page and are loaded in one query.
+            self.object_list = list(self.object_list)
+            request.initial_etag = ':'.join(
+                obj.etag for obj in self.object_list)
+            return self.list_response(
+                request, self.paginate_queryset(self.object_list))
+
+        page_size = self.get_paginate_by()
+        if page_size and self.cursor_kwarg in request.QUERY_PARAMS:
+            page = CursorPage(self.object_list,
+                              request.QUERY_PARAMS[self.cursor_kwarg],
+                              page_size)
+            # The rows are already loaded, so there's no need for a query.
+            request.initial_etag = ':'.join(
+                [obj.etag for obj in page.object_list] +
+                [str(page.next_cursor), str(page.prev_cursor)])
+            return self.list_response(request, page)
+
+        page = self.paginate_queryset(self.object_list)
+        if page is not None:
+            # The page also includes the total count and links to the next
+            # and previous pages.
+            request.initial_etag = list_etag(
+                page.object_list, page.paginator.count,
+                page.paginator.per_page, page.number)
+        else:
+            request.initial_etag = list_etag(self.object_list)
+
+        return self.list_response(request, page)
 
 
 class RetrieveModelMixin(object):
@@ -414,7 +630,21 @@ class NoAddModelViewSet(
     """
     Same as the ModelViewSet, without the delete or create mixins. Uses our
     local mixins to give us ETag support.
+
+    When only some fields are asked for, see BaseSerializer, only the
+    columns and related objects those fields need are loaded.
     """
+    fields_kwarg = 'fields'
+
+    def get_queryset(self):
+        queryset = super(NoAddModelViewSet, self).get_queryset()
+        if requested_fields(self.get_serializer_context()) is None:
+            return queryset
+
+        names = self.get_serializer().model_fields()
+        if names is None:
+            return queryset
+        return sparse_queryset(queryset, names)
 
     def form_errors(self, forms):
         return Response(format_form_errors(forms), status=400)
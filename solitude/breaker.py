@@ -0,0 +1,203 @@
+"""
+Circuit breakers for the calls solitude makes to Bango and Braintree.
+
+Each method of a provider has a Breaker that keeps whether each of its last
+BREAKER_WINDOW calls failed and how long it took. Once at least
+BREAKER_MIN_CALLS are known and more than BREAKER_ERROR_RATE of them failed,
+the breaker opens. While it is open, calls fail straight away instead of
+holding a worker until the provider times out. After BREAKER_COOLDOWN seconds
+it is half-open: one call at a time goes through as a probe. If the probe
+works the breaker closes, if not it opens again.
+
+The timeout of a call is taken from the same window: BREAKER_TIMEOUT_FACTOR
+times the BREAKER_PERCENTILE latency of the calls that worked, between
+BREAKER_MIN_TIMEOUT and the timeout of the provider.
+
+Only failures of the provider count: a provider telling us our data is wrong
+is working fine.
+"""
+import math
+import threading
+from collections import deque
+from time import time
+
+from django.conf import settings
+
+from django_statsd.clients import statsd
+
+from solitude.logger import getLogger
+
+log = getLogger('s.breaker')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def percentile(values, percent):
+    """
+    The nearest rank percentile of a list of numbers, None if it's empty.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    rank = int(math.ceil(len(values) * percent / 100.0))
+    return values[max(rank, 1) - 1]
+
+
+class Breaker(object):
+
+    def __init__(self, service, method):
+        self.service = service
+        self.method = method
+        self.lock = threading.Lock()
+        # (failed, seconds) for each call, newest last.
+        self.calls = deque(maxlen=settings.BREAKER_WINDOW)
+        self.state = CLOSED
+        self.opened = None
+        self.probing = False
+        self.probed = None
+        self.ceiling = None
+
+    @property
+    def name(self):
+        return 'solitude.breaker.{0}.{1}'.format(self.service,
+                                                 self.method.lower())
+
+    def allow(self):
+        """
+        True if a call can be made now. If the breaker is half-open, the call
+        is the probe and must be recorded.
+        """
+        if not settings.BREAKERS:
+            return True
+
+        with self.lock:
+            if (self.state == OPEN and
+                    time() - self.opened >= settings.BREAKER_COOLDOWN):
+                self.state = HALF_OPEN
+                self.probing = False
+
+            # A probe that never came back doesn't hold the breaker forever.
+            if self.state == HALF_OPEN and (
+                    not self.probing or
+                    time() - self.probed >= settings.BREAKER_COOLDOWN):
+                self.probing = True
+                self.probed = time()
+                return True
+
+            if self.state != CLOSED:
+                statsd.incr(self.name + '.rejected')
+                return False
+            return True
+
+    def record(self, failed, seconds):
+        with self.lock:
+            self.calls.append((failed, seconds))
+            if self.state == HALF_OPEN:
+                if failed:
+                    self.open()
+                else:
+                    self.close()
+            elif self.state == CLOSED and self.tripped():
+                self.open()
+
+    def tripped(self):
+        if len(self.calls) < settings.BREAKER_MIN_CALLS:
+            return False
+        return self.error_rate() > settings.BREAKER_ERROR_RATE
+
+    def error_rate(self):
+        if not self.calls:
+            return 0.0
+        return sum(1 for failed, _ in self.calls if failed) / float(
+            len(self.calls))
+
+    def open(self):
+        log.warning('Opening the breaker for {0} {1}'
+                    .format(self.service, self.method))
+        statsd.incr(self.name + '.open')
+        self.state = OPEN
+        self.opened = time()
+        self.probing = False
+
+    def close(self):
+        log.info('Closing the breaker for {0} {1}'
+                 .format(self.service, self.method))
+        statsd.incr(self.name + '.close')
+        self.state = CLOSED
+        self.opened = None
+        self.probing = False
+        # The failures that opened the breaker are in the past now.
+        self.calls.clear()
+
+    def latency(self):
+        return percentile([seconds for failed, seconds in self.calls
+                           if not failed], settings.BREAKER_PERCENTILE)
+
+    def timeout(self, ceiling):
+        """
+        The timeout in seconds for the next call, at most `ceiling`, which is
+        the timeout of the provider.
+        """
+        self.ceiling = ceiling
+        if not settings.BREAKERS:
+            return ceiling
+
+        with self.lock:
+            latency = None
+            if len(self.calls) >= settings.BREAKER_MIN_CALLS:
+                latency = self.latency()
+        if latency is None:
+            return ceiling
+        return min(ceiling, max(settings.BREAKER_MIN_TIMEOUT,
+                                latency * settings.BREAKER_TIMEOUT_FACTOR))
+
+    def status(self):
+        with self.lock:
+            status = {
+                'service': self.service,
+                'method': self.method,
+                'state': self.state,
+                'calls': len(self.calls),
+                'error_rate': self.error_rate(),
+                'latency': self.latency(),
+                'retry_in': None,
+            }
+            if self.state == OPEN:
+                status['retry_in'] = max(
+                    0, self.opened + settings.BREAKER_COOLDOWN - time())
+        status['timeout'] = (self.timeout(self.ceiling)
+                             if self.ceiling is not None else None)
+        return status
+
+
+class Breakers(object):
+
+    """
+    The per-process breakers, keyed on the provider and its method.
+    """
+
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, service, method):
+        key = (service, method)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    key, Breaker(service, method))
+        return breaker
+
+    def status(self):
+        return [breaker.status()
+                for key, breaker in sorted(self._breakers.items())]
+
+    def clear(self):
+        with self._lock:
+            self._breakers.clear()
+
+
+breakers = Breakers()
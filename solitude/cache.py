@@ -0,0 +1,222 @@
+import cPickle as pickle
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import signals
+
+from django_statsd.clients import statsd
+
+_local = threading.local()
+
+
+class LRU(object):
+
+    """
+    A least recently used cache for one process, bounded by `size` entries.
+    Evictions are counted in statsd under `name`.
+    """
+
+    def __init__(self, size, name='representation'):
+        self.size = size
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return None
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+                statsd.incr('solitude.{0}.evict'.format(self.name))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RepresentationCache(object):
+
+    """
+    Caches the serialized fields of a row. Every save of a solitude.base.Model
+    increments its counter, so the serializer, pk and counter identify one
+    version of a row and the cached fields never need to be invalidated.
+
+    Representations are looked up in memory first, then in the Django cache.
+    """
+
+    def __init__(self):
+        self.local = LRU(settings.REPRESENTATION_CACHE_SIZE)
+
+    def key(self, serializer, obj):
+        """
+        The key for the object, or None if the object can't be cached.
+        """
+        counter = getattr(obj, 'counter', None)
+        # After a save the counter is an F expression until it's reloaded.
+        if not isinstance(counter, (int, long)) or obj.pk is None:
+            return None
+        return 'solitude:representation:{0}.{1}:{2}:{3}'.format(
+            serializer.__class__.__module__, serializer.__class__.__name__,
+            obj.pk, counter)
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            statsd.incr('solitude.representation.hit.local')
+            return value
+
+        value = cache.get(key)
+        if value is not None:
+            statsd.incr('solitude.representation.hit.cache')
+            self.local.set(key, value)
+            return value
+
+        statsd.incr('solitude.representation.miss')
+        return None
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        cache.set(key, value, settings.REPRESENTATION_CACHE_TIMEOUT)
+
+    def clear(self):
+        """Clears this process, entries in the Django cache are left."""
+        self.local.clear()
+
+
+representations = RepresentationCache()
+
+
+class RowCache(object):
+
+    """
+    A read-through cache for rows that are looked up much more often than
+    they change, such as a SellerProduct by its public_id.
+
+    Rows are looked up in memory first, then in the Django cache and then in
+    the database. The keys include a version kept in the Django cache, which
+    is bumped whenever one of `models` is saved or deleted, so a change in
+    any process invalidates all the entries at once. Each process keeps the
+    version for ROW_CACHE_VERSION_TIMEOUT seconds, so other processes can
+    read the old rows for that long.
+
+    Saves send post_save before the transaction commits, so a row read by
+    another process in between can be cached under the new version. The
+    RowCacheMiddleware bumps the version again once the request is
+    committed.
+    """
+
+    def __init__(self, name, models):
+        self.name = name
+        self.local = LRU(settings.ROW_CACHE_SIZE, name='rows.' + name)
+        self.version_key = 'solitude:rows:{0}:version'.format(name)
+        # The version and when it was read from the Django cache.
+        self._version = (None, 0)
+        for model in models:
+            for signal in (signals.post_save, signals.post_delete):
+                signal.connect(self.invalidate, sender=model, weak=False,
+                               dispatch_uid='solitude:rows:' + name)
+
+    def version(self):
+        version, read = self._version
+        if (version is not None and
+                time.time() - read < settings.ROW_CACHE_VERSION_TIMEOUT):
+            return version
+
+        version = cache.get(self.version_key)
+        if version is None:
+            # Start from the time so versions that dropped out of the cache
+            # aren't used again.
+            cache.add(self.version_key, int(time.time() * 1000), None)
+            version = cache.get(self.version_key)
+        self._version = (version, time.time())
+        return version
+
+    def bump(self):
+        self._version = (None, 0)
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            self.version()
+
+    def invalidate(self, **kwargs):
+        self.bump()
+        invalidated = getattr(_local, 'invalidated', None)
+        if invalidated is not None:
+            invalidated.add(self)
+        statsd.incr('solitude.rows.{0}.invalidate'.format(self.name))
+
+    def key(self, version, queryset, lookup):
+        lookup = repr(sorted(lookup.items()))
+        return 'solitude:rows:{0}:{1}:{2}:{3}'.format(
+            self.name, version, queryset.model._meta.db_table,
+            hashlib.md5(lookup).hexdigest())
+
+    def get(self, queryset, **lookup):
+        """
+        The same as queryset.get(**lookup), through the cache. Only rows that
+        exist are cached. Each cache should only be given one queryset for a
+        model, the queryset isn't part of the key.
+        """
+        version = settings.ROW_CACHE and self.version()
+        if not version:
+            return queryset.get(**lookup)
+
+        key = self.key(version, queryset, lookup)
+        # Objects are stored pickled so that callers get their own copy.
+        value = self.local.get(key)
+        if value is not None:
+            statsd.incr('solitude.rows.{0}.hit.local'.format(self.name))
+            return pickle.loads(value)
+
+        value = cache.get(key)
+        if value is not None:
+            statsd.incr('solitude.rows.{0}.hit.cache'.format(self.name))
+            self.local.set(key, value)
+            return pickle.loads(value)
+
+        statsd.incr('solitude.rows.{0}.miss'.format(self.name))
+        obj = queryset.get(**lookup)
+        value = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        self.local.set(key, value)
+        cache.set(key, value, settings.ROW_CACHE_TIMEOUT)
+        return obj
+
+    def clear(self):
+        """Clears this process, entries in the Django cache are left."""
+        self.local.clear()
+        self._version = (None, 0)
+
+
+class RowCacheMiddleware(object):
+
+    """
+    Bumps the versions of the row caches invalidated by a request again after
+    its transaction is committed, see RowCache. Django commits ATOMIC_REQUESTS
+    before the response middleware runs.
+    """
+
+    def process_request(self, request):
+        _local.invalidated = set()
+
+    def process_response(self, request, response):
+        for rows in getattr(_local, 'invalidated', None) or ():
+            rows.bump()
+        _local.invalidated = None
+        return response
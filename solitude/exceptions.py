@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework.views import exception_handler
 
 from lib.bango.errors import BangoImmediateError
+from solitude.atomic import in_scope
 from solitude.logger import getLogger
 
 log = getLogger('s')
@@ -15,7 +16,9 @@ def custom_exception_handler(exc):
     # we rollback the transaction.
     log.info('Handling exception, about to roll back for: {}, {}'
              .format(type(exc), exc.message))
-    set_rollback(True)
+    # Scoped views have no request transaction, see solitude.atomic.
+    if not in_scope():
+        set_rollback(True)
 
     if hasattr(exc, 'formatter'):
         try:
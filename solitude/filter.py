@@ -1,3 +1,5 @@
+from django.conf import settings
+
 from rest_framework.filters import DjangoFilterBackend
 
 from solitude.errors import InvalidQueryParams
@@ -11,6 +13,11 @@ class StrictQueryFilter(DjangoFilterBackend):
     """
     Don't allow people to typo request params and return all the objects.
     Instead limit it down to the parameters allowed in filter_fields.
+
+    Fields listed in bulk_fields can also be looked up many at a time by
+    repeating the parameter with an __in suffix, eg:
+    ?uuid__in=a&uuid__in=b. At most settings.BULK_LOOKUP_MAX values are
+    accepted.
     """
 
     def get_filter_class(self, view, queryset=None):
@@ -26,10 +33,27 @@ class StrictQueryFilter(DjangoFilterBackend):
     def filter_queryset(self, request, queryset, view):
         requested = set(request.QUERY_PARAMS.keys())
         allowed = set(getattr(view, 'filter_fields', []))
+        # Pagination and field parameters are in the query string too.
+        for param in ('page_kwarg', 'paginate_by_param', 'cursor_kwarg',
+                      'fields_kwarg'):
+            if getattr(view, param, None):
+                allowed.add(getattr(view, param))
+        bulk_fields = getattr(view, 'bulk_fields', [])
+        allowed.update(field + '__in' for field in bulk_fields)
         difference = requested.difference(allowed)
         if difference:
             raise InvalidQueryParams(
                 detail='Incorrect query parameters: ' + ','.join(difference))
 
+        for field in bulk_fields:
+            values = request.QUERY_PARAMS.getlist(field + '__in')
+            if not values:
+                continue
+            if len(values) > settings.BULK_LOOKUP_MAX:
+                raise InvalidQueryParams(
+                    detail='Too many values for {0}__in, the maximum is {1}.'
+                    .format(field, settings.BULK_LOOKUP_MAX))
+            queryset = queryset.filter(**{field + '__in': values})
+
         return (super(StrictQueryFilter, self)
                 .filter_queryset(request, queryset, view))
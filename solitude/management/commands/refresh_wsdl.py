@@ -1,10 +1,12 @@
 import os
+from optparse import make_option
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
 import requests
 
+from lib.bango.client import clients, write_schema
 from lib.bango.constants import WSDL_MAP
 
 root = os.path.join(settings.ROOT, 'lib', 'bango', 'wsdl')
@@ -12,8 +14,28 @@ root = os.path.join(settings.ROOT, 'lib', 'bango', 'wsdl')
 
 class Command(BaseCommand):
     help = "Refresh the WSDLs."
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--schema-only',
+            action='store_true',
+            dest='schema_only',
+            default=False,
+            help='Only rebuild the schema files from the WSDLs on disk.'
+        ),
+    )
 
     def handle(self, *args, **kw):
+        if not kw['schema_only']:
+            self.download()
+
+        for dir in WSDL_MAP.keys():
+            print 'Building schema for', dir
+            print '...written to', write_schema(dir)
+
+        # Any clients built from the old WSDLs are now out of date.
+        clients.clear()
+
+    def download(self):
         for dir, wsdls in WSDL_MAP.items():
             for wsdl in wsdls.values():
                 filename = wsdl['file']
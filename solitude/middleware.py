@@ -15,6 +15,10 @@ def set_oauth_key(key):
     _local.OAUTH_KEY = key
 
 
+def set_transaction_id(transaction_id):
+    _local.TRANSACTION_ID = transaction_id
+
+
 class LoggerMiddleware(object):
 
     def process_request(self, request):
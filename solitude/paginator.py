@@ -1,7 +1,15 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
 from rest_framework import pagination
 from rest_framework import serializers
 from rest_framework.templatetags.rest_framework import replace_query_param
 
+from solitude.errors import InvalidQueryParams
+
+# The directions a cursor can point in.
+NEXT = 'n'
+PREV = 'p'
+
 
 class NextPageField(serializers.Field):
 
@@ -41,3 +49,86 @@ class MetaSerializer(serializers.Serializer):
 class CustomPaginationSerializer(pagination.BasePaginationSerializer):
     meta = MetaSerializer(source='*')  # Takes the page object as the source
     results_field = 'objects'
+
+
+def encode_cursor(direction, pk):
+    return urlsafe_b64encode('{0}:{1}'.format(direction, pk))
+
+
+def decode_cursor(cursor):
+    """Returns the direction and pk in the cursor, or raises a 400."""
+    try:
+        direction, pk = urlsafe_b64decode(str(cursor)).split(':')
+        pk = int(pk)
+    except (TypeError, ValueError):
+        raise InvalidQueryParams(detail='Invalid cursor.')
+    if direction not in (NEXT, PREV):
+        raise InvalidQueryParams(detail='Invalid cursor.')
+    return direction, pk
+
+
+class CursorPage(object):
+
+    """
+    A page of objects that comes after or before the object in a cursor.
+
+    Objects are ordered by -id, so each page is found by its primary key
+    rather than an offset and without counting the whole list, which keeps
+    deep pages as cheap as the first.
+    """
+
+    def __init__(self, queryset, cursor, size):
+        self.next_cursor = None
+        self.prev_cursor = None
+
+        if not cursor:
+            direction, pk = NEXT, None
+        else:
+            direction, pk = decode_cursor(cursor)
+
+        if direction == NEXT:
+            if pk is not None:
+                queryset = queryset.filter(pk__lt=pk)
+            rows = list(queryset.order_by('-pk')[:size + 1])
+            more = len(rows) > size
+            rows = rows[:size]
+            if more:
+                self.next_cursor = encode_cursor(NEXT, rows[-1].pk)
+            if pk is not None:
+                # Everything newer than this page.
+                self.prev_cursor = encode_cursor(
+                    PREV, rows[0].pk if rows else pk - 1)
+        else:
+            rows = list(queryset.filter(pk__gt=pk).order_by('pk')[:size + 1])
+            more = len(rows) > size
+            rows = rows[:size][::-1]
+            if more:
+                self.prev_cursor = encode_cursor(PREV, rows[0].pk)
+            # Everything older than this page.
+            self.next_cursor = encode_cursor(
+                NEXT, rows[-1].pk if rows else pk + 1)
+
+        self.object_list = rows
+
+
+class CursorField(serializers.Field):
+
+    """A link to the page for the cursor in `source`."""
+    cursor_field = 'cursor'
+
+    def to_native(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        url = request and request.get_full_path() or ''
+        return replace_query_param(url, self.cursor_field, value)
+
+
+class CursorMetaSerializer(serializers.Serializer):
+    next = CursorField(source='next_cursor')
+    prev = CursorField(source='prev_cursor')
+
+
+class CursorPaginationSerializer(pagination.BasePaginationSerializer):
+    meta = CursorMetaSerializer(source='*')
+    results_field = 'objects'
@@ -1,17 +1,166 @@
 import urlparse
+from collections import defaultdict
 
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.urlresolvers import (
+    get_script_prefix, get_urlconf, NoReverseMatch, resolve, Resolver404)
 from django.forms.fields import Field
 
 from rest_framework.relations import HyperlinkedRelatedField
 
+from solitude.cache import LRU
+from solitude.uris import reverse
+
+# Paths resolved to their view name and arguments, see resolve_path.
+resolved = LRU(settings.PATH_CACHE_SIZE, name='path')
+
+
+def resolve_path(path):
+    """
+    Django's resolve(), cached. Returns the view name, args and kwargs for
+    the path, or None if it doesn't match a url.
+    """
+    key = (get_urlconf(settings.ROOT_URLCONF), path)
+    match = resolved.get(key)
+    if match is None:
+        try:
+            found = resolve(path)
+            match = (found.view_name, found.args, found.kwargs)
+        except Resolver404:
+            match = ()
+        resolved.set(key, match)
+    return match or None
+
+
+def lookup_to_python(model, lookup_field, value):
+    """
+    The lookup from a path as the model field's value, which is how the
+    database compares it.
+    """
+    if lookup_field == 'pk':
+        field = model._meta.pk
+    else:
+        field = model._meta.get_field(lookup_field)
+    return field.to_python(value)
+
+
+def prefetch_paths(pairs):
+    """
+    Takes (field, value) pairs, such as the fields of a form and the data
+    posted to them. Looks up the objects for all the paths given to path
+    related fields with one query per model, instead of one per field. The
+    fields then use those objects when they are cleaned.
+    """
+    prefetched = {}
+    groups = defaultdict(lambda: defaultdict(list))
+    querysets = {}
+    for field, value in pairs:
+        if not isinstance(field, RelativePathMixin):
+            continue
+        field.prefetched = prefetched
+        # Only unfiltered querysets can be shared by fields.
+        if not value or field.queryset is None or field.queryset.query.where:
+            continue
+
+        try:
+            path = field.to_path(value)
+        except ValidationError:
+            continue
+        match = resolve_path(path)
+        if not match or match[0] != field.view_name:
+            continue
+
+        lookup = match[2].get(field.lookup_field)
+        if lookup is not None:
+            model = field.queryset.model
+            try:
+                # Paths such as /generic/seller/05/ find the same object as
+                # /generic/seller/5/.
+                lookup = lookup_to_python(model, field.lookup_field, lookup)
+            except ValidationError:
+                continue
+            key = (model, field.lookup_field)
+            groups[key][unicode(lookup)].append(path)
+            querysets[key] = field.queryset
+
+    for key, lookups in groups.items():
+        lookup_field = key[1]
+        # Paths that don't match an object are None.
+        prefetched.update((path, None) for paths in lookups.values()
+                          for path in paths)
+        for obj in querysets[key].filter(
+                **{lookup_field + '__in': lookups.keys()}):
+            for path in lookups.get(unicode(getattr(obj, lookup_field)), []):
+                prefetched[path] = obj
+
+    return prefetched
+
 
 class RelativePathMixin(object):
+    # A solitude.cache.RowCache to look objects up in, instead of querying
+    # the database every time.
+    row_cache = None
 
-    def get_url(self, *args, **kwargs):
-        url = super(RelativePathMixin, self).get_url(*args, **kwargs)
+    def get_url(self, obj, view_name, request, format):
+        if not format:
+            try:
+                return reverse(view_name, kwargs={
+                    self.lookup_field: getattr(obj, self.lookup_field)})
+            except NoReverseMatch:
+                pass
+
+        url = super(RelativePathMixin, self).get_url(
+            obj, view_name, request, format)
         parsed = urlparse.urlparse(url)
         return parsed.path
 
+    def to_path(self, value):
+        try:
+            http_prefix = value.startswith(('http:', 'https:'))
+        except AttributeError:
+            msg = self.error_messages['incorrect_type']
+            raise ValidationError(msg % type(value).__name__)
+
+        if http_prefix:
+            # If needed convert absolute URLs to relative path
+            value = urlparse.urlparse(value).path
+            prefix = get_script_prefix()
+            if value.startswith(prefix):
+                value = '/' + value[len(prefix):]
+        return value
+
+    def from_native(self, value):
+        # The same as HyperlinkedRelatedField, with a cached resolve and the
+        # objects from prefetch_paths, if any.
+        if self.queryset is None:
+            raise Exception('Writable related fields must include a '
+                            '`queryset` argument')
+
+        path = self.to_path(value)
+        match = resolve_path(path)
+        if match is None:
+            raise ValidationError(self.error_messages['no_match'])
+
+        view_name, args, kwargs = match
+        if view_name != self.view_name:
+            raise ValidationError(self.error_messages['incorrect_match'])
+
+        prefetched = getattr(self, 'prefetched', {})
+        if path in prefetched:
+            if prefetched[path] is None:
+                raise ValidationError(self.error_messages['does_not_exist'])
+            return prefetched[path]
+
+        try:
+            if self.row_cache is not None:
+                return self.row_cache.get(
+                    self.queryset,
+                    **{self.lookup_field: kwargs[self.lookup_field]})
+            return self.get_object(self.queryset, view_name, args, kwargs)
+        except (ObjectDoesNotExist, KeyError, TypeError, ValueError):
+            raise ValidationError(self.error_messages['does_not_exist'])
+
 
 class PathRelatedField(RelativePathMixin, HyperlinkedRelatedField):
     pass
@@ -37,3 +186,17 @@ class PathRelatedFormField(RelativePathMixin, HyperlinkedRelatedField, Field):
             return None
         # Map the form method to the serializer version.
         return self.from_native(value)
+
+
+class PrefetchPathsMixin(object):
+
+    """
+    A form mixin that looks up the objects for all its PathRelatedFormFields
+    with one query per model, see prefetch_paths.
+    """
+
+    def full_clean(self):
+        if self.is_bound:
+            prefetch_paths((field, self.data.get(name))
+                           for name, field in self.fields.items())
+        super(PrefetchPathsMixin, self).full_clean()
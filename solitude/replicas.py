@@ -0,0 +1,258 @@
+"""
+Sends reads to the read replicas in SLAVE_DATABASES.
+
+Reads go to the primary unless something asks for a replica: the
+ReplicaMiddleware does for GET and HEAD requests and reporting commands do
+with `use_replica`. Writes always go to the primary.
+
+Solitude's clients are servers that don't keep cookies, so once a client
+writes to a table, its reads of that table are pinned to the primary for
+REPLICA_PIN_SECONDS by a key in the Django cache. That way a client that
+changes a PIN and then verifies it reads its own write. A client is its OAuth
+key or address, narrowed by the Solitude-Pin header if it sends one, so that
+the writes made for one user of a shared client don't pin the reads made for
+the others. Reads after a write in the same request go to the primary too.
+
+A replica is only read from while it is less than REPLICA_MAX_LAG seconds
+behind the primary. Each process checks that every REPLICA_LAG_INTERVAL
+seconds.
+"""
+import hashlib
+import random
+import threading
+from functools import wraps
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, DEFAULT_DB_ALIAS
+
+from django_statsd.clients import statsd
+
+from solitude.authentication import (
+    get_oauth_consumer_key_from_header, OAuthError)
+from solitude.logger import getLogger
+
+log = getLogger('s.replicas')
+
+_local = threading.local()
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+PIN_HEADER = 'HTTP_SOLITUDE_PIN'
+
+
+def reading_replica():
+    return getattr(_local, 'replica', False)
+
+
+def table(model):
+    return model._meta.db_table if model is not None else None
+
+
+def pinned(model):
+    return table(model) in getattr(_local, 'pinned', ())
+
+
+class UseReplica(object):
+
+    """
+    A context manager and decorator that sends the reads inside it to a
+    replica, for example in reporting commands.
+    """
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self:
+                return func(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        # This is shared by threads, so the old value is kept per thread.
+        _local.previous = getattr(_local, 'previous', []) + [
+            reading_replica()]
+        _local.replica = True
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.replica = _local.previous.pop()
+
+
+use_replica = UseReplica()
+
+
+class ReplicaRouter(object):
+
+    def db_for_read(self, model, **hints):
+        if not (settings.SLAVE_DATABASES and reading_replica()):
+            return DEFAULT_DB_ALIAS
+
+        if pinned(model):
+            statsd.incr('solitude.replicas.route.pinned')
+            return DEFAULT_DB_ALIAS
+
+        replicas = lags.usable()
+        if not replicas:
+            statsd.incr('solitude.replicas.route.lagging')
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Reads after a write go to the primary so they see it.
+        _local.replica = False
+        written = getattr(_local, 'written', None)
+        if written is not None and model is not None:
+            written.add(table(model))
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, *args, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def client_key(request):
+    """
+    The cache key of the pins of the client making the request, by its OAuth
+    key or its address and its Solitude-Pin header.
+    """
+    try:
+        client = get_oauth_consumer_key_from_header(
+            request.META.get('HTTP_AUTHORIZATION'))
+    except OAuthError:
+        client = None
+    client = '{0}:{1}'.format(client or request.META.get('REMOTE_ADDR'),
+                              request.META.get(PIN_HEADER, ''))
+    return 'solitude:replicas:pinned:{0}'.format(
+        hashlib.md5(client).hexdigest())
+
+
+def get_pins(key):
+    """
+    The tables pinned by the key, with the time each pin ends.
+    """
+    now = time()
+    return dict((name, until) for name, until in
+                (cache.get(key) or {}).items() if until > now)
+
+
+class ReplicaMiddleware(object):
+
+    def process_request(self, request):
+        _local.replica = False
+        _local.written = set()
+        _local.pinned = {}
+        if not settings.SLAVE_DATABASES:
+            return
+
+        if request.method not in SAFE_METHODS:
+            statsd.incr('solitude.replicas.route.write')
+        else:
+            statsd.incr('solitude.replicas.route.replica')
+            _local.pinned = get_pins(client_key(request))
+            _local.replica = True
+
+    def process_response(self, request, response):
+        written = getattr(_local, 'written', None)
+        if settings.SLAVE_DATABASES and written:
+            key = client_key(request)
+            pins = get_pins(key)
+            pins.update(dict.fromkeys(
+                written, time() + settings.REPLICA_PIN_SECONDS))
+            cache.set(key, pins, settings.REPLICA_PIN_SECONDS)
+        _local.replica = False
+        _local.written = None
+        _local.pinned = {}
+        return response
+
+
+def replica_lag(alias):
+    """
+    The number of seconds the replica is behind the primary, or None if that
+    isn't known. Only MySQL replicas report it.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'mysql':
+        return None
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SHOW SLAVE STATUS')
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row)).get('Seconds_Behind_Master')
+    finally:
+        cursor.close()
+
+
+def replica_lags():
+    """
+    The lag of each replica, which is also sent to statsd.
+    """
+    lags = {}
+    for alias in settings.SLAVE_DATABASES:
+        try:
+            lags[alias] = replica_lag(alias)
+        except Exception:
+            log.warning('Unable to get the lag of {0}'.format(alias),
+                        exc_info=True)
+            lags[alias] = None
+        if lags[alias] is not None:
+            statsd.gauge('solitude.replicas.lag.{0}'.format(alias),
+                         lags[alias])
+    return lags
+
+
+def usable(lag):
+    """
+    True if a replica that far behind the primary can be read from. A replica
+    whose lag isn't known, for example because it stopped replicating, can't.
+    """
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG
+
+
+class Lags(object):
+
+    """
+    The lag of each replica, checked at most every REPLICA_LAG_INTERVAL
+    seconds by each process.
+    """
+
+    def __init__(self):
+        self._lags = {}
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            stale = (self._checked is None or
+                     time() - self._checked >= settings.REPLICA_LAG_INTERVAL)
+            if stale:
+                # The other threads use the old lags while this one checks.
+                self._checked = time()
+        if stale:
+            self._lags = replica_lags()
+            for alias, lag in self._lags.items():
+                if not usable(lag):
+                    log.warning('Not reading from {0}, its lag is {1}'
+                                .format(alias, lag))
+        return self._lags
+
+    def usable(self):
+        """
+        The replicas close enough to the primary to read from.
+        """
+        lags = self.get()
+        return [alias for alias in settings.SLAVE_DATABASES
+                if usable(lags.get(alias))]
+
+    def clear(self):
+        with self._lock:
+            self._lags = {}
+            self._checked = None
+
+
+lags = Lags()
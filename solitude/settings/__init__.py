@@ -3,3 +3,12 @@ try:
     from .local import *  # noqa
 except ImportError:
     print 'No local.py imported, skipping.'
+
+# A second connection to the default database, for writes that have to be
+# committed even if the request is rolled back, see TRANSACTION_UID_DATABASE.
+# This comes after local.py, which can change the default database.
+if 'uids' not in DATABASES:
+    DATABASES['uids'] = dict(
+        [(k, v) for k, v in DATABASES['default'].items()
+         if not k.startswith('TEST')],
+        ATOMIC_REQUESTS=False, TEST={'MIRROR': 'default'})
@@ -43,10 +43,21 @@ if 'mysql' in DATABASES['default'].get('ENGINE', ''):
     opt['charset'] = 'utf8'
     opt['use_unicode'] = True
     DATABASES['default']['OPTIONS'] = opt
-DATABASES['default']['TEST_CHARSET'] = 'utf8'
-DATABASES['default']['TEST_COLLATION'] = 'utf8_general_ci'
+DATABASES['default']['TEST'] = {
+    'CHARSET': 'utf8',
+    'COLLATION': 'utf8_general_ci',
+}
 DATABASES['default']['ATOMIC_REQUESTS'] = True
 
+# Read replicas of the default database, see solitude.replicas.
+SLAVE_DATABASES = []
+if not SOLITUDE_PROXY and os.environ.get('SOLITUDE_REPLICA_DATABASE'):
+    DATABASES['replica'] = dj_database_url.config(
+        env='SOLITUDE_REPLICA_DATABASE')
+    DATABASES['replica']['OPTIONS'] = DATABASES['default'].get('OPTIONS', {})
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    SLAVE_DATABASES = ['replica']
+
 DEBUG = True
 DEBUG_PROPAGATE_EXCEPTIONS = True
 
@@ -258,6 +269,46 @@ PIN_FAILURE_LENGTH = 300
 
 PROJECT_MODULE = 'solitude'
 
+# Time in seconds before each process checks the lag of the replicas again.
+REPLICA_LAG_INTERVAL = 5
+
+# Replicas more than this many seconds behind the primary aren't read from.
+REPLICA_MAX_LAG = 10
+
+# Time in seconds a client's reads of a table go to the primary database after
+# it writes to it, instead of the replicas. This should be longer than
+# REPLICA_MAX_LAG.
+REPLICA_PIN_SECONDS = 15
+
+# Cache the serialized fields of each version of a row, for serializers that
+# set `cached = True`, see solitude.cache.
+REPRESENTATION_CACHE = True
+
+# The number of representations each process keeps in memory, in front of the
+# Django cache.
+REPRESENTATION_CACHE_SIZE = 10000
+
+# Time in seconds representations are kept in the Django cache.
+REPRESENTATION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# The number of resource paths, such as /generic/buyer/1/, each process keeps
+# resolved to a view, see solitude.related_fields.
+PATH_CACHE_SIZE = 10000
+
+# Cache rows that are read on every payment, such as seller products, see
+# solitude.cache.RowCache.
+ROW_CACHE = True
+
+# The number of rows each process keeps in memory, for each row cache.
+ROW_CACHE_SIZE = 1000
+
+# Time in seconds rows are kept in the Django cache.
+ROW_CACHE_TIMEOUT = 60 * 5
+
+# Time in seconds each process keeps the version of a row cache, instead of
+# reading it from the Django cache on every lookup.
+ROW_CACHE_VERSION_TIMEOUT = 1
+
 # If this flag is set, any communication will require OAuth signing of the
 # request. Without this, OAuth is optional. This should be True for production.
 REQUIRE_OAUTH = True
@@ -285,12 +336,15 @@ else:
     )
     MIDDLEWARE_CLASSES = (
         'solitude.middleware.LoggerMiddleware',
+        'solitude.replicas.ReplicaMiddleware',
+        'solitude.cache.RowCacheMiddleware',
         'django.middleware.common.CommonMiddleware',
         'django.middleware.http.ConditionalGetMiddleware',
         'django_statsd.middleware.GraphiteMiddleware',
         'django_paranoia.middleware.Middleware',
         'django.middleware.security.SecurityMiddleware'
     )
+    DATABASE_ROUTERS = ('solitude.replicas.ReplicaRouter',)
 
 STATSD_CLIENT = 'django_statsd.clients.normal'
 
@@ -332,6 +386,21 @@ REST_FRAMEWORK = {
     'PAGINATE_BY_PARAM': 'limit'
 }
 
+# The most values a list will accept in one bulk lookup, eg: ?uuid__in=...
+BULK_LOOKUP_MAX = 100
+
+# The most transactions that can be created in one bulk request.
+BULK_CREATE_MAX = 100
+
+# The number of short transaction uids each process reserves at a time.
+TRANSACTION_UID_BLOCK_SIZE = 100
+
+# The database connection short transaction uid blocks are reserved on. It
+# can't be the connection of the request, see UidAllocator. The 'uids' alias
+# is added to DATABASES in solitude.settings, after local.py. If the alias
+# isn't in DATABASES the blocks are reserved on the default database.
+TRANSACTION_UID_DATABASE = 'uids'
+
 
 # For uploading logs from the server.
 S3_AUTH = {'key': '',
@@ -396,6 +465,24 @@ PAYPAL_PROXY = ''
 PAYPAL_URLS_ALLOWED = ()
 PAYPAL_USE_SANDBOX = True
 
+###############################################################################
+# Start proxy settings.
+
+# The maximum number of keep-alive connections the proxy will hold open to
+# each upstream host.
+PROXY_POOL_SIZE = 10
+
+# Override PROXY_POOL_SIZE for an upstream host, keyed on scheme and host, for
+# example: {'https://webservices.bango.net': 20}.
+PROXY_POOL_SIZES = {}
+
+# Time in seconds connections to an upstream host can sit unused before they
+# are closed.
+PROXY_POOL_MAX_AGE = 60
+
+# End proxy settings.
+###############################################################################
+
 ###############################################################################
 # Start Bango settings.
 
@@ -424,6 +511,44 @@ SEND_USER_ID_TO_BANGO = True
 # The API can indeed be slow, see bug 883389.
 BANGO_TIMEOUT = 30
 
+# The maximum number of keep-alive connections each process will hold open
+# to BANGO_PROXY.
+BANGO_POOL_SIZE = 10
+
+# The number of calls to Bango a request can make at the same time, when it
+# makes several that don't depend on each other.
+BANGO_CONCURRENCY = 4
+
+# The Bango methods whose SOAP requests and responses are handled by the fast
+# codec in lib.bango.client instead of by suds. Whatever the codec can't
+# handle still goes through suds.
+BANGO_FAST_CODEC = []
+
+# Circuit breakers for the calls to Bango and Braintree, see solitude.breaker.
+BREAKERS = True
+
+# A breaker opens when more than BREAKER_ERROR_RATE of the last BREAKER_WINDOW
+# calls to a method failed, once at least BREAKER_MIN_CALLS have been made.
+BREAKER_WINDOW = 50
+BREAKER_MIN_CALLS = 10
+BREAKER_ERROR_RATE = 0.5
+
+# Time in seconds an open breaker fails calls before it lets one through to
+# see if the provider is back.
+BREAKER_COOLDOWN = 30
+
+# The timeout of a call is BREAKER_TIMEOUT_FACTOR times the BREAKER_PERCENTILE
+# latency of the method, but no less than BREAKER_MIN_TIMEOUT seconds and no
+# more than BANGO_TIMEOUT or BRAINTREE_TIMEOUT.
+BREAKER_PERCENTILE = 99
+BREAKER_TIMEOUT_FACTOR = 3
+BREAKER_MIN_TIMEOUT = 5
+
+# Time in seconds a pool of connections to BANGO_PROXY can sit unused before
+# its connections are closed. Keep this below the keep-alive timeout of the
+# proxy so that we don't send requests down connections it has dropped.
+BANGO_POOL_MAX_AGE = 60
+
 # Time in days after which Bango statuses will be cleaned by the
 # `clean_statuses` command.
 BANGO_STATUSES_LIFETIME = 30
@@ -496,6 +621,9 @@ BRAINTREE_MERCHANT_ID = os.getenv('BRAINTREE_MERCHANT_ID', '')
 # See lib.brains.client for the options.
 BRAINTREE_ENVIRONMENT = 'sandbox'
 
+# Time in seconds after which a Braintree API request will be aborted.
+BRAINTREE_TIMEOUT = 60
+
 # Mock out Braintree. Overrides environment.
 BRAINTREE_MOCK = False
 
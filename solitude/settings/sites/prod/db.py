@@ -18,6 +18,15 @@ DATABASES['default']['ENGINE'] = 'django.db.backends.mysql'
 DATABASES['default']['OPTIONS'] = {'init_command': 'SET storage_engine=InnoDB'}
 DATABASES['default']['ATOMIC_REQUESTS'] = True
 
+# Read replicas, see solitude.replicas.
+SLAVE_DATABASES = []
+if getattr(private, 'DATABASES_REPLICA_URL', None):
+    DATABASES['replica'] = dj_database_url.parse(
+        private.DATABASES_REPLICA_URL)
+    DATABASES['replica']['ENGINE'] = 'django.db.backends.mysql'
+    DATABASES['replica']['OPTIONS'] = DATABASES['default']['OPTIONS']
+    SLAVE_DATABASES = ['replica']
+
 DEBUG = False
 DEBUG_PROPAGATE_EXCEPTIONS = False
 
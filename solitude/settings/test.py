@@ -28,6 +28,21 @@ DEBUG_PROPAGATE_EXCEPTIONS = False
 
 DUMP_REQUESTS = False
 
+# Primary keys are reused when tests roll back, which would bring back
+# representations cached in earlier tests.
+REPRESENTATION_CACHE = False
+
+# Rows rolled back at the end of a test don't invalidate the row caches.
+ROW_CACHE = False
+
+# Uid blocks reserved on a connection of their own aren't rolled back at the
+# end of each test, and sqlite can't write from two connections at once.
+TRANSACTION_UID_DATABASE = 'default'
+
+# Provider errors raised on purpose in one test would open the breakers for
+# the tests after it.
+BREAKERS = False
+
 HMAC_KEYS = {'2011-01-01': 'cheesecake'}
 from django_sha2 import get_password_hashers
 PASSWORD_HASHERS = get_password_hashers(BASE_PASSWORD_HASHERS, HMAC_KEYS)
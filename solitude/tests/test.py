@@ -1,12 +1,17 @@
+from base64 import urlsafe_b64encode
 from hashlib import md5
 
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 
-from nose.tools import eq_, raises
+import mock
+from nose.tools import eq_, ok_, raises
 from rest_framework.viewsets import GenericViewSet
 
 from lib.buyers.models import Buyer
+from lib.buyers.views import BuyerViewSet
 from solitude.base import APITest
 from solitude.errors import InvalidQueryParams
 from solitude.filter import StrictQueryFilter
@@ -30,13 +35,43 @@ class TestHeaders(APITest):
     def test_content_headers_etag_get(self):
         buyer = Buyer.objects.create(uuid='sample:uuid')
         etag = md5(str(buyer.etag)).hexdigest()
-        res = self.client.get(
-            reverse('generic:buyer-list'),
-            HTTP_IF_NONE_MATCH=etag)
-        eq_(res.status_code, 304)
         res = self.client.get(buyer.get_uri(), HTTP_IF_NONE_MATCH=etag)
         eq_(res.status_code, 304)
 
+    def test_content_headers_etag_list(self):
+        buyer = Buyer.objects.create(uuid='sample:uuid')
+        url = reverse('generic:buyer-list')
+        etag = self.client.get(url)._headers['etag'][1][1:-1]
+        with mock.patch.object(BuyerViewSet, 'get_pagination_serializer'
+                               ) as serializer:
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        eq_(res.status_code, 304)
+        assert not serializer.called
+        # Only the count and the etag are queried, no rows are loaded.
+        for query in queries.captured_queries:
+            if Buyer._meta.db_table in query['sql']:
+                assert 'COUNT(' in query['sql'], query['sql']
+
+        buyer.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        eq_(res.status_code, 200)
+
+    def test_content_headers_etag_list_added(self):
+        Buyer.objects.create(uuid='sample:uuid')
+        url = reverse('generic:buyer-list')
+        etag = self.client.get(url)._headers['etag'][1][1:-1]
+        Buyer.objects.create(uuid='sample:uuid:other')
+        eq_(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_content_headers_etag_list_page(self):
+        for x in range(3):
+            Buyer.objects.create(uuid='sample:uuid:%s' % x)
+        url = reverse('generic:buyer-list')
+        first = self.client.get(url + '?limit=2')._headers['etag']
+        second = self.client.get(url + '?limit=2&page=2')._headers['etag']
+        assert first != second
+
     def test_content_headers_etag_put(self):
         buyer = Buyer.objects.create(uuid='sample:uuid', pin='1234')
         res = self.client.get(buyer.get_uri())
@@ -75,6 +110,121 @@ class TestHeaders(APITest):
         eq_(res.status_code, 200)
 
 
+class TestCursor(APITest):
+
+    def setUp(self):
+        self.buyers = [Buyer.objects.create(uuid='sample:uuid:%s' % x)
+                       for x in range(5)]
+        self.url = reverse('generic:buyer-list')
+
+    def pks(self, res):
+        return [o['resource_pk'] for o in res.json['objects']]
+
+    def test_walk(self):
+        newest = [b.pk for b in reversed(self.buyers)]
+        res = self.client.get(self.url + '?cursor=&limit=2')
+        eq_(self.pks(res), newest[:2])
+        eq_(res.json['meta']['prev'], None)
+        assert 'total_count' not in res.json['meta']
+
+        res = self.client.get(res.json['meta']['next'])
+        eq_(self.pks(res), newest[2:4])
+        res = self.client.get(res.json['meta']['next'])
+        eq_(self.pks(res), newest[4:])
+        eq_(res.json['meta']['next'], None)
+
+        res = self.client.get(res.json['meta']['prev'])
+        eq_(self.pks(res), newest[2:4])
+        res = self.client.get(res.json['meta']['prev'])
+        eq_(self.pks(res), newest[:2])
+        eq_(res.json['meta']['prev'], None)
+
+    def test_filtered(self):
+        res = self.client.get(self.url + '?cursor=&uuid=sample:uuid:1')
+        eq_(self.pks(res), [self.buyers[1].pk])
+
+    def test_one_query(self):
+        res = self.client.get(self.url + '?cursor=&limit=2')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(res.json['meta']['next'])
+        eq_(len([q for q in queries.captured_queries
+                 if Buyer._meta.db_table in q['sql']]), 1)
+
+    def test_invalid(self):
+        eq_(self.client.get(self.url + '?cursor=nope').status_code, 400)
+        cursor = urlsafe_b64encode('x:1')
+        eq_(self.client.get(self.url + '?cursor=' + cursor).status_code,
+            400)
+
+
+class TestBulk(APITest):
+
+    def setUp(self):
+        self.buyers = [Buyer.objects.create(uuid='sample:uuid:%s' % x)
+                       for x in range(3)]
+        self.url = (reverse('generic:buyer-list') +
+                    '?uuid__in=sample:uuid:0&uuid__in=sample:uuid:2')
+
+    def test_bulk(self):
+        res = self.client.get(self.url + '&uuid__in=nope&limit=1')
+        eq_(res.status_code, 200)
+        eq_(sorted(o['resource_pk'] for o in res.json['objects']),
+            [self.buyers[0].pk, self.buyers[2].pk])
+        eq_(res.json['meta']['next'], None)
+
+    def test_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        eq_(len([q for q in queries.captured_queries
+                 if Buyer._meta.db_table in q['sql']]), 1)
+
+    def test_etag(self):
+        etag = self.client.get(self.url)._headers['etag'][1][1:-1]
+        eq_(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+            304)
+        self.buyers[2].save()
+        eq_(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+            200)
+
+    @override_settings(BULK_LOOKUP_MAX=1)
+    def test_too_many(self):
+        eq_(self.client.get(self.url).status_code, 400)
+
+
+class TestFields(APITest):
+
+    def setUp(self):
+        self.buyer = Buyer.objects.create(uuid='sample:uuid')
+        self.url = reverse('generic:buyer-list') + '?fields=uuid,resource_uri'
+
+    def test_list(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(self.url)
+        eq_(res.status_code, 200)
+        eq_(res.json['objects'], [{'uuid': 'sample:uuid',
+                                   'resource_uri': self.buyer.get_uri()}])
+        select = [q['sql'] for q in queries.captured_queries
+                  if Buyer._meta.db_table in q['sql'] and
+                  'COUNT(' not in q['sql']]
+        eq_(len(select), 1)
+        # Only the columns for the fields are selected.
+        ok_('uuid' in select[0])
+        ok_('email' not in select[0], select[0])
+
+    def test_retrieve(self):
+        res = self.client.get(self.buyer.get_uri() + '?fields=uuid,pin')
+        eq_(res.json, {'uuid': 'sample:uuid', 'pin': False})
+
+    def test_unknown(self):
+        eq_(self.client.get(self.url + ',nope').status_code, 400)
+
+    def test_not_get(self):
+        res = self.client.patch(self.buyer.get_uri() + '?fields=uuid',
+                                data={'locale': 'fr'})
+        eq_(res.status_code, 200)
+        ok_('locale' in res.json)
+
+
 class Dummy(GenericViewSet):
     filter_fields = ['uuid']
 
@@ -95,6 +245,11 @@ class TestStrictQueryFilter(APITest):
         self.req.QUERY_PARAMS = {'uid': ['bar']}  # Note the typo there.
         StrictQueryFilter().filter_queryset(self.req, self.queryset, self.view)
 
+    def test_pagination(self):
+        self.req.QUERY_PARAMS = {'uuid': ['bar'], 'page': ['2'],
+                                 'limit': ['5']}
+        StrictQueryFilter().filter_queryset(self.req, self.queryset, self.view)
+
     def test_order(self):
         klass = StrictQueryFilter().get_filter_class(
             self.view, queryset=self.queryset)
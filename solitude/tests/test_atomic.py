@@ -0,0 +1,48 @@
+from django import test
+from django.db import transaction
+
+import mock
+from nose.tools import eq_, ok_
+
+from solitude.atomic import Compensations, depth, in_scope, scope
+
+
+class TestCompensations(test.TestCase):
+
+    def test_success(self):
+        undo = mock.Mock()
+        with Compensations() as compensations:
+            compensations.add(undo, 'id')
+        ok_(not undo.called)
+
+    def test_failure(self):
+        calls = []
+        with self.assertRaises(ValueError):
+            with Compensations() as compensations:
+                compensations.add(calls.append, 'first')
+                compensations.add(calls.append, 'second')
+                raise ValueError
+        eq_(calls, ['second', 'first'])
+
+    def test_undo_fails(self):
+        calls = []
+        with self.assertRaises(ValueError):
+            with Compensations() as compensations:
+                compensations.add(calls.append, 'first')
+                compensations.add(mock.Mock(side_effect=KeyError))
+                raise ValueError
+        eq_(calls, ['first'])
+
+
+class TestScope(test.TestCase):
+
+    def test_depth(self):
+        outer = depth()
+        with transaction.atomic():
+            eq_(depth(), outer + 1)
+
+    def test_scope(self):
+        ok_(not in_scope())
+        with scope():
+            ok_(in_scope())
+        ok_(not in_scope())
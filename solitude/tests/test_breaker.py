@@ -0,0 +1,119 @@
+from django import test
+from django.test.utils import override_settings
+
+import mock
+from nose.tools import eq_, ok_
+
+from solitude.breaker import (
+    Breaker, Breakers, CLOSED, HALF_OPEN, OPEN, percentile)
+
+
+@override_settings(BREAKERS=True, BREAKER_MIN_CALLS=4,
+                   BREAKER_ERROR_RATE=0.5, BREAKER_COOLDOWN=30)
+class TestBreaker(test.TestCase):
+
+    def setUp(self):
+        self.breaker = Breaker('bango', 'CreatePackage')
+
+    def fail(self, times=4):
+        for x in range(times):
+            self.breaker.record(True, 1)
+
+    def test_closed(self):
+        self.fail(2)
+        eq_(self.breaker.state, CLOSED)
+        ok_(self.breaker.allow())
+
+    def test_open(self):
+        self.fail()
+        eq_(self.breaker.state, OPEN)
+        ok_(not self.breaker.allow())
+
+    def test_error_rate(self):
+        for failed in (True, False, True, False):
+            self.breaker.record(failed, 1)
+        eq_(self.breaker.state, CLOSED)
+
+    @mock.patch('solitude.breaker.time')
+    def test_probe(self, time):
+        time.return_value = 0
+        self.fail()
+        time.return_value = 30
+        ok_(self.breaker.allow())
+        eq_(self.breaker.state, HALF_OPEN)
+        # Only one probe at a time.
+        ok_(not self.breaker.allow())
+        self.breaker.record(False, 1)
+        eq_(self.breaker.state, CLOSED)
+        eq_(len(self.breaker.calls), 0)
+
+    @mock.patch('solitude.breaker.time')
+    def test_probe_fails(self, time):
+        time.return_value = 0
+        self.fail()
+        time.return_value = 30
+        ok_(self.breaker.allow())
+        self.breaker.record(True, 1)
+        eq_(self.breaker.state, OPEN)
+        ok_(not self.breaker.allow())
+
+    @override_settings(BREAKERS=False)
+    def test_disabled(self):
+        self.fail()
+        ok_(self.breaker.allow())
+        eq_(self.breaker.timeout(30), 30)
+
+
+@override_settings(BREAKERS=True, BREAKER_MIN_CALLS=4, BREAKER_PERCENTILE=99,
+                   BREAKER_TIMEOUT_FACTOR=3, BREAKER_MIN_TIMEOUT=5)
+class TestTimeout(test.TestCase):
+
+    def setUp(self):
+        self.breaker = Breaker('bango', 'CreatePackage')
+
+    def record(self, *latencies):
+        for latency in latencies:
+            self.breaker.record(False, latency)
+
+    def test_not_enough_calls(self):
+        self.record(1, 1)
+        eq_(self.breaker.timeout(30), 30)
+
+    def test_latency(self):
+        self.record(1, 2, 3, 4)
+        eq_(self.breaker.timeout(30), 12)
+
+    def test_minimum(self):
+        self.record(0.1, 0.1, 0.1, 0.1)
+        eq_(self.breaker.timeout(30), 5)
+
+    def test_ceiling(self):
+        self.record(20, 20, 20, 20)
+        eq_(self.breaker.timeout(30), 30)
+
+    def test_failures(self):
+        self.record(1, 1, 1, 1)
+        self.breaker.record(True, 30)
+        eq_(self.breaker.timeout(30), 5)
+
+
+class TestBreakers(test.TestCase):
+
+    def test_get(self):
+        breakers = Breakers()
+        ok_(breakers.get('bango', 'a') is breakers.get('bango', 'a'))
+        ok_(breakers.get('bango', 'a') is not breakers.get('bango', 'b'))
+
+    def test_status(self):
+        breakers = Breakers()
+        breakers.get('bango', 'a').timeout(30)
+        status = breakers.status()
+        eq_(len(status), 1)
+        eq_(status[0]['state'], CLOSED)
+        eq_(status[0]['timeout'], 30)
+
+
+def test_percentile():
+    eq_(percentile([], 99), None)
+    eq_(percentile([3, 1, 2], 50), 2)
+    eq_(percentile(range(1, 101), 99), 99)
@@ -0,0 +1,196 @@
+import cPickle as pickle
+
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import override_settings
+
+import mock
+from nose.tools import eq_
+
+from lib.buyers.models import Buyer
+from lib.buyers.serializers import BuyerSerializer
+from lib.sellers.models import Seller, sellers
+from solitude.cache import LRU, representations, RowCacheMiddleware
+
+
+class TestLRU(TestCase):
+
+    def test_get(self):
+        lru = LRU(2)
+        lru.set('a', 1)
+        eq_(lru.get('a'), 1)
+        eq_(lru.get('b'), None)
+
+    @mock.patch('solitude.cache.statsd')
+    def test_evict(self, statsd):
+        lru = LRU(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        eq_(len(lru), 2)
+        eq_(lru.get('b'), None)
+        eq_(lru.get('a'), 1)
+        statsd.incr.assert_called_with('solitude.representation.evict')
+
+
+@override_settings(REPRESENTATION_CACHE=True)
+class TestRepresentations(TestCase):
+
+    def setUp(self):
+        representations.clear()
+        cache.clear()
+        self.buyer = Buyer.objects.create(uuid='sample:uuid')
+
+    def tearDown(self):
+        representations.clear()
+        cache.clear()
+
+    def test_key(self):
+        key = representations.key(BuyerSerializer(), self.buyer)
+        eq_(key, 'solitude:representation:lib.buyers.serializers.'
+                 'BuyerSerializer:{0}:0'.format(self.buyer.pk))
+
+    def test_key_not_reloaded(self):
+        self.buyer.counter = F('counter') + 1
+        eq_(representations.key(BuyerSerializer(), self.buyer), None)
+
+    @mock.patch('solitude.cache.statsd')
+    def test_tiers(self, statsd):
+        representations.set('k', {'foo': 'bar'})
+        eq_(representations.get('k'), {'foo': 'bar'})
+        statsd.incr.assert_called_with('solitude.representation.hit.local')
+
+        representations.clear()
+        eq_(representations.get('k'), {'foo': 'bar'})
+        statsd.incr.assert_called_with('solitude.representation.hit.cache')
+
+        eq_(representations.get('nope'), None)
+        statsd.incr.assert_called_with('solitude.representation.miss')
+
+    @mock.patch.object(BuyerSerializer, 'resource_uri')
+    def test_cached(self, resource_uri):
+        resource_uri.return_value = '/uri/'
+        first = BuyerSerializer(self.buyer).data
+        eq_(BuyerSerializer(self.buyer).data, first)
+        eq_(resource_uri.call_count, 1)
+
+    def test_uncached_fields(self):
+        BuyerSerializer(self.buyer).data
+        self.buyer.email = 'f@f.com'
+        eq_(BuyerSerializer(self.buyer).data['email'], 'f@f.com')
+        assert 'email' not in representations.get(
+            representations.key(BuyerSerializer(), self.buyer))
+
+    def test_cached_fields(self):
+        first = BuyerSerializer(self.buyer).data
+        cached = BuyerSerializer(self.buyer).data
+        eq_(cached.fields.keys(), first.fields.keys())
+        eq_(cached.fields['uuid']._value, 'sample:uuid')
+
+    def test_saved(self):
+        BuyerSerializer(self.buyer).data
+        self.buyer.active = False
+        self.buyer.save()
+        eq_(BuyerSerializer(self.buyer.reget()).data['active'], False)
+
+    @override_settings(REPRESENTATION_CACHE=False)
+    def test_off(self):
+        BuyerSerializer(self.buyer).data
+        eq_(len(representations.local), 0)
+
+
+@override_settings(ROW_CACHE=True)
+class TestRowCache(TestCase):
+
+    def setUp(self):
+        sellers.clear()
+        cache.clear()
+        self.seller = Seller.objects.create(uuid='sample:uuid')
+
+    def tearDown(self):
+        sellers.clear()
+        cache.clear()
+
+    def get(self):
+        return sellers.get(Seller.objects.filter(), uuid='sample:uuid')
+
+    @mock.patch('solitude.cache.statsd')
+    def test_tiers(self, statsd):
+        with self.assertNumQueries(1):
+            eq_(self.get(), self.seller)
+        statsd.incr.assert_called_with('solitude.rows.sellers.miss')
+
+        with self.assertNumQueries(0):
+            eq_(self.get(), self.seller)
+        statsd.incr.assert_called_with('solitude.rows.sellers.hit.local')
+
+        sellers.clear()
+        with self.assertNumQueries(0):
+            eq_(self.get(), self.seller)
+        statsd.incr.assert_called_with('solitude.rows.sellers.hit.cache')
+
+    def test_copies(self):
+        self.get().active = False
+        eq_(self.get().active, True)
+
+    def test_saved(self):
+        self.get()
+        self.seller.active = False
+        self.seller.save()
+        eq_(self.get().active, False)
+
+    def test_deleted(self):
+        self.get()
+        self.seller.delete()
+        with self.assertRaises(Seller.DoesNotExist):
+            self.get()
+
+    def test_version_lost(self):
+        self.get()
+        cache.delete(sellers.version_key)
+        self.seller.active = False
+        self.seller.save()
+        eq_(self.get().active, False)
+
+    def test_version_kept(self):
+        self.get()
+        # Another process saves a seller.
+        cache.incr(sellers.version_key)
+        with self.assertNumQueries(0):
+            self.get()
+
+    @override_settings(ROW_CACHE_VERSION_TIMEOUT=0)
+    def test_version_read(self):
+        self.get()
+        cache.incr(sellers.version_key)
+        with self.assertNumQueries(1):
+            self.get()
+
+    def test_committed(self):
+        old = self.get()
+        middleware = RowCacheMiddleware()
+        middleware.process_request(None)
+        self.seller.active = False
+        self.seller.save()
+        # Another process reads the row before the save is committed and
+        # caches it under the new version.
+        cache.set(sellers.key(sellers.version(), Seller.objects.filter(),
+                              {'uuid': 'sample:uuid'}),
+                  pickle.dumps(old, pickle.HIGHEST_PROTOCOL))
+        sellers.clear()
+        eq_(self.get().active, True)
+
+        middleware.process_response(None, None)
+        eq_(self.get().active, False)
+
+    def test_does_not_exist(self):
+        with self.assertRaises(Seller.DoesNotExist):
+            sellers.get(Seller.objects.filter(), uuid='nope')
+        eq_(len(sellers.local), 0)
+
+    @override_settings(ROW_CACHE=False)
+    def test_off(self):
+        self.get()
+        eq_(len(sellers.local), 0)
@@ -6,6 +6,7 @@ from nose.tools import eq_, ok_
 from slumber.exceptions import HttpClientError
 
 from curling import lib
+from solitude.atomic import scope
 from solitude.errors import FormError, MozillaFormatter
 from solitude.exceptions import custom_exception_handler
 from solitude.tests.live import LiveTestCase
@@ -36,6 +37,11 @@ class TestRollback(test.TestCase):
         custom_exception_handler(Exception())
         ok_(transaction.get_connection().get_rollback())
 
+    def test_scoped(self):
+        with scope():
+            custom_exception_handler(Exception())
+        ok_(not transaction.get_connection().get_rollback())
+
 
 class DummyForm(forms.Form):
     name = forms.CharField()
@@ -0,0 +1,79 @@
+from django import forms
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+import mock
+from nose.tools import eq_, ok_
+
+from lib.sellers.models import Seller
+from solitude.related_fields import (
+    PathRelatedFormField, PrefetchPathsMixin, resolve_path, resolved)
+
+
+class SellersForm(PrefetchPathsMixin, forms.Form):
+    first = PathRelatedFormField(
+        view_name='generic:seller-detail', queryset=Seller.objects.filter())
+    second = PathRelatedFormField(
+        view_name='generic:seller-detail', queryset=Seller.objects.filter(),
+        required=False, allow_null=True)
+
+
+class TestResolvePath(TestCase):
+
+    def setUp(self):
+        resolved.clear()
+
+    def test_resolve(self):
+        eq_(resolve_path('/generic/seller/1/'),
+            ('generic:seller-detail', (), {'pk': '1'}))
+        eq_(resolve_path('/nope/'), None)
+
+    @mock.patch('solitude.related_fields.resolve')
+    def test_cached(self, resolve):
+        resolve.return_value = mock.Mock(view_name='v', args=(), kwargs={})
+        resolve_path('/generic/seller/1/')
+        resolve_path('/generic/seller/1/')
+        eq_(resolve.call_count, 1)
+
+
+class TestPrefetchPaths(TestCase):
+
+    def setUp(self):
+        self.sellers = [Seller.objects.create(uuid='sample:%s' % x)
+                        for x in range(2)]
+
+    def clean(self, **data):
+        with CaptureQueriesContext(connection) as queries:
+            form = SellersForm(data)
+            form.is_valid()
+        return form, len(queries.captured_queries)
+
+    def test_one_query(self):
+        form, queries = self.clean(first=self.sellers[0].get_uri(),
+                                   second=self.sellers[1].get_uri())
+        ok_(form.is_valid(), form.errors)
+        eq_(form.cleaned_data['first'], self.sellers[0])
+        eq_(form.cleaned_data['second'], self.sellers[1])
+        eq_(queries, 1)
+
+    def test_does_not_exist(self):
+        form, queries = self.clean(first='/generic/seller/0/')
+        ok_('first' in form.errors)
+        eq_(queries, 1)
+
+    def test_not_canonical(self):
+        form, queries = self.clean(
+            first='/generic/seller/0{0}/'.format(self.sellers[0].pk))
+        ok_(form.is_valid(), form.errors)
+        eq_(form.cleaned_data['first'], self.sellers[0])
+        eq_(queries, 1)
+
+    def test_not_a_lookup(self):
+        form, queries = self.clean(first='/generic/seller/x/')
+        ok_('first' in form.errors)
+
+    def test_wrong_view(self):
+        form, queries = self.clean(first='/generic/transaction/1/')
+        ok_('first' in form.errors)
+        eq_(queries, 0)
@@ -0,0 +1,171 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.test.utils import override_settings
+
+import mock
+from nose.tools import eq_, ok_
+
+from lib.buyers.models import Buyer
+from lib.sellers.models import Seller
+from solitude.replicas import (
+    lags, reading_replica, replica_lags, ReplicaMiddleware, ReplicaRouter,
+    use_replica)
+
+
+class ReplicaTest(TestCase):
+
+    def setUp(self):
+        lags.clear()
+        patcher = mock.patch('solitude.replicas.replica_lag')
+        self.replica_lag = patcher.start()
+        self.replica_lag.return_value = 0
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lags.clear)
+
+
+@override_settings(SLAVE_DATABASES=['replica'])
+class TestRouter(ReplicaTest):
+
+    def setUp(self):
+        super(TestRouter, self).setUp()
+        self.router = ReplicaRouter()
+
+    def test_primary(self):
+        eq_(self.router.db_for_read(None), 'default')
+
+    def test_replica(self):
+        with use_replica:
+            eq_(self.router.db_for_read(None), 'replica')
+        eq_(self.router.db_for_read(None), 'default')
+
+    def test_nested(self):
+        with use_replica:
+            with use_replica:
+                pass
+            ok_(reading_replica())
+        ok_(not reading_replica())
+
+    def test_write(self):
+        with use_replica:
+            eq_(self.router.db_for_write(None), 'default')
+            eq_(self.router.db_for_read(None), 'default')
+
+    @override_settings(SLAVE_DATABASES=[])
+    def test_no_replicas(self):
+        with use_replica:
+            eq_(self.router.db_for_read(None), 'default')
+
+    @mock.patch('solitude.replicas.statsd')
+    def test_lagging(self, statsd):
+        self.replica_lag.return_value = 60
+        with use_replica:
+            eq_(self.router.db_for_read(None), 'default')
+        statsd.incr.assert_called_with('solitude.replicas.route.lagging')
+
+    def test_lag_unknown(self):
+        self.replica_lag.return_value = None
+        with use_replica:
+            eq_(self.router.db_for_read(None), 'default')
+
+    def test_lag_checked(self):
+        with use_replica:
+            self.router.db_for_read(None)
+            self.router.db_for_read(None)
+        eq_(self.replica_lag.call_count, 1)
+
+    @override_settings(REPLICA_LAG_INTERVAL=0)
+    def test_lag_rechecked(self):
+        with use_replica:
+            eq_(self.router.db_for_read(None), 'replica')
+            self.replica_lag.return_value = 60
+            eq_(self.router.db_for_read(None), 'default')
+
+
+@override_settings(SLAVE_DATABASES=['replica'])
+class TestMiddleware(ReplicaTest):
+
+    def setUp(self):
+        super(TestMiddleware, self).setUp()
+        cache.clear()
+        self.middleware = ReplicaMiddleware()
+        self.router = ReplicaRouter()
+
+    def request(self, method, write=None, read=Buyer, **kw):
+        """
+        Makes a request that writes to the `write` model, if any, and returns
+        where a read of the `read` model goes after it.
+        """
+        req = getattr(RequestFactory(), method)('/', **kw)
+        self.middleware.process_request(req)
+        if write:
+            self.router.db_for_write(write)
+        db = self.router.db_for_read(read)
+        self.middleware.process_response(req, None)
+        ok_(not reading_replica())
+        return db
+
+    @mock.patch('solitude.replicas.statsd')
+    def test_get(self, statsd):
+        eq_(self.request('get'), 'replica')
+        statsd.incr.assert_called_with('solitude.replicas.route.replica')
+
+    @mock.patch('solitude.replicas.statsd')
+    def test_pinned(self, statsd):
+        eq_(self.request('post', write=Buyer), 'default')
+        statsd.incr.assert_called_with('solitude.replicas.route.write')
+        eq_(self.request('get'), 'default')
+        statsd.incr.assert_called_with('solitude.replicas.route.pinned')
+
+    def test_not_written(self):
+        self.request('post')
+        eq_(self.request('get'), 'replica')
+
+    def test_pinned_table(self):
+        self.request('post', write=Buyer)
+        eq_(self.request('get', read=Seller), 'replica')
+        eq_(self.request('get', read=Buyer), 'default')
+
+    def test_pinned_client(self):
+        self.request('post', write=Buyer,
+                     HTTP_AUTHORIZATION='OAuth oauth_consumer_key=a')
+        eq_(self.request(
+            'get', HTTP_AUTHORIZATION='OAuth oauth_consumer_key=a'),
+            'default')
+        eq_(self.request(
+            'get', HTTP_AUTHORIZATION='OAuth oauth_consumer_key=b'),
+            'replica')
+
+    def test_pinned_header(self):
+        # Two users of the same client.
+        self.request('post', write=Buyer, HTTP_SOLITUDE_PIN='a')
+        eq_(self.request('get', HTTP_SOLITUDE_PIN='a'), 'default')
+        eq_(self.request('get', HTTP_SOLITUDE_PIN='b'), 'replica')
+
+    def test_pins_kept(self):
+        self.request('post', write=Buyer)
+        self.request('post', write=Seller)
+        eq_(self.request('get', read=Buyer), 'default')
+        eq_(self.request('get', read=Seller), 'default')
+
+    def test_get_writes(self):
+        eq_(self.request('get', write=Buyer), 'default')
+        eq_(self.request('get'), 'default')
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_unpinned(self):
+        self.request('post', write=Buyer)
+        eq_(self.request('get'), 'replica')
+
+
+class TestLag(TestCase):
+
+    @override_settings(SLAVE_DATABASES=['replica'])
+    @mock.patch('solitude.replicas.statsd')
+    @mock.patch('solitude.replicas.replica_lag')
+    def test_lags(self, replica_lag, statsd):
+        replica_lag.return_value = 3
+        eq_(replica_lags(), {'replica': 3})
+        statsd.gauge.assert_called_with('solitude.replicas.lag.replica', 3)
+
+    def test_none(self):
+        eq_(replica_lags(), {})
@@ -0,0 +1,35 @@
+from django.core import urlresolvers
+from django.test import TestCase
+
+from nose.tools import eq_, ok_, raises
+
+from solitude.uris import reverse, templates
+
+
+class TestReverse(TestCase):
+
+    def test_parity(self):
+        # Every url that has a template gives the same path as reverse().
+        ok_(templates.all())
+        for name, params in templates.all().keys():
+            kwargs = dict((param, '1') for param in params)
+            eq_(reverse(name, kwargs=kwargs),
+                urlresolvers.reverse(name, kwargs=kwargs), name)
+
+    def test_detail(self):
+        eq_(reverse('generic:transaction-detail', kwargs={'pk': 5}),
+            '/generic/transaction/5/')
+
+    def test_quoted(self):
+        kwargs = {'pk': u'a b:c%\xe9'}
+        eq_(reverse('generic:transaction-detail', kwargs=kwargs),
+            urlresolvers.reverse('generic:transaction-detail',
+                                 kwargs=kwargs))
+
+    @raises(urlresolvers.NoReverseMatch)
+    def test_no_match(self):
+        reverse('generic:transaction-detail', kwargs={'pk': 'a/b'})
+
+    @raises(urlresolvers.NoReverseMatch)
+    def test_unknown(self):
+        reverse('generic:nope-detail', kwargs={'pk': 1})
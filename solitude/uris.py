@@ -0,0 +1,116 @@
+"""
+Builds the paths to named urls without walking the URL resolver every time.
+
+Each named url is reversed once, with placeholder values, to get a template
+such as `/generic/transaction/{pk}/`. After that the paths are formatted
+straight from the templates. Anything that can't be turned into a template
+goes through Django's reverse() as usual.
+"""
+import re
+import threading
+
+from django.conf import settings
+from django.core import urlresolvers
+from django.utils.encoding import force_text
+from django.utils.http import RFC3986_SUBDELIMS, urlquote
+
+# The characters reverse() leaves unquoted in values.
+safe = RFC3986_SUBDELIMS + '/~:@'
+
+
+def named_patterns(patterns, namespace=None, prefix=''):
+    """
+    Yields the name, including namespaces, the keyword arguments and the
+    full regular expression of every named url in patterns.
+    """
+    for pattern in patterns:
+        regex = prefix + pattern.regex.pattern.lstrip('^')
+        if isinstance(pattern, urlresolvers.RegexURLResolver):
+            inner = namespace
+            if pattern.namespace:
+                inner = (namespace + ':' + pattern.namespace
+                         if namespace else pattern.namespace)
+            for named in named_patterns(pattern.url_patterns, inner, regex):
+                yield named
+
+        elif pattern.name:
+            # Urls with positional arguments are left to reverse().
+            if pattern.regex.groups != len(pattern.regex.groupindex):
+                continue
+            name = (namespace + ':' + pattern.name
+                    if namespace else pattern.name)
+            yield name, tuple(sorted(pattern.regex.groupindex)), regex
+
+
+class URITemplates(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.templates = {}
+
+    def build(self, urlconf):
+        templates = {}
+        resolver = urlresolvers.get_resolver(urlconf)
+        prefix = urlresolvers.get_script_prefix()
+        for name, params, regex in named_patterns(resolver.url_patterns):
+            # Numbers match pretty much any url argument and won't turn up
+            # anywhere else in the path.
+            values = dict((param, str(1234567890123 + k))
+                          for k, param in enumerate(params))
+            try:
+                path = urlresolvers.reverse(name, kwargs=values,
+                                            urlconf=urlconf)
+            except urlresolvers.NoReverseMatch:
+                continue
+
+            path = path.replace('{', '{{').replace('}', '}}')
+            for param, value in values.items():
+                path = path.replace(value, '{' + param + '}')
+            if not path.startswith(prefix):
+                continue
+            # Like reverse(), the values are checked against the url.
+            templates[(name, frozenset(params))] = (
+                path, re.compile('^' + regex, re.UNICODE), len(prefix))
+        return templates
+
+    def all(self, urlconf=None):
+        urlconf = urlconf or urlresolvers.get_urlconf(settings.ROOT_URLCONF)
+        # The script prefix is part of the templates.
+        key = (urlconf, urlresolvers.get_script_prefix())
+        if key not in self.templates:
+            with self.lock:
+                if key not in self.templates:
+                    self.templates[key] = self.build(urlconf)
+        return self.templates[key]
+
+    def get(self, name, params):
+        return self.all().get((name, frozenset(params)))
+
+    def clear(self):
+        with self.lock:
+            self.templates.clear()
+
+
+templates = URITemplates()
+
+
+def reverse(viewname, args=None, kwargs=None):
+    """
+    The same as Django's reverse() for a url name and keyword arguments, only
+    faster.
+    """
+    kwargs = kwargs or {}
+    template = None
+    if not args and isinstance(viewname, basestring):
+        template = templates.get(viewname, kwargs.keys())
+
+    if template is not None:
+        path, regex, start = template
+        values = dict((key, force_text(value))
+                      for key, value in kwargs.items())
+        if regex.match(path.format(**values)[start:]):
+            return path.format(**dict(
+                (key, urlquote(value, safe=safe))
+                for key, value in values.items()))
+
+    return urlresolvers.reverse(viewname, args=args, kwargs=kwargs)
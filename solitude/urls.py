@@ -11,6 +11,8 @@ services_patterns = patterns(
     url(r'^error/', 'error', name='services.error'),
     url(r'^logs/', 'logs', name='services.log'),
     url(r'^status/', 'status', name='services.status'),
+    url(r'^breakers/', 'breakers_list', name='services.breakers'),
+    url(r'^replicas/', 'replicas_list', name='services.replicas'),
     url(r'^request/', 'request_resource', name='services.request'),
     url(r'^failures/transactions/', 'transactions_failures',
         name='services.failures.transactions'),
@@ -0,0 +1,34 @@
+# Runs the proxy on gevent. The proxy spends nearly all of its time waiting on
+# Bango, Braintree or zippy, so rather than tie up a worker for each call, one
+# process can hold thousands of calls in flight at once.
+#
+# This has to be first: requests, urllib3 and the socket module are patched
+# so that they yield to other requests while waiting on the network.
+from gevent import monkey
+monkey.patch_all()
+
+import os  # noqa
+import site  # noqa
+
+from gevent.pool import Pool  # noqa
+from gevent.pywsgi import WSGIServer  # noqa
+
+# Add the app dir to the python path so we can import wsgi.proxy.
+wsgidir = os.path.dirname(__file__)
+site.addsitedir(os.path.abspath(os.path.join(wsgidir, '../')))
+
+# This is the same application as wsgi/proxy.py, so it can also be run with
+# any WSGI server that has a gevent worker.
+from wsgi.proxy import application  # noqa
+
+
+def server(host, port, connections, **kwargs):
+    """A gevent WSGI server for the proxy, allowing `connections` at once."""
+    return WSGIServer((host, port), application, spawn=Pool(connections),
+                      **kwargs)
+
+
+if __name__ == '__main__':
+    server(os.getenv('SOLITUDE_PROXY_HOST', '0.0.0.0'),
+           int(os.getenv('SOLITUDE_PROXY_PORT', 2603)),
+           int(os.getenv('SOLITUDE_PROXY_CONNECTIONS', 10000))).serve_forever()